@@ -2,11 +2,18 @@
 Flask route handlers for the FaaS scheduler API.
 Contains all HTTP endpoints and request/response handling.
 """
+import json
+import math
 import time
 import psutil
-from flask import request, jsonify
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import request, jsonify, Response, send_file
+from core import envelope, wire_format
+from core.admission_controller import AdmissionRejected
+from core.cluster_view import LOAD_HEADER
+from core.config_manager import agent_url
+from core.job_store import deliver_result
 from core.scheduler_service import SchedulerService
-from core.metrics_collector import MetricsCollector
 
 
 def register_routes(app, config_manager):
@@ -14,29 +21,344 @@ def register_routes(app, config_manager):
 
     # Initialize services
     scheduler_service = SchedulerService(config_manager)
-    metrics_collector = MetricsCollector()
+    metrics_collector = scheduler_service.metrics
+    batch_executor = ThreadPoolExecutor(
+        max_workers=config_manager.get_section("batching").get("server_workers", 64)
+    )
+    # Runs asynchronous jobs and handed-off requests outside the request threads
+    async_executor = ThreadPoolExecutor(
+        max_workers=config_manager.get_section("async").get("workers", 64)
+    )
+    self_url = agent_url(config_manager.self_node)
+
+    @app.after_request
+    def attach_load(response):
+        """Piggyback this node's load snapshot on every response."""
+        try:
+            response.headers[LOAD_HEADER] = scheduler_service.cluster.header()
+        except Exception:
+            pass  # A response must not fail for want of a snapshot
+        return response
+
+    def admit_and_handle(data):
+        """
+        Run an /entry request through tenant rate limiting and admission control.
+
+        Returns:
+            Tuple of (response body, HTTP status, extra headers)
+        """
+        if "arch" not in data:
+            data["arch"] = config_manager.get_architecture()
+
+        # Per-tenant rate limit, then weighted fair admission in front of the scheduler
+        tag = data.get("tag", "default")
+        fairness = scheduler_service.fairness
+        if not fairness.allow(tag):
+            return {"error": f"Rate limit exceeded for tenant {tag}"}, 429, {
+                "Retry-After": str(int(math.ceil(fairness.retry_after(tag))))
+            }
+
+        admission = scheduler_service.admission
+        finish_tag = fairness.stamp(tag)
+        offload = False
+        try:
+            queue_time = admission.acquire("entry", priority=finish_tag)
+        except AdmissionRejected as rejected:
+            if admission.on_full != "offload":
+                fairness.withdraw(tag)
+                return {"error": "Agent overloaded, retry later"}, 429, {
+                    "Retry-After": str(int(math.ceil(rejected.retry_after)))
+                }
+            offload = True
+
+        start_time = time.time()
+        success = False
+        fairness.start(tag, finish_tag)
+        try:
+            result = scheduler_service.handle_request(data, force_offload=offload)
+            success = result["status"] < 500 and not envelope.is_failed(result["response"])
+        finally:
+            if not offload:
+                admission.release("entry", time.time() - start_time, success, data.get("fn_name", ""))
+            fairness.finish(tag, time.time() - start_time)
+
+        if not offload and isinstance(result["response"], dict):
+            result["response"]["queue_time"] = round(queue_time, 6)
+        return result["response"], result["status"], {}
+
+    def schedule_and_handle(data):
+        """Run a /schedule request; same return shape as admit_and_handle."""
+        result = scheduler_service.schedule_function(data)
+        return result["response"], result["status"], {}
+
+    def relay(handler, data):
+        """Run a handed-off request and deliver its result to the agent that handed it off."""
+        try:
+            body, status, _ = handler(data)
+        except Exception as e:
+            body, status = {"error": f"Request failed: {str(e)}", "status": "failed"}, 500
+        if envelope.is_accepted(body):
+            return  # Handed off further; the next agent delivers the result
+        deliver(data["reply_to"], body, status)
+
+    def deliver(reply_to, body, status):
+        """Deliver a result to a reply_to URL (taken directly if it points at this agent)."""
+        local_prefix = f"{self_url}/job/"
+        if reply_to.startswith(local_prefix):
+            receive(reply_to[len(local_prefix):], body, status)
+            return
+        try:
+            deliver_result(reply_to, body, status, scheduler_service.binary_wire)
+            scheduler_service.jobs.record_delivery(True)
+        except Exception:
+            scheduler_service.jobs.record_delivery(False)
+
+    def receive(job_id, result, status):
+        """
+        Take a delivered result: the result of a request this agent handed off
+        is passed on upstream (or retried), that of a job is stored.
+
+        Returns:
+            False if the job or handoff is unknown
+        """
+        handoff = scheduler_service.finish_handoff(job_id, result, status)
+        if handoff is None:
+            return scheduler_service.jobs.complete(job_id, result, status)
+        retry = scheduler_service.retry_handoff(handoff, result, status)
+        if retry is not None:
+            async_executor.submit(relay, admit_and_handle, retry)
+        else:
+            async_executor.submit(deliver, handoff["reply_to"], result, status)
+        return True
+
+    def dispatch(handler, data):
+        """
+        Run a request, or accept it right away and run it in the background if it
+        belongs to an asynchronous job (its result then goes to reply_to).
+        """
+        if data.get("reply_to"):
+            async_executor.submit(relay, handler, data)
+            return envelope.accepted(), 202, {}
+        return handler(data)
+
+    def run_job(job_id, data):
+        """Run an asynchronous job accepted by this agent."""
+        try:
+            body, status, _ = admit_and_handle(data)
+        except Exception as e:
+            body, status = {"error": f"Request failed: {str(e)}", "status": "failed"}, 500
+        if not envelope.is_accepted(body):
+            scheduler_service.jobs.complete(job_id, body, status)
+
+    def submit_job(data):
+        """Accept an /entry?async=1 request and return its job ID."""
+        callback_url = request.args.get("callback") or data.pop("callback_url", None)
+        job_id = scheduler_service.jobs.create(callback_url)
+        if job_id is None:
+            return jsonify({"error": "Too many pending jobs, retry later"}), 503, {"Retry-After": "1"}
+        data["reply_to"] = f"{self_url}/job/{job_id}"
+        async_executor.submit(run_job, job_id, data)
+        return jsonify({
+            "job_id": job_id, "status": "pending", "result_url": f"/result/{job_id}"
+        }), 202, {"Location": f"/result/{job_id}"}
+
+    def read_request():
+        """
+        Decode a request body sent as a binary frame (agents), JSON (clients), or a
+        raw payload with the parameters in the query string (clients with large
+        inputs; streamed into the payload store when it is enabled).
+        """
+        if request.mimetype == wire_format.CONTENT_TYPE:
+            meta, body, _ = wire_format.unpack(request.get_data())
+            return wire_format.unpack_request(meta, body)
+        if request.mimetype == "application/octet-stream":
+            data = request.args.to_dict()
+            data.pop("async", None)
+            data.pop("callback", None)
+            store = scheduler_service.payload_store
+            if store.enabled:
+                chunks = iter(lambda: request.stream.read(scheduler_service.stream_chunk_size), b"")
+                data["payload_ref"] = store.put_stream(chunks)
+                data["payload"] = ""
+            else:
+                data["payload"] = request.get_data()
+            return data
+        return wire_format.request_from_json(request.get_json())
+
+    def wants_frames():
+        """Check whether the caller negotiated binary frames."""
+        return wire_format.CONTENT_TYPE in request.headers.get("Accept", "")
+
+    def envelope_response(body, status, headers=None):
+        """
+        Build the HTTP response for a result envelope: a binary frame for agents
+        that negotiated it, JSON otherwise.
+        """
+        headers = headers or {}
+        if wants_frames():
+            return Response(wire_format.stream_envelope(body), status=status,
+                            mimetype=wire_format.CONTENT_TYPE, headers=headers)
+        if (isinstance(body.get("resp"), envelope.StreamBody)
+                and "application/octet-stream" in request.headers.get("Accept", "")):
+            # Raw streamed result for clients that asked for it; metadata goes in a header
+            meta = {key: value for key, value in body.items() if key != "resp"}
+            return Response(body["resp"], status=status, mimetype="application/octet-stream",
+                            headers={**headers, "X-Agent-Envelope": json.dumps(meta)})
+        return jsonify(envelope.to_json(body)), status, headers
 
     @app.route("/entry", methods=["POST"])
     def entry():
         """Main entry point for function execution requests."""
         try:
-            data = request.get_json()
-            if "arch" not in data:
-                data["arch"] = config_manager.get_architecture()
-            result = scheduler_service.handle_request(data)
-            return jsonify(result["response"]), result["status"]
+            data = read_request()
+            if request.args.get("async") in ("1", "true"):
+                return submit_job(data)
+            body, status, headers = dispatch(admit_and_handle, data)
+            return envelope_response(body, status, headers)
         except Exception as e:
-            return jsonify({"error": f"Request failed: {str(e)}"}), 500
+            return envelope_response({"error": f"Request failed: {str(e)}"}, 500)
+
+    @app.route("/entry_batch", methods=["POST"])
+    def entry_batch():
+        """
+        Execute many invocations in one call. Results are streamed back in
+        completion order as newline-delimited JSON ({"index", "status", "response"}),
+        or as one binary frame per result when the caller sent frames.
+        """
+        binary = request.mimetype == wire_format.CONTENT_TYPE
+        try:
+            if binary:
+                frames = wire_format.unpack_all(request.get_data())
+                data = frames[0][0]
+                items = [wire_format.unpack_request(meta, body) for meta, body in frames[1:]]
+            else:
+                data = request.get_json()
+                items = [wire_format.request_from_json(item) for item in data.get("requests", [])]
+            endpoint = data.get("endpoint", "/entry")
+            if endpoint not in ("/entry", "/schedule"):
+                return jsonify({"error": f"Unsupported batch endpoint: {endpoint}"}), 400
+        except Exception as e:
+            return jsonify({"error": f"Invalid batch request: {str(e)}"}), 400
+
+        def run(item):
+            try:
+                handler = schedule_and_handle if endpoint == "/schedule" else admit_and_handle
+                body, status, _ = dispatch(handler, item)
+                return body, status
+            except Exception as e:
+                return {"error": f"Request failed: {str(e)}"}, 500
+
+        def generate():
+            futures = {batch_executor.submit(run, item): index for index, item in enumerate(items)}
+            for future in as_completed(futures):
+                body, status = future.result()
+                if binary:
+                    yield wire_format.pack_envelope(body, index=futures[future], http_status=status)
+                else:
+                    yield json.dumps({
+                        "index": futures[future], "status": status, "response": envelope.to_json(body)
+                    }) + "\n"
+
+        mimetype = wire_format.CONTENT_TYPE if binary else "application/x-ndjson"
+        return Response(generate(), mimetype=mimetype)
 
     @app.route("/schedule", methods=["POST"])
     def schedule():
         """Direct scheduling endpoint for centralized architecture."""
         try:
-            data = request.get_json()
-            result = scheduler_service.schedule_function(data)
-            return jsonify(result["response"]), result["status"]
+            body, status, headers = dispatch(schedule_and_handle, read_request())
+            return envelope_response(body, status, headers)
+        except Exception as e:
+            return envelope_response({"error": f"Scheduling failed: {str(e)}"}, 500)
+
+    @app.route("/result/<job_id>", methods=["GET"])
+    def get_result(job_id):
+        """Get an asynchronous job's result, long-polling up to ?wait= seconds."""
+        try:
+            job = scheduler_service.jobs.wait(job_id, float(request.args.get("wait", 0)))
+        except ValueError:
+            return jsonify({"error": "Invalid wait parameter"}), 400
+        if job is None:
+            return jsonify({"error": f"Unknown or expired job: {job_id}"}), 404
+        if job["status"] == "pending":
+            return jsonify({"job_id": job_id, "status": "pending"}), 202
+        return envelope_response({**job["result"], "job_id": job_id}, job["http_status"])
+
+    @app.route("/job/<job_id>", methods=["POST"])
+    def deliver_job_result(job_id):
+        """Receive the result of an asynchronous job or handoff from the next agent on its path."""
+        try:
+            if request.mimetype == wire_format.CONTENT_TYPE:
+                meta, body, _ = wire_format.unpack(request.get_data())
+                status = meta.pop("http_status", 200)
+                result = envelope.join(meta, body)
+            else:
+                data = request.get_json()
+                status = data.pop("http_status", 200)
+                result = envelope.from_json(data)
+        except Exception as e:
+            return jsonify({"error": f"Invalid job result: {str(e)}"}), 400
+        if not receive(job_id, result, status):
+            return jsonify({"error": f"Unknown or finished job: {job_id}"}), 404
+        return jsonify({"job_id": job_id, "status": "stored"}), 200
+
+    @app.route("/payload/<key>", methods=["GET"])
+    def get_payload(key):
+        """Serve a payload this agent stored for pass-by-reference forwarding."""
+        path = scheduler_service.payload_store.local_path(key)
+        if path is None:
+            return jsonify({"error": f"Unknown payload: {key}"}), 404
+        return send_file(path, mimetype="application/octet-stream")
+
+    @app.route("/cache", methods=["GET"])
+    def get_cached_object():
+        """Serve a function input through the node-local read-through object cache."""
+        cache = scheduler_service.object_cache
+        url = request.args.get("url")
+        if cache is None:
+            return jsonify({"error": "Object cache is disabled"}), 404
+        if not url:
+            return jsonify({"error": "Missing url parameter"}), 400
+        try:
+            data, hit = cache.get(url)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 403
         except Exception as e:
-            return jsonify({"error": f"Scheduling failed: {str(e)}"}), 500
+            return jsonify({"error": f"Origin fetch failed: {str(e)}"}), 502
+        return Response(data, mimetype="application/octet-stream",
+                        headers={"X-Cache": "HIT" if hit else "MISS"})
+
+    @app.route("/ping", methods=["GET"])
+    def ping():
+        """Lightweight liveness probe used for link cost estimation."""
+        return jsonify({"node": config_manager.self_node.get("id"), "timestamp": time.time()}), 200
+
+    @app.route("/gossip/<message>", methods=["POST"])
+    def gossip(message):
+        """Handle a membership protocol message (ping, ping_req or join)."""
+        membership = scheduler_service.membership
+        if membership is None:
+            return jsonify({"error": "Gossip membership is disabled"}), 404
+        handlers = {
+            "ping": membership.handle_ping,
+            "ping_req": membership.handle_ping_req,
+            "join": membership.handle_join
+        }
+        if message not in handlers:
+            return jsonify({"error": f"Unknown gossip message: {message}"}), 404
+        try:
+            return jsonify(handlers[message](request.get_json() or {})), 200
+        except (KeyError, TypeError) as e:
+            return jsonify({"error": f"Malformed gossip message: {e}"}), 400
+
+    @app.route("/members", methods=["GET"])
+    def get_members():
+        """Get the live topology and, with gossip membership, each member's state."""
+        membership = scheduler_service.membership
+        return jsonify({
+            "topology": config_manager.topo_map,
+            "membership": membership.get_stats() if membership is not None else None
+        }), 200
 
     @app.route("/reload", methods=["POST"])
     def reload_config():
@@ -57,9 +379,13 @@ def register_routes(app, config_manager):
 
     @app.route("/load", methods=["GET"])
     def get_load():
-        """Get current node load metrics."""
+        """Get current node load metrics, summarized over ?minutes=N if given."""
         try:
             load_info = metrics_collector.get_system_load()
+            load_info["pressure"] = scheduler_service.pressure.sample()
+            minutes = request.args.get("minutes", type=float)
+            if minutes:
+                load_info["window"] = metrics_collector.get_window(minutes)
             return jsonify(load_info), 200
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -82,6 +408,22 @@ def register_routes(app, config_manager):
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @app.route("/inflight", methods=["GET"])
+    def get_inflight():
+        """Get requests currently in flight from this agent per target."""
+        try:
+            return jsonify(scheduler_service.get_inflight()), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/routing_stats", methods=["GET"])
+    def get_routing_stats():
+        """Get routing state: in-flight counts and latency predictor accuracy."""
+        try:
+            return jsonify(scheduler_service.get_routing_stats()), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
     @app.route("/update_threshold", methods=["POST"])
     def update_threshold():
         """Update scheduling thresholds."""
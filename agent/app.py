@@ -4,7 +4,7 @@ Handles Flask app initialization and command line arguments.
 """
 import argparse
 from flask import Flask
-from core.config_manager import ConfigManager
+from core.config_manager import ConfigManager, DEFAULT_AGENT_PORT
 from api.routes import register_routes
 
 
@@ -20,6 +20,8 @@ def main():
     parser.add_argument("--config",
                         default="arch/architecture.yaml",
                         help="Path to architecture configuration file")
+    parser.add_argument("--port", type=int,
+                        help="Agent port (defaults to the node's port in the configuration, else 31113)")
     args = parser.parse_args()
 
     # Initialize configuration manager
@@ -30,7 +32,8 @@ def main():
     register_routes(app, config_manager)
 
     # Start the application
-    app.run(host="0.0.0.0", port=31113, debug=False)
+    port = args.port or config_manager.self_node.get("port", DEFAULT_AGENT_PORT)
+    app.run(host="0.0.0.0", port=port, debug=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,202 @@
+"""
+Admission control with adaptive concurrency limits.
+Bounds concurrent work per key (agent entry point, local gateway, target node)
+with a short wait queue, and rejects fast once the queue is full.
+"""
+import bisect
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit driven by observed latency."""
+
+    def __init__(self,
+                 initial_limit: float = 16,
+                 min_limit: float = 1,
+                 max_limit: float = 256,
+                 backoff: float = 0.9,  # Multiplicative decrease on congestion
+                 tolerance: float = 2.0,  # Latency above tolerance x baseline counts as congestion
+                 baseline_samples: int = 200):  # Samples kept per function for the baseline (minimum) latency
+
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.baseline_samples = baseline_samples
+        self.recent: Dict[str, deque] = {}  # Function name -> recent latencies
+
+    def on_sample(self, latency: float, success: bool, in_use: int, fn_name: str = ""):
+        """
+        Adjust the limit after a request completes.
+        Latency is compared with the baseline of the same function, so a mix of
+        fast and slow functions behind one key is not mistaken for congestion.
+
+        Args:
+            latency: Observed latency in seconds
+            success: Whether the request succeeded
+            in_use: Concurrent requests at completion time
+            fn_name: Function the request invoked
+        """
+        recent = self.recent.get(fn_name)
+        if recent is None:
+            recent = self.recent[fn_name] = deque(maxlen=self.baseline_samples)
+        recent.append(latency)
+        baseline = min(recent)
+
+        if not success or latency > self.tolerance * baseline:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif in_use >= self.limit / 2:
+            # Only grow when the limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def get(self) -> int:
+        """Get the current integer limit."""
+        return max(int(self.limit), 1)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted within the queue bounds."""
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"Admission rejected for {key}")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded concurrency and wait queues per admission key."""
+
+    def __init__(self,
+                 max_queue: int = 32,  # Waiting requests per key before rejecting
+                 queue_timeout: float = 0.5,  # Seconds a request may wait for a slot
+                 retry_after: float = 1.0,  # Retry-After hint for rejected requests
+                 on_full: str = "reject",  # reject (429) or offload when the queue is full
+                 **limit_config):
+
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.on_full = on_full
+        self.limit_config = limit_config
+
+        self.limits: Dict[str, AdaptiveLimit] = {}
+        self.in_use: Dict[str, int] = defaultdict(int)
+        self.waiters: Dict[str, list] = defaultdict(list)  # Sorted [priority, seq, evicted]
+        self._seq = itertools.count()
+        self.stats = defaultdict(lambda: {
+            "admitted": 0, "rejected": 0, "queued": 0,
+            "queue_time_total": 0.0, "queue_time_max": 0.0
+        })
+        self._cond = threading.Condition()
+
+    def _limit(self, key: str) -> AdaptiveLimit:
+        """Get or create the adaptive limit for a key."""
+        if key not in self.limits:
+            self.limits[key] = AdaptiveLimit(**self.limit_config)
+        return self.limits[key]
+
+    def acquire(self, key: str, timeout: Optional[float] = None,
+                priority: Optional[float] = None) -> float:
+        """
+        Acquire a concurrency slot, waiting in a bounded queue if needed.
+        Waiters are served in increasing priority (FIFO when no priority is
+        given); a full queue pushes out its worst waiter for a better arrival.
+
+        Args:
+            key: Admission key (e.g. "entry", "local", a target node ID)
+            timeout: Maximum wait in seconds (defaults to queue_timeout)
+            priority: Ordering value such as a WFQ virtual finish tag
+
+        Returns:
+            Time spent queued in seconds
+
+        Raises:
+            AdmissionRejected: If the queue is full, the wait timed out or the
+                               waiter was pushed out by a higher priority request
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        start = time.time()
+        seq = next(self._seq)
+        priority = float(seq) if priority is None else priority
+
+        with self._cond:
+            stats = self.stats[key]
+            queue = self.waiters[key]
+
+            if not queue and self.in_use[key] < self._limit(key).get():
+                self.in_use[key] += 1
+                stats["admitted"] += 1
+                return 0.0
+
+            if len(queue) >= self.max_queue:
+                if not queue or (priority, seq) >= (queue[-1][0], queue[-1][1]):
+                    stats["rejected"] += 1
+                    raise AdmissionRejected(key, self.retry_after)
+                queue[-1][2] = True  # Push out the worst waiter
+                queue.pop()
+                self._cond.notify_all()
+
+            ticket = [priority, seq, False]
+            bisect.insort(queue, ticket)
+            stats["queued"] += 1
+            try:
+                while not (queue[0] is ticket and self.in_use[key] < self._limit(key).get()):
+                    remaining = timeout - (time.time() - start)
+                    if ticket[2] or remaining <= 0:
+                        stats["rejected"] += 1
+                        raise AdmissionRejected(key, self.retry_after)
+                    self._cond.wait(remaining)
+            finally:
+                if not ticket[2]:
+                    queue.remove(ticket)
+                self._cond.notify_all()
+
+            self.in_use[key] += 1
+            waited = time.time() - start
+            stats["admitted"] += 1
+            stats["queue_time_total"] += waited
+            stats["queue_time_max"] = max(stats["queue_time_max"], waited)
+            return waited
+
+    def release(self, key: str, latency: float, success: bool = True, fn_name: str = ""):
+        """
+        Release a slot and feed the observed latency to the adaptive limit.
+
+        Args:
+            key: Admission key the slot was acquired for
+            latency: Latency of the admitted request in seconds
+            success: Whether the request succeeded
+            fn_name: Function the request invoked (selects the latency baseline)
+        """
+        with self._cond:
+            self._limit(key).on_sample(latency, success, self.in_use[key], fn_name)
+            self.in_use[key] = max(0, self.in_use[key] - 1)
+            self._cond.notify_all()
+
+    def queue_depth(self, key: str) -> int:
+        """Requests holding or waiting for a slot of a key."""
+        with self._cond:
+            return self.in_use.get(key, 0) + len(self.waiters.get(key, []))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limits, utilisation and queue-time statistics per key."""
+        with self._cond:
+            return {
+                key: {
+                    "limit": self._limit(key).get(),
+                    "in_use": self.in_use[key],
+                    "waiting": len(self.waiters[key]),
+                    "admitted": stats["admitted"],
+                    "rejected": stats["rejected"],
+                    "queued": stats["queued"],
+                    "avg_queue_time": round(stats["queue_time_total"] / stats["queued"], 6)
+                    if stats["queued"] else 0.0,
+                    "max_queue_time": round(stats["queue_time_max"], 6)
+                }
+                for key, stats in self.stats.items()
+            }
@@ -0,0 +1,60 @@
+"""
+Interface of the policies that split dynamic-architecture traffic between the
+decentralized, federated and centralized architectures.
+"""
+import random
+from typing import Dict, List
+
+# Architecture policies that can be configured per function
+ARCH_POLICIES = ["tail_ratio", "slo"]
+
+ARCHITECTURES = ["centralized", "federated", "decentralized"]
+
+
+class ArchitecturePolicy:
+    """
+    Base class of architecture policies. A policy turns the recent total times
+    of a function under each architecture into selection ratios.
+    """
+
+    def update_ratios(self, fn_name: str, durations_dict: Dict[str, List[float]]) -> Dict[str, float]:
+        """
+        Update architecture selection ratios based on recent performance data.
+
+        Args:
+            fn_name: Function name to update ratios for
+            durations_dict: Dictionary mapping architecture names to duration lists
+
+        Returns:
+            Updated architecture ratios
+        """
+        raise NotImplementedError
+
+    def select_arch(self, ratio_dict: Dict[str, float]) -> str:
+        """
+        Select architecture based on probability distribution.
+
+        Args:
+            ratio_dict: Dictionary mapping architecture names to selection ratios
+
+        Returns:
+            Selected architecture name
+        """
+        architectures = list(ratio_dict.keys())
+        weights = list(ratio_dict.values())
+
+        # Ensure weights are non-negative
+        weights = [max(0, w) for w in weights]
+
+        # Fallback to decentralized if all weights are zero
+        if sum(weights) == 0:
+            return "decentralized"
+
+        return random.choices(population=architectures, weights=weights, k=1)[0]
+
+    def record_arch_perf(self, arch: str, total_time: float):
+        """Record performance data for an architecture (optional)."""
+
+    def get_metrics(self) -> Dict:
+        """Get current policy metrics for monitoring."""
+        return {}
@@ -0,0 +1,220 @@
+"""
+Replica scaling hints for the local FaaS gateway.
+Derives the number of replicas each function needs from the gateway's own
+invocation counters (every caller, including controllers invoking this node's
+gateway directly), or only from the invocations this agent runs there: by
+Little's law the mean number of requests in the system is arrival rate x mean
+latency, and each replica should carry target_concurrency of them. Scale-ups
+apply after a short cooldown, scale-downs only once demand has fallen clearly
+below the current capacity and a longer cooldown has passed, so replica counts
+do not flap.
+"""
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Optional
+
+from core.inflight_tracker import InFlightTracker
+
+
+class ScalingController:
+    """Computes desired replicas per function and applies them through the gateway's scale API."""
+
+    def __init__(self,
+                 gateway,  # ExecutionEngine used to read and set replica counts
+                 limits: Optional[Callable[[str], Dict[str, Any]]] = None,  # fn_name -> per-function settings
+                 enabled: bool = False,
+                 source: str = "gateway",  # gateway (Prometheus counters) or agent (this agent's calls)
+                 metrics_url: Optional[str] = None,  # Gateway metrics endpoint (default <gateway>/metrics)
+                 interval: float = 15.0,  # Seconds between scaling rounds
+                 window: float = 60.0,  # Seconds of completions used for rate and latency
+                 target_concurrency: float = 4.0,  # Concurrent requests one replica should carry
+                 min_replicas: int = 1,
+                 max_replicas: int = 10,
+                 scale_down_ratio: float = 0.7,  # Scale down only below this fraction of current replicas
+                 up_cooldown: float = 30.0,  # Seconds after any scaling before scaling up again
+                 down_cooldown: float = 120.0):  # Seconds after any scaling before scaling down
+        if source not in ("gateway", "agent"):
+            raise ValueError(f"Unknown autoscaling source: {source}")
+
+        self.gateway = gateway
+        self.limits = limits or (lambda fn_name: {})
+        self.enabled = enabled
+        self.source = source
+        self.metrics_url = metrics_url
+        self.interval = interval
+        self.window = window
+        self.target_concurrency = target_concurrency
+        self.min_replicas = min_replicas
+        self.max_replicas = max_replicas
+        self.scale_down_ratio = scale_down_ratio
+        self.up_cooldown = up_cooldown
+        self.down_cooldown = down_cooldown
+
+        self.inflight = InFlightTracker()  # Per-function requests running on the gateway
+        # fn_name -> deque of (timestamp, completions, summed latency); one entry per
+        # completion for the agent source, per counter scrape for the gateway source
+        self._completions: Dict[str, deque] = defaultdict(deque)
+        self._counters: Dict[str, Dict[str, float]] = {}  # Last gateway counters per function
+        self._gateway_inflight: Dict[str, float] = {}  # Started minus completed at the gateway
+        self._last_scaled: Dict[str, float] = {}
+        self._decisions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"rounds": 0, "scale_ups": 0, "scale_downs": 0, "errors": 0}
+
+    @contextmanager
+    def track(self, fn_name: str):
+        """
+        Context manager counting an invocation on the gateway while the block
+        runs (with the gateway source, its counters already include the call).
+        """
+        start_time = time.time()
+        with self.inflight.track(fn_name):
+            yield
+        if self.source == "agent":
+            self.record(fn_name, time.time() - start_time)
+
+    def record(self, fn_name: str, duration: float, count: int = 1):
+        """Record completed invocations of a function on the gateway and their summed latency."""
+        now = time.time()
+        with self._lock:
+            completions = self._completions[fn_name]
+            completions.append((now, count, duration))
+            while completions and now - completions[0][0] > self.window:
+                completions.popleft()
+
+    def scrape(self) -> bool:
+        """
+        Fold the gateway's counters since the previous scrape into the window.
+
+        Returns:
+            False if the gateway metrics could not be read
+        """
+        counters = self.gateway.get_gateway_metrics(self.metrics_url)
+        if counters is None:
+            return False
+        for fn_name, current in counters.items():
+            previous = self._counters.get(fn_name)
+            self._counters[fn_name] = current
+            self._gateway_inflight[fn_name] = max(0.0, current["started"] - current["completed"])
+            if previous is None:
+                continue  # First scrape only sets the baseline
+            completed = current["completed"] - previous["completed"]
+            if completed < 0:
+                continue  # Counters were reset (gateway restart)
+            seconds = current["seconds"] - previous["seconds"]
+            timed = current["timed"] - previous["timed"]
+            if completed > 0 or fn_name in self._completions:
+                # Latency is known for timed calls; untimed ones are assumed to take as long
+                latency = seconds / timed if timed > 0 else 0.0
+                self.record(fn_name, latency * completed, int(completed))
+        return True
+
+    def demand(self, fn_name: str) -> Dict[str, float]:
+        """
+        Estimate a function's load on the gateway.
+
+        Returns:
+            Dict with arrival rate (req/s), mean latency (s) and concurrency,
+            the larger of rate x latency and the requests in flight right now
+        """
+        now = time.time()
+        with self._lock:
+            recent = [(n, d) for ts, n, d in self._completions.get(fn_name, []) if now - ts <= self.window]
+        completed = sum(n for n, _ in recent)
+        rate = completed / self.window
+        latency = sum(d for _, d in recent) / completed if completed else 0.0
+        inflight = max(self.inflight.get(fn_name), self._gateway_inflight.get(fn_name, 0.0))
+        concurrency = max(rate * latency, inflight)
+        return {"arrival_rate": rate, "latency": latency, "concurrency": concurrency}
+
+    def desired_replicas(self, fn_name: str, concurrency: float) -> int:
+        """Replicas needed for a concurrency, within the function's replica bounds."""
+        limits = self.limits(fn_name)
+        low = limits.get("min_replicas", self.min_replicas)
+        high = limits.get("max_replicas", self.max_replicas)
+        return max(low, min(high, math.ceil(concurrency / self.target_concurrency)))
+
+    def decide(self, fn_name: str, current: int, now: Optional[float] = None) -> Optional[int]:
+        """
+        Decide a function's new replica count.
+
+        Args:
+            fn_name: Function name
+            current: Replica count reported by the gateway
+            now: Decision time (defaults to the current time)
+
+        Returns:
+            Replica count to request, or None to leave the function as is
+        """
+        now = time.time() if now is None else now
+        demand = self.demand(fn_name)
+        desired = self.desired_replicas(fn_name, demand["concurrency"])
+        since_scaled = now - self._last_scaled.get(fn_name, float("-inf"))
+
+        target = None
+        if desired > current and since_scaled >= self.up_cooldown:
+            target = desired
+        elif (desired < current and desired <= current * self.scale_down_ratio
+              and since_scaled >= self.down_cooldown):
+            target = desired
+
+        self._decisions[fn_name] = {
+            **{key: round(value, 4) for key, value in demand.items()},
+            "current": current, "desired": desired, "applied": target
+        }
+        return target
+
+    def run_once(self):
+        """Run one scaling round over the functions invoked within the window."""
+        if self.source == "gateway" and not self.scrape():
+            self.stats["errors"] += 1
+            return
+        with self._lock:
+            functions = [fn for fn, completions in self._completions.items() if completions]
+        functions += [fn for fn in self.inflight.snapshot() if fn not in functions]
+
+        for fn_name in functions:
+            status = self.gateway.get_function_status(fn_name)
+            if status is None or "replicas" not in status:
+                self.stats["errors"] += 1
+                continue
+            current = status["replicas"]
+            target = self.decide(fn_name, current)
+            if target is None:
+                continue
+            if self.gateway.scale_function(fn_name, target):
+                self._last_scaled[fn_name] = time.time()
+                self.stats["scale_ups" if target > current else "scale_downs"] += 1
+            else:
+                self.stats["errors"] += 1
+        self.stats["rounds"] += 1
+
+    def start(self):
+        """Start a background thread running a scaling round every interval (if enabled)."""
+        if self._thread is not None or not self.enabled or self.interval <= 0:
+            return
+
+        def scale_loop():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.run_once()
+                except Exception:
+                    self.stats["errors"] += 1  # A failed round must not stop scaling
+
+        self._thread = threading.Thread(target=scale_loop, daemon=True)
+        self._thread.start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scaling counters and the latest decision per function."""
+        return {
+            "enabled": self.enabled,
+            "source": self.source,
+            **self.stats,
+            "functions": dict(self._decisions),
+            "last_scaled": {fn: round(ts, 3) for fn, ts in self._last_scaled.items()}
+        }
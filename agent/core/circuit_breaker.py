@@ -0,0 +1,190 @@
+"""
+Circuit breakers and health scoring for scheduling targets.
+Stops routing traffic to nodes or zones whose recent requests fail or are too slow.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List
+
+
+def zone_key(zone: str) -> str:
+    """
+    Key of a zone in the breakers, in-flight counters and response history.
+    Nodes are keyed by their ID, so a zone named like a node stays separate.
+    """
+    return f"zone:{zone}"
+
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker for a single target."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self,
+                 error_rate: float = 0.5,  # Failure ratio that trips the breaker
+                 slow_rate: float = 0.5,  # Ratio of slow calls that trips the breaker
+                 latency_threshold: float = 10.0,  # Seconds after which a call counts as slow
+                 min_requests: int = 5,  # Calls required in the window before tripping
+                 window: float = 30.0,  # Sliding window in seconds
+                 open_timeout: float = 15.0,  # Seconds to stay open before probing again
+                 half_open_max: int = 1):  # Trial calls allowed while half-open
+
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.latency_threshold = latency_threshold
+        self.min_requests = min_requests
+        self.window = window
+        self.open_timeout = open_timeout
+        self.half_open_max = half_open_max
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.trials = 0
+        self.calls = deque()  # (timestamp, failed, slow)
+
+    def _refresh(self, now: float):
+        """Move an open breaker to half-open once its timeout has elapsed."""
+        if self.state == self.OPEN and now - self.opened_at >= self.open_timeout:
+            self.state = self.HALF_OPEN
+            self.trials = 0
+
+    def is_available(self) -> bool:
+        """Check whether the target may currently receive traffic."""
+        self._refresh(time.time())
+        if self.state == self.OPEN:
+            return False
+        if self.state == self.HALF_OPEN:
+            return self.trials < self.half_open_max
+        return True
+
+    def on_dispatch(self):
+        """Count a request dispatched to the target (trial calls while half-open)."""
+        self._refresh(time.time())
+        if self.state == self.HALF_OPEN:
+            self.trials += 1
+
+    def record(self, success: bool, latency: float):
+        """
+        Record the outcome of a call and update the breaker state.
+
+        Args:
+            success: Whether the call succeeded
+            latency: Call latency in seconds
+        """
+        now = time.time()
+        self._refresh(now)
+        slow = latency > self.latency_threshold
+
+        if self.state == self.HALF_OPEN:
+            if success and not slow:
+                self.state = self.CLOSED
+                self.calls.clear()
+            else:
+                self._trip(now)
+            return
+
+        self.calls.append((now, not success, slow))
+        while self.calls and now - self.calls[0][0] > self.window:
+            self.calls.popleft()
+
+        if self.state == self.CLOSED and len(self.calls) >= self.min_requests:
+            failures = sum(1 for _, failed, _ in self.calls if failed)
+            slow_calls = sum(1 for _, _, is_slow in self.calls if is_slow)
+            if (failures / len(self.calls) >= self.error_rate or
+                    slow_calls / len(self.calls) >= self.slow_rate):
+                self._trip(now)
+
+    def _trip(self, now: float):
+        """Open the breaker."""
+        self.state = self.OPEN
+        self.opened_at = now
+        self.trials = 0
+        self.calls.clear()
+
+
+class CircuitBreakerRegistry:
+    """Keeps a circuit breaker and a health score per target."""
+
+    def __init__(self, health_alpha: float = 0.2, **breaker_config):
+        self.health_alpha = health_alpha
+        self.breaker_config = breaker_config
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.health: Dict[str, float] = {}  # EWMA of call success, 1.0 = healthy
+        self.trip_count: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> CircuitBreaker:
+        """Get or create the breaker for a target."""
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(**self.breaker_config)
+        return self.breakers[key]
+
+    def is_available(self, key: str) -> bool:
+        """Check whether a target's breaker lets traffic through."""
+        with self._lock:
+            return self._get(key).is_available()
+
+    def on_dispatch(self, key: str):
+        """Notify the target's breaker that a request is being sent."""
+        with self._lock:
+            self._get(key).on_dispatch()
+
+    def record(self, key: str, success: bool, latency: float):
+        """
+        Record a call outcome for a target.
+
+        Args:
+            key: Node ID or zone_key() of a zone
+            success: Whether the call succeeded
+            latency: Call latency in seconds
+        """
+        with self._lock:
+            breaker = self._get(key)
+            was_open = breaker.state == CircuitBreaker.OPEN
+            breaker.record(success, latency)
+            if breaker.state == CircuitBreaker.OPEN and not was_open:
+                self.trip_count[key] = self.trip_count.get(key, 0) + 1
+
+            previous = self.health.get(key, 1.0)
+            self.health[key] = round(
+                (1 - self.health_alpha) * previous + self.health_alpha * (1.0 if success else 0.0), 4
+            )
+
+    def get_health(self, key: str) -> float:
+        """Get the health score of a target (1.0 if never seen)."""
+        with self._lock:
+            return self.health.get(key, 1.0)
+
+    def filter_available(self, candidates: List[Dict[str, Any]],
+                         key: str = "id") -> List[Dict[str, Any]]:
+        """
+        Drop candidates whose breaker is open.
+
+        Args:
+            candidates: Candidate nodes
+            key: Node field identifying the breaker ("id" or "zone")
+
+        Returns:
+            Available candidates, or all candidates if every breaker is open
+            (failing open keeps requests flowing while the whole set recovers)
+        """
+        available = [
+            node for node in candidates
+            if self.is_available(zone_key(node["zone"]) if key == "zone" else node[key])
+        ]
+        return available or candidates
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and health score per target."""
+        with self._lock:
+            return {
+                key: {
+                    "state": breaker.state,
+                    "health": self.health.get(key, 1.0),
+                    "trips": self.trip_count.get(key, 0)
+                }
+                for key, breaker in self.breakers.items()
+            }
@@ -0,0 +1,158 @@
+"""
+Piggybacked load information between agents.
+Every agent response carries a compact snapshot of the sender's pressure
+level, memory use, queue depth and local execution latency in a header.
+Agents fold the snapshots they receive into their view of the cluster, and
+only peers they have not heard from for a while are polled.
+"""
+import json
+import threading
+import time
+import requests
+from typing import Callable, Dict, Any, List, Optional
+
+from core.config_manager import agent_url
+
+# Response header carrying the sender's load snapshot
+LOAD_HEADER = "X-Agent-Load"
+
+
+def encode_snapshot(snapshot: Dict[str, Any]) -> str:
+    """Encode a load snapshot as a compact header value."""
+    return json.dumps(snapshot, separators=(",", ":"))
+
+
+def decode_snapshot(value: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode a load snapshot header value (None if missing or malformed)."""
+    if not value:
+        return None
+    try:
+        snapshot = json.loads(value)
+    except ValueError:
+        return None
+    return snapshot if isinstance(snapshot, dict) and "id" in snapshot else None
+
+
+class ClusterView:
+    """Latest load snapshot per peer, from piggybacked headers or idle-time polls."""
+
+    def __init__(self,
+                 self_id: str,
+                 local_snapshot: Callable[[], Dict[str, Any]],  # Current load of this node
+                 on_update: Optional[Callable[[str, Dict[str, Any]], None]] = None,  # Called per received snapshot
+                 ttl: float = 10.0,  # Seconds a snapshot counts as fresh
+                 idle_after: float = 5.0,  # Poll peers not heard from for this long
+                 poll_interval: float = 5.0,  # Seconds between poll rounds (0 disables polling)
+                 ewma_alpha: float = 0.2):
+        self.self_id = self_id
+        self.local_snapshot = local_snapshot
+        self.on_update = on_update
+        self.ttl = ttl
+        self.idle_after = idle_after
+        self.poll_interval = poll_interval
+        self.ewma_alpha = ewma_alpha
+
+        self._peers: Dict[str, Dict[str, Any]] = {}  # node ID -> {"snapshot", "received", "source"}
+        self._latency: Optional[float] = None
+        self._lock = threading.Lock()
+        self._poll_thread = None
+        self.stats = {"piggybacked": 0, "polled": 0, "poll_errors": 0}
+
+    def observe_local(self, duration: float):
+        """Fold a local execution time into this node's latency summary."""
+        with self._lock:
+            if self._latency is None:
+                self._latency = duration
+            else:
+                self._latency += self.ewma_alpha * (duration - self._latency)
+
+    def header(self) -> str:
+        """Header value describing this node's current load."""
+        with self._lock:
+            latency = self._latency
+        snapshot = {"id": self.self_id, **self.local_snapshot()}
+        snapshot["e"] = round(latency, 4) if latency is not None else None
+        return encode_snapshot(snapshot)
+
+    def fold(self, headers, source: str = "piggybacked") -> Optional[Dict[str, Any]]:
+        """
+        Fold the load snapshot of a peer's response into the view.
+
+        Args:
+            headers: Response headers (anything with .get)
+            source: "piggybacked" or "polled", for the statistics
+
+        Returns:
+            The snapshot, or None if the response carried none
+        """
+        snapshot = decode_snapshot(headers.get(LOAD_HEADER))
+        if snapshot is None or snapshot["id"] == self.self_id:
+            return None
+        with self._lock:
+            self._peers[snapshot["id"]] = {"snapshot": snapshot, "received": time.time(), "source": source}
+            self.stats[source] += 1
+        if self.on_update is not None:
+            self.on_update(snapshot["id"], snapshot)
+        return snapshot
+
+    def get(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """Latest fresh snapshot of a peer (None if unknown or older than ttl)."""
+        with self._lock:
+            entry = self._peers.get(node_id)
+        if entry is None or time.time() - entry["received"] > self.ttl:
+            return None
+        return entry["snapshot"]
+
+    def idle_peers(self, peers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Peers without a snapshot in the last idle_after seconds."""
+        now = time.time()
+        with self._lock:
+            return [
+                node for node in peers
+                if now - self._peers.get(node["id"], {}).get("received", float("-inf")) > self.idle_after
+            ]
+
+    def poll(self, node: Dict[str, Any], timeout: float = 2.0):
+        """Ask an idle peer for its load through its /ping endpoint."""
+        try:
+            response = requests.get(f"{agent_url(node)}/ping", timeout=timeout)
+            self.fold(response.headers, source="polled")
+        except requests.RequestException:
+            with self._lock:
+                self.stats["poll_errors"] += 1
+
+    def start_polling(self, peers: Callable[[], List[Dict[str, Any]]]):
+        """
+        Start a background thread polling the peers that traffic has not
+        reported on recently.
+
+        Args:
+            peers: Callable returning the current list of peer nodes
+        """
+        if self._poll_thread is not None or self.poll_interval <= 0:
+            return
+
+        def poll_loop():
+            while True:
+                time.sleep(self.poll_interval)
+                for node in self.idle_peers(peers()):
+                    self.poll(node)
+
+        self._poll_thread = threading.Thread(target=poll_loop, daemon=True)
+        self._poll_thread.start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot counters and the latest snapshot and its age per peer."""
+        now = time.time()
+        with self._lock:
+            return {
+                **self.stats,
+                "peers": {
+                    node_id: {
+                        **entry["snapshot"],
+                        "age": round(now - entry["received"], 3),
+                        "source": entry["source"]
+                    }
+                    for node_id, entry in self._peers.items()
+                }
+            }
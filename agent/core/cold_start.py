@@ -0,0 +1,255 @@
+"""
+Cold-start tracking and prewarming for FaaS functions.
+Classifies invocations as cold starts per (node, function) from latency
+outliers after idle gaps (optionally confirmed by the gateway reporting zero
+available replicas), so they can be kept out of tail-ratio inputs, and sends
+keep-warm invocations to nodes the recent QPS trend says will be needed soon.
+"""
+import math
+import threading
+import time
+import numpy as np
+from collections import defaultdict, deque
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+
+class ColdStartTracker:
+    """Per (node, function) invocation history used to classify cold starts."""
+
+    def __init__(self,
+                 idle_gap: float = 300.0,  # Idle seconds after which a container may be scaled down
+                 outlier_factor: float = 3.0,  # Cold if latency exceeds this multiple of the warm median
+                 min_cold: float = 0.5,  # Cold starts take at least this many seconds
+                 warm_samples: int = 50,
+                 replica_check: bool = False):  # Ask the gateway for available replicas after idle gaps
+        self.idle_gap = idle_gap
+        self.outlier_factor = outlier_factor
+        self.min_cold = min_cold
+        self.warm_samples = warm_samples
+        self.replica_check = replica_check
+
+        # (node ID, fn_name) -> {"last", "warm", "cold_starts", "warm_count", "penalty"}
+        self._state: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"excluded_from_tail": 0, "replica_checks": 0}
+
+    def _entry(self, key: Tuple[str, str]) -> Dict[str, Any]:
+        """Get the state of a (node, function) pair (caller holds the lock)."""
+        if key not in self._state:
+            self._state[key] = {
+                "last": None, "warm": deque(maxlen=self.warm_samples),
+                "cold_starts": 0, "warm_count": 0, "penalty": 0.0
+            }
+        return self._state[key]
+
+    def suspect(self, node_id: str, fn_name: str) -> bool:
+        """
+        Check whether the next invocation may hit a cold container (idle gap
+        elapsed, or never invoked from here; classify() only counts such a
+        first call as cold when the gateway reports zero replicas).
+        """
+        with self._lock:
+            state = self._state.get((node_id, fn_name))
+            return state is None or state["last"] is None or time.time() - state["last"] > self.idle_gap
+
+    def is_warm(self, node_id: str, fn_name: str, margin: float = 0.0) -> bool:
+        """
+        Check whether a function was invoked on a node recently enough to be warm.
+
+        Args:
+            margin: Seconds before the idle gap ends from which the node counts as cold
+        """
+        with self._lock:
+            state = self._state.get((node_id, fn_name))
+            if state is None or state["last"] is None:
+                return False
+            return time.time() - state["last"] <= self.idle_gap - margin
+
+    def classify(self, node_id: str, fn_name: str, duration: float,
+                 suspected: bool, replicas: Optional[int] = None) -> bool:
+        """
+        Classify a successful invocation and fold it into the history.
+
+        Args:
+            node_id: Node whose gateway ran the function
+            fn_name: Function name
+            duration: Observed latency in seconds
+            suspected: Result of suspect() taken before the invocation
+            replicas: Available replicas reported by the gateway before the
+                      invocation (None if not checked)
+
+        Returns:
+            True if the invocation was a cold start
+        """
+        with self._lock:
+            state = self._entry((node_id, fn_name))
+            baseline = float(np.median(state["warm"])) if state["warm"] else None
+            threshold = max(self.min_cold, self.outlier_factor * baseline) if baseline else self.min_cold
+
+            if replicas == 0:
+                cold = True  # The gateway had to start a replica for this call
+            elif state["last"] is None:
+                # No earlier call here, so a slow first call may just be a slow warm one
+                cold = False
+            else:
+                cold = suspected and duration >= threshold
+
+            state["last"] = time.time()
+            if cold:
+                state["cold_starts"] += 1
+                state["penalty"] += duration - (baseline or 0.0)
+            else:
+                state["warm_count"] += 1
+                state["warm"].append(duration)
+            return cold
+
+    def touch(self, node_id: str, fn_name: str):
+        """Record an invocation that kept the function warm (failed or keep-warm calls)."""
+        with self._lock:
+            self._entry((node_id, fn_name))["last"] = time.time()
+
+    def service_time(self, fn_name: str) -> float:
+        """Get the warm median latency of a function across nodes (0.0 if unknown)."""
+        with self._lock:
+            samples = [d for (_, fn), state in self._state.items() if fn == fn_name for d in state["warm"]]
+        return float(np.median(samples)) if samples else 0.0
+
+    def record_excluded(self):
+        """Count a request kept out of the tail-ratio inputs because it hit a cold start."""
+        with self._lock:
+            self.stats["excluded_from_tail"] += 1
+
+    def record_replica_check(self):
+        """Count a gateway replica lookup."""
+        with self._lock:
+            self.stats["replica_checks"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cold-start counts, rates and mean latency penalty per (node, function)."""
+        now = time.time()
+        functions = {}
+        with self._lock:
+            for (node_id, fn_name), state in self._state.items():
+                total = state["cold_starts"] + state["warm_count"]
+                functions[f"{node_id}/{fn_name}"] = {
+                    "cold_starts": state["cold_starts"],
+                    "warm": state["warm_count"],
+                    "cold_rate": round(state["cold_starts"] / total, 4) if total else 0.0,
+                    "mean_penalty": round(state["penalty"] / state["cold_starts"], 6)
+                    if state["cold_starts"] else 0.0,
+                    "idle_for": round(now - state["last"], 3) if state["last"] else None
+                }
+            return {**self.stats, "functions": functions}
+
+
+class Prewarmer:
+    """
+    Sends keep-warm invocations ahead of demand. Per-function arrival rates
+    are bucketed per interval; a linear trend over recent buckets projects
+    the rate `horizon` intervals ahead, and by Little's law that rate times
+    the warm service time, divided by the concurrency one node should carry,
+    gives the number of nodes that need a warm container.
+    """
+
+    def __init__(self,
+                 tracker: ColdStartTracker,
+                 interval: float = 10.0,  # Seconds per QPS bucket and prewarm round
+                 history: int = 12,  # Buckets used for the trend
+                 horizon: int = 3,  # Intervals to look ahead
+                 node_concurrency: float = 4.0,  # Concurrent requests one warm node should absorb
+                 max_nodes: int = 3):  # Upper bound on nodes kept warm per function
+        self.tracker = tracker
+        self.interval = interval
+        self.history = history
+        self.horizon = horizon
+        self.node_concurrency = node_concurrency
+        self.max_nodes = max_nodes
+
+        # fn_name -> deque of per-interval arrival counts (current bucket last)
+        self._arrivals: Dict[str, deque] = defaultdict(lambda: deque([0], maxlen=self.history))
+        self._forecasts: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"rounds": 0, "prewarms": 0, "prewarm_failures": 0}
+
+    def record_arrival(self, fn_name: str):
+        """Count one request for a function in the current bucket."""
+        with self._lock:
+            self._arrivals[fn_name][-1] += 1
+
+    def forecast(self, fn_name: str) -> float:
+        """Project a function's QPS `horizon` intervals ahead from completed buckets."""
+        with self._lock:
+            counts = list(self._arrivals.get(fn_name, []))[:-1]
+        if not counts:
+            return 0.0
+        rates = np.array(counts, dtype=float) / self.interval
+        if len(rates) < 3:
+            return float(rates[-1])
+        slope, intercept = np.polyfit(np.arange(len(rates)), rates, 1)
+        return max(0.0, float(intercept + slope * (len(rates) - 1 + self.horizon)))
+
+    def nodes_needed(self, fn_name: str) -> int:
+        """Number of nodes that should hold a warm container for a function."""
+        qps = self.forecast(fn_name)
+        if qps <= 0:
+            return 0
+        concurrency = qps * self.tracker.service_time(fn_name)
+        return min(self.max_nodes, max(1, math.ceil(concurrency / self.node_concurrency)))
+
+    def run_once(self, candidates: List[Dict[str, Any]],
+                 invoke: Callable[[str, Dict[str, Any]], bool]):
+        """
+        Close the current bucket and prewarm nodes for each function.
+
+        Args:
+            candidates: Nodes in preference order (this node first)
+            invoke: Sends a keep-warm call of a function to a node, returns success
+        """
+        with self._lock:
+            functions = list(self._arrivals)
+            for fn_name in functions:
+                self._arrivals[fn_name].append(0)
+
+        for fn_name in functions:
+            needed = self.nodes_needed(fn_name)
+            self._forecasts[fn_name] = {"qps": round(self.forecast(fn_name), 3), "nodes": needed}
+            for node in candidates[:needed]:
+                # Refresh nodes that are cold or would go idle before the next round
+                if self.tracker.is_warm(node["id"], fn_name, margin=self.interval):
+                    continue
+                success = invoke(fn_name, node)
+                self.tracker.touch(node["id"], fn_name)
+                with self._lock:
+                    self.stats["prewarms" if success else "prewarm_failures"] += 1
+
+        with self._lock:
+            self.stats["rounds"] += 1
+
+    def start(self, candidates: Callable[[], List[Dict[str, Any]]],
+              invoke: Callable[[str, Dict[str, Any]], bool]):
+        """
+        Start a background thread running a prewarm round every interval.
+
+        Args:
+            candidates: Callable returning nodes in preference order
+            invoke: Sends a keep-warm call of a function to a node, returns success
+        """
+        if self._thread is not None or self.interval <= 0:
+            return
+
+        def prewarm_loop():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.run_once(candidates(), invoke)
+                except Exception:
+                    pass  # A failed round must not stop prewarming
+
+        self._thread = threading.Thread(target=prewarm_loop, daemon=True)
+        self._thread.start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prewarm counters and the latest per-function forecasts."""
+        with self._lock:
+            return {**self.stats, "forecasts": dict(self._forecasts)}
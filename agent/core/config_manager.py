@@ -3,7 +3,16 @@ Configuration management for FaaS scheduler.
 Handles loading and managing architecture configurations and topology information.
 """
 import yaml
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from core.arch_policy import ARCH_POLICIES
+from core.target_selector import SELECTION_POLICIES
+
+DEFAULT_AGENT_PORT = 31113
+
+
+def agent_url(node: Dict[str, Any]) -> str:
+    """Get the base URL of a node's agent (port from the node entry, default 31113)."""
+    return f"http://{node['address']}:{node.get('port', DEFAULT_AGENT_PORT)}"
 
 
 class ConfigManager:
@@ -13,8 +22,11 @@ class ConfigManager:
         self.path = path
         self.config: Dict[str, Any] = {}
         self.self_node: Dict[str, Any] = {}
-        self.topo_map: Dict[str, Dict[str, Any]] = {}
+        self.static_topology: Dict[str, Dict[str, Any]] = {}
+        self.membership_seeds: List[Dict[str, Any]] = []  # Resolved gossip seed nodes
+        self.membership = None  # Optional Membership providing the live topology
         self.arch: str = "centralized"  # Default architecture
+        self.selection_policies: Dict[str, str] = {}
 
         self.load_config()
 
@@ -31,11 +43,23 @@ class ConfigManager:
             self.self_node = self._find_self_node()
 
             # Build topology map for quick lookups
-            self.topo_map = {
+            self.static_topology = {
                 node["id"]: node
                 for node in self.config.get("topology", [])
             }
 
+            # Gossip seeds: node IDs from the topology or node entries with an address
+            self.membership_seeds = self._resolve_seeds()
+
+            # Per-architecture target selection policies
+            self.selection_policies = self.config.get("selection_policy", {}) or {}
+            for arch_name, policy in self.selection_policies.items():
+                if policy not in SELECTION_POLICIES:
+                    raise RuntimeError(
+                        f"Invalid selection policy '{policy}' for {arch_name}. "
+                        f"Must be one of {SELECTION_POLICIES}"
+                    )
+
         except FileNotFoundError:
             raise RuntimeError(f"Configuration file not found: {self.path}")
         except yaml.YAMLError as e:
@@ -56,8 +80,39 @@ class ConfigManager:
             if node["id"] == node_id:
                 return node
 
+        # A node joining through gossip may describe itself in the node section
+        if all(field in node_config for field in ("address", "role", "zone")):
+            return dict(node_config)
+
         raise RuntimeError(f"Node ID '{node_id}' not found in topology configuration")
 
+    def _resolve_seeds(self) -> List[Dict[str, Any]]:
+        """Resolve the membership seeds to nodes (every topology node if none are listed)."""
+        seeds = (self.config.get("membership") or {}).get("seeds") or list(self.static_topology)
+        resolved = []
+        for seed in seeds:
+            if isinstance(seed, str):
+                if seed not in self.static_topology:
+                    raise RuntimeError(f"Membership seed '{seed}' not found in topology configuration")
+                resolved.append(self.static_topology[seed])
+            elif isinstance(seed, dict) and "id" in seed and "address" in seed:
+                resolved.append(seed)
+            else:
+                raise RuntimeError(f"Invalid membership seed {seed!r}: expected a node ID or a node "
+                                   f"with id and address")
+        return resolved
+
+    @property
+    def topo_map(self) -> Dict[str, Dict[str, Any]]:
+        """Node ID -> node for the live members if gossip membership runs, else the static topology."""
+        if self.membership is not None:
+            return self.membership.topology()
+        return self.static_topology
+
+    def attach_membership(self, membership):
+        """Serve the topology from a gossip Membership from now on."""
+        self.membership = membership
+
     def set_architecture(self, arch_name: str):
         """
         Set current architecture.
@@ -76,6 +131,61 @@ class ConfigManager:
         """Get current architecture setting."""
         return self.arch
 
+    def get_selection_policy(self, arch_name: str) -> str:
+        """
+        Get target selection policy configured for an architecture.
+
+        Args:
+            arch_name: Architecture name (centralized, federated, decentralized)
+
+        Returns:
+            Selection policy name (weighted if not configured)
+        """
+        return self.selection_policies.get(arch_name, "weighted")
+
+    def get_arch_policy(self, fn_name: str) -> str:
+        """
+        Get the architecture policy used for a function under dynamic architecture.
+
+        Args:
+            fn_name: Function name
+
+        Returns:
+            Policy name from the function's settings, else the arch_policy
+            section's default (tail_ratio if not configured)
+        """
+        policy = self.get_function_config(fn_name).get(
+            "arch_policy", self.get_section("arch_policy").get("default", "tail_ratio")
+        )
+        if policy not in ARCH_POLICIES:
+            raise ValueError(f"Invalid architecture policy '{policy}' for {fn_name}. "
+                             f"Must be one of {ARCH_POLICIES}")
+        return policy
+
+    def get_section(self, name: str) -> Dict[str, Any]:
+        """
+        Get an optional top-level configuration section.
+
+        Args:
+            name: Section key in architecture.yaml
+
+        Returns:
+            Section contents (empty dict if not configured)
+        """
+        return self.config.get(name) or {}
+
+    def get_function_config(self, fn_name: str) -> Dict[str, Any]:
+        """
+        Get per-function settings from the optional functions section.
+
+        Args:
+            fn_name: Function name
+
+        Returns:
+            Function settings (empty dict if not configured)
+        """
+        return self.get_section("functions").get(fn_name) or {}
+
     def get_nodes_by_role(self, role: str) -> list:
         """Get all nodes with specified role."""
         return [node for node in self.topo_map.values() if node.get("role") == role]
@@ -0,0 +1,151 @@
+"""
+Flat result envelope shared by all forwarding hops.
+An envelope is a flat dict holding the function's result bytes under "resp",
+its status/error, an ordered list of hops and timing metadata. Between agents
+the result bytes travel as a raw frame body (see wire_format), so
+intermediate hops never decode or re-encode the function's result.
+"""
+import base64
+import json
+from typing import Dict, Any, Callable, Iterable, Optional, Tuple
+
+
+class StreamBody:
+    """
+    A function result that is still being received, passed on chunk by chunk
+    instead of being buffered at every hop.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], length: Optional[int] = None,
+                 close: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            chunks: Iterable of result chunks (consumed once)
+            length: Total size in bytes, if known
+            close: Releases the underlying connection
+        """
+        self.chunks = chunks
+        self.length = length
+        self._close = close
+
+    def __iter__(self):
+        try:
+            for chunk in self.chunks:
+                if chunk:
+                    yield chunk
+        finally:
+            self.close()
+
+    def read(self) -> bytes:
+        """Buffer the remaining result."""
+        return b"".join(self)
+
+    def close(self):
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+
+# Status of a request handed off to another agent that will deliver the result
+# to the request's reply_to URL (asynchronous invocations)
+ACCEPTED = "accepted"
+
+
+def accepted() -> Dict[str, Any]:
+    """Envelope acknowledging an asynchronous handoff."""
+    return {"status": ACCEPTED}
+
+
+def is_accepted(envelope: Any) -> bool:
+    """Check whether an envelope only acknowledges an asynchronous handoff."""
+    return isinstance(envelope, dict) and envelope.get("status") == ACCEPTED
+
+
+def is_failed(envelope: Any) -> bool:
+    """Check whether an envelope reports a failure."""
+    return isinstance(envelope, dict) and (
+        "error" in envelope or envelope.get("status") == "failed"
+    )
+
+
+def add_hop(envelope: Dict[str, Any], node_id: str, arch: str, elapsed: float) -> Dict[str, Any]:
+    """
+    Prepend this node's hop to the envelope's ordered hop list.
+
+    Args:
+        envelope: Result envelope returned by the architecture handler
+        node_id: Node that handled this hop
+        arch: Architecture the hop was routed with
+        elapsed: Time spent at this hop, including downstream hops
+
+    Returns:
+        The same envelope, updated in place
+    """
+    hop = {"node": node_id, "architecture": arch, "elapsed": round(elapsed, 6)}
+    envelope["hops"] = [hop] + list(envelope.get("hops", []))
+    return envelope
+
+
+def split(envelope: Dict[str, Any]) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Split an envelope into the raw result body and its metadata.
+
+    Returns:
+        Tuple of (result bytes, metadata without the result)
+    """
+    meta = {key: value for key, value in envelope.items() if key != "resp"}
+    return result_bytes(envelope), meta
+
+
+def result_bytes(envelope: Dict[str, Any]) -> bytes:
+    """Get the function result of an envelope as bytes."""
+    resp = envelope.get("resp")
+    if resp is None:
+        return b""
+    if isinstance(resp, StreamBody):
+        return resp.read()
+    if isinstance(resp, bytes):
+        return resp
+    if isinstance(resp, str):
+        return resp.encode("utf-8")
+    return json.dumps(resp).encode("utf-8")
+
+
+def join(meta: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """
+    Rebuild an envelope from its metadata and raw result body (see split).
+    The body is kept as undecoded bytes.
+    """
+    envelope = dict(meta)
+    envelope["resp"] = None if not body and "error" in envelope else body
+    return envelope
+
+
+def to_json(envelope: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert an envelope into a JSON-safe dict for external clients.
+    The result is decoded as UTF-8 text, or base64 for binary results.
+    """
+    data = dict(envelope)
+    resp = data.get("resp")
+    if isinstance(resp, StreamBody):
+        resp = resp.read()
+        data["resp"] = resp
+    if isinstance(resp, bytes):
+        try:
+            data["resp"] = resp.decode("utf-8")
+        except UnicodeDecodeError:
+            data["resp"] = base64.b64encode(resp).decode("ascii")
+            data["resp_encoding"] = "base64"
+    return data
+
+
+def from_json(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a JSON envelope (see to_json) back into an envelope with a bytes result."""
+    envelope = dict(data)
+    resp = envelope.get("resp")
+    if envelope.pop("resp_encoding", None) == "base64" and isinstance(resp, str):
+        envelope["resp"] = base64.b64decode(resp)
+    elif isinstance(resp, str):
+        envelope["resp"] = resp.encode("utf-8")
+    return envelope
@@ -2,35 +2,79 @@
 Execution engine for invoking functions on local and remote FaaS platforms.
 Handles the actual function invocation and communication with FaaS gateways.
 """
+import re
 import requests
-from typing import Dict, Any
+from collections import defaultdict
+from typing import Dict, Any, Optional
+
+from core.envelope import StreamBody
+
+# Chunk size used when streaming results from a gateway
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Gateway Prometheus counters -> field of parse_gateway_metrics
+GATEWAY_COUNTERS = {
+    "gateway_function_invocation_started": "started",
+    "gateway_function_invocation_total": "completed",
+    "gateway_functions_seconds_sum": "seconds",
+    "gateway_functions_seconds_count": "timed"
+}
+
+_SAMPLE = re.compile(r'^(\w+)\{([^}]*)\}\s+(\S+)')
+_LABEL = re.compile(r'(\w+)="([^"]*)"')
+
+
+def parse_gateway_metrics(text: str) -> Dict[str, Dict[str, float]]:
+    """
+    Parse the invocation counters of an OpenFaaS gateway's Prometheus metrics.
+
+    Returns:
+        Dict mapping function names (without namespace) to their started,
+        completed, seconds and timed counters, summed over status codes
+    """
+    functions = defaultdict(lambda: dict.fromkeys(GATEWAY_COUNTERS.values(), 0.0))
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if match is None or match.group(1) not in GATEWAY_COUNTERS:
+            continue
+        labels = dict(_LABEL.findall(match.group(2)))
+        if "function_name" not in labels:
+            continue
+        fn_name = labels["function_name"].split(".", 1)[0]
+        try:
+            functions[fn_name][GATEWAY_COUNTERS[match.group(1)]] += float(match.group(3))
+        except ValueError:
+            continue
+    return dict(functions)
 
 
 class ExecutionEngine:
     """Handles function execution on local and remote FaaS platforms."""
 
-    def __init__(self, local_gateway_url="http://127.0.0.1:31112/function"):
+    def __init__(self, local_gateway_url="http://127.0.0.1:31112/function", gateway_auth=None):
         self.local_gateway_url = local_gateway_url
+        self.gateway_auth = gateway_auth  # (user, password) for the gateway's /system API
         self.timeout = 60  # Request timeout in seconds
 
-    def invoke_local_faas(self, func_name: str, payload: Any) -> Dict[str, Any]:
+    def invoke_local_faas(self, func_name: str, payload: Any, stream: bool = False) -> Dict[str, Any]:
         """
         Execute function on local FaaS platform.
 
         Args:
             func_name: Name of the function to execute
-            payload: Function payload/input data
+            payload: Function payload/input data (may be an iterator of chunks)
+            stream: Return the result as a StreamBody instead of buffering it
 
         Returns:
             Dict containing response or error information
         """
         try:
             url = f"{self.local_gateway_url}/{func_name}"
-            response = requests.post(url, data=payload, timeout=self.timeout)
+            response = requests.post(url, data=payload, timeout=self.timeout, stream=stream)
             response.raise_for_status()
 
             return {
-                "resp": response.text,
+                "resp": self._result_body(response, stream),
                 "status": "success"
             }
         except requests.RequestException as e:
@@ -44,14 +88,16 @@ class ExecutionEngine:
                 "status": "failed"
             }
 
-    def invoke_remote_faas(self, func_name: str, payload: Any, target: Dict[str, Any]) -> Dict[str, Any]:
+    def invoke_remote_faas(self, func_name: str, payload: Any, target: Dict[str, Any],
+                           stream: bool = False) -> Dict[str, Any]:
         """
         Execute function on remote FaaS platform.
 
         Args:
             func_name: Name of the function to execute
-            payload: Function payload/input data
+            payload: Function payload/input data (may be an iterator of chunks)
             target: Target node information (must contain 'address' key)
+            stream: Return the result as a StreamBody instead of buffering it
 
         Returns:
             Dict containing response or error information
@@ -63,12 +109,12 @@ class ExecutionEngine:
                     "status": "failed"
                 }
 
-            url = f"http://{target['address']}:31112/function/{func_name}"
-            response = requests.post(url, data=payload, timeout=self.timeout)
+            url = f"{self._gateway_base(target)}/function/{func_name}"
+            response = requests.post(url, data=payload, timeout=self.timeout, stream=stream)
             response.raise_for_status()
 
             return {
-                "resp": response.text,
+                "resp": self._result_body(response, stream),
                 "status": "success",
                 "execution_location": "remote",
                 "target_node": target.get("id", "unknown")
@@ -88,6 +134,89 @@ class ExecutionEngine:
                 "target_node": target.get("id", "unknown")
             }
 
+    def _result_body(self, response: requests.Response, stream: bool):
+        """Get a gateway result, either buffered or as a stream of chunks."""
+        if not stream:
+            return response.content
+        length = response.headers.get("Content-Length")
+        return StreamBody(response.iter_content(STREAM_CHUNK_SIZE),
+                          length=int(length) if length else None, close=response.close)
+
+    def _gateway_base(self, target: Dict[str, Any] = None) -> str:
+        """Get the base URL of the local gateway or a target node's gateway."""
+        if target is None:
+            return self.local_gateway_url.rsplit("/function", 1)[0]
+        return f"http://{target['address']}:{target.get('gateway_port', 31112)}"
+
+    def get_function_status(self, func_name: str, target: Dict[str, Any] = None,
+                            timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+        """
+        Get a function's deployment status (replicas, availableReplicas, ...)
+        from the gateway's system API.
+
+        Args:
+            func_name: Name of the function
+            target: Node whose gateway is asked (None for the local gateway)
+            timeout: Request timeout in seconds
+
+        Returns:
+            Status reported by the gateway, or None if it could not be fetched
+        """
+        try:
+            response = requests.get(f"{self._gateway_base(target)}/system/function/{func_name}",
+                                    auth=self.gateway_auth, timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError):
+            return None
+
+    def scale_function(self, func_name: str, replicas: int, target: Dict[str, Any] = None,
+                       timeout: float = 5.0) -> bool:
+        """
+        Ask the gateway to scale a function to the given replica count.
+
+        Args:
+            func_name: Name of the function
+            replicas: Desired replica count
+            target: Node whose gateway is asked (None for the local gateway)
+            timeout: Request timeout in seconds
+
+        Returns:
+            True if the gateway accepted the request
+        """
+        try:
+            response = requests.post(
+                f"{self._gateway_base(target)}/system/scale-function/{func_name}",
+                json={"serviceName": func_name, "replicas": replicas},
+                auth=self.gateway_auth, timeout=timeout
+            )
+            response.raise_for_status()
+            return True
+        except requests.RequestException:
+            return False
+
+    def get_gateway_metrics(self, url: Optional[str] = None,
+                            timeout: float = 2.0) -> Optional[Dict[str, Dict[str, float]]]:
+        """
+        Read the local gateway's per-function invocation counters, which count
+        every caller of the gateway, not only this agent.
+
+        Args:
+            url: Prometheus metrics endpoint (defaults to the gateway's /metrics)
+            timeout: Request timeout in seconds
+
+        Returns:
+            Counters per function (see parse_gateway_metrics), or None if the
+            metrics could not be fetched
+        """
+        try:
+            response = requests.get(url or f"{self._gateway_base()}/metrics",
+                                    auth=self.gateway_auth, timeout=timeout)
+            response.raise_for_status()
+            return parse_gateway_metrics(response.text)
+        except requests.RequestException:
+            return None
+
     def invoke_remote_scheduler(self, url: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Send request to remote scheduler.
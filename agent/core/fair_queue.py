@@ -0,0 +1,154 @@
+"""
+Tenant fairness keyed by the request tag.
+Provides weighted fair queueing tags, per-tenant rate limits and per-tenant
+latency and throughput statistics.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Any
+
+import numpy as np
+
+
+class TenantFairness:
+    """Weighted fair queueing and rate limiting per tenant tag."""
+
+    def __init__(self, tenants: Dict[str, Dict[str, Any]] = None,
+                 default_weight: float = 1.0,
+                 stats_window: float = 60.0):
+        """
+        Args:
+            tenants: Per-tag settings, e.g. {"tenant-a": {"weight": 2, "rate_limit": 50, "burst": 100}}
+            default_weight: Weight of tags without explicit settings
+            stats_window: Seconds of history used for latency and throughput stats
+        """
+        self.tenants = tenants or {}
+        self.default_weight = default_weight
+        self.stats_window = stats_window
+
+        # WFQ state: system virtual time, last committed finish tag and
+        # requests stamped but not yet admitted per tenant
+        self.virtual_time = 0.0
+        self.last_finish: Dict[str, float] = defaultdict(float)
+        self.pending: Dict[str, int] = defaultdict(int)
+
+        # Token buckets per tenant: (tokens, last refill timestamp)
+        self.buckets: Dict[str, list] = {}
+
+        self.active: Dict[str, int] = defaultdict(int)
+        self.completions: Dict[str, deque] = defaultdict(deque)  # (timestamp, latency)
+        self.rejected: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def weight(self, tag: str) -> float:
+        """Get the configured weight of a tenant."""
+        return float(self.tenants.get(tag, {}).get("weight", self.default_weight))
+
+    def allow(self, tag: str) -> bool:
+        """
+        Check a tenant's rate limit, consuming one token.
+
+        Args:
+            tag: Tenant tag
+
+        Returns:
+            False if the tenant exceeded its configured rate
+        """
+        rate = self.tenants.get(tag, {}).get("rate_limit")
+        if not rate:
+            return True
+
+        burst = self.tenants[tag].get("burst", rate)
+        now = time.time()
+        with self._lock:
+            tokens, last = self.buckets.get(tag, [burst, now])
+            tokens = min(burst, tokens + (now - last) * rate)
+            if tokens < 1:
+                self.buckets[tag] = [tokens, now]
+                self.rejected[tag] += 1
+                return False
+            self.buckets[tag] = [tokens - 1, now]
+            return True
+
+    def retry_after(self, tag: str) -> float:
+        """Seconds until a rate-limited tenant gets its next token."""
+        rate = self.tenants.get(tag, {}).get("rate_limit")
+        return 1.0 / rate if rate else 1.0
+
+    def stamp(self, tag: str) -> float:
+        """
+        Compute the WFQ virtual finish tag of an arriving request (unit cost).
+        Requests are served in increasing finish-tag order. The tag is only
+        committed by start(); a request that is not admitted must be
+        withdrawn so the tenant is not charged for work that never ran.
+
+        Args:
+            tag: Tenant tag
+
+        Returns:
+            Virtual finish tag
+        """
+        with self._lock:
+            start = max(self.virtual_time, self.last_finish[tag])
+            self.pending[tag] += 1
+            return start + self.pending[tag] / self.weight(tag)
+
+    def withdraw(self, tag: str):
+        """Drop a stamped request that was not admitted."""
+        with self._lock:
+            self.pending[tag] = max(0, self.pending[tag] - 1)
+
+    def start(self, tag: str, finish_tag: float):
+        """
+        Mark a request as admitted: commit its finish tag and advance virtual
+        time to its start tag.
+        """
+        with self._lock:
+            self.pending[tag] = max(0, self.pending[tag] - 1)
+            self.last_finish[tag] = max(self.last_finish[tag], finish_tag)
+            self.virtual_time = max(self.virtual_time, finish_tag - 1.0 / self.weight(tag))
+            self.active[tag] += 1
+
+    def finish(self, tag: str, latency: float):
+        """Mark an admitted request as completed."""
+        now = time.time()
+        with self._lock:
+            self.active[tag] = max(0, self.active[tag] - 1)
+            log = self.completions[tag]
+            log.append((now, latency))
+            while log and now - log[0][0] > self.stats_window:
+                log.popleft()
+
+    def over_share(self, tag: str) -> bool:
+        """
+        Check whether a tenant holds at least its weighted share of local work.
+        Used to offload the excess of heavy tenants before light ones.
+        """
+        with self._lock:
+            active = {t: n for t, n in self.active.items() if n > 0}
+            total = sum(active.values())
+            if total == 0:
+                return True
+            if tag not in active:
+                return False
+            total_weight = sum(self.weight(t) for t in active)
+            return active[tag] / total >= self.weight(tag) / total_weight
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-tenant latency, throughput and admission statistics."""
+        now = time.time()
+        with self._lock:
+            tags = set(self.completions) | set(self.active) | set(self.rejected)
+            stats = {}
+            for tag in tags:
+                latencies = [lat for ts, lat in self.completions[tag] if now - ts <= self.stats_window]
+                stats[tag] = {
+                    "weight": self.weight(tag),
+                    "active": self.active[tag],
+                    "rejected": self.rejected[tag],
+                    "throughput": round(len(latencies) / self.stats_window, 3),
+                    "avg_latency": round(float(np.mean(latencies)), 6) if latencies else 0.0,
+                    "p95_latency": round(float(np.percentile(latencies, 95)), 6) if latencies else 0.0
+                }
+            return stats
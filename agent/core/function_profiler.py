@@ -0,0 +1,163 @@
+"""
+Workload profiling of FaaS functions for class-aware routing.
+A function is CPU-bound, I/O-bound or memory-heavy, either as declared in its
+settings or as measured on this node's gateway: node CPU time, peak memory and
+network bytes are sampled around invocations that run alone, and once enough
+samples are in, the medians decide the class.
+"""
+import threading
+import time
+import numpy as np
+import psutil
+from collections import defaultdict
+from typing import Callable, Dict, Any, List, Optional
+
+# Workload classes used by the profiled selection policy
+WORKLOAD_CLASSES = ["cpu", "io", "memory"]
+
+
+class _Sample:
+    """Counters captured at the start of a profiled invocation, plus a peak-memory poller."""
+
+    def __init__(self, generation: int, poll_interval: float):
+        self.generation = generation
+        self.start = time.time()
+        self.cpu = psutil.cpu_times()
+        self.net = psutil.net_io_counters()
+        self.memory_base = psutil.virtual_memory().used
+        self.memory_peak = self.memory_base
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._poll, args=(poll_interval,), daemon=True)
+        self._thread.start()
+
+    def _poll(self, poll_interval: float):
+        while not self._done.wait(poll_interval):
+            self.memory_peak = max(self.memory_peak, psutil.virtual_memory().used)
+
+    def finish(self) -> Dict[str, float]:
+        """Stop polling and return the invocation's resource usage."""
+        self._done.set()
+        self._thread.join()
+        duration = max(time.time() - self.start, 1e-6)
+        cpu = psutil.cpu_times()
+        net = psutil.net_io_counters()
+        self.memory_peak = max(self.memory_peak, psutil.virtual_memory().used)
+        busy = (sum(cpu) - cpu.idle - getattr(cpu, "iowait", 0.0)) - \
+               (sum(self.cpu) - self.cpu.idle - getattr(self.cpu, "iowait", 0.0))
+        return {
+            "duration": duration,
+            "cpu_cores": max(busy, 0.0) / duration,
+            "memory_mb": max(self.memory_peak - self.memory_base, 0) / (1024 ** 2),
+            "net_mb_s": ((net.bytes_sent + net.bytes_recv)
+                         - (self.net.bytes_sent + self.net.bytes_recv)) / (1024 ** 2) / duration
+        }
+
+
+class FunctionProfiler:
+    """Classifies functions into workload classes from declared hints or gateway-side samples."""
+
+    def __init__(self,
+                 hints: Optional[Callable[[str], Optional[str]]] = None,  # fn_name -> declared class
+                 samples: int = 5,  # Solo invocations measured before classifying
+                 cpu_cores: float = 0.6,  # CPU-bound at or above this many busy cores
+                 memory_mb: float = 256,  # Memory-heavy at or above this peak memory increase
+                 poll_interval: float = 0.05,  # Seconds between peak-memory readings
+                 enabled: bool = True):  # Sample invocations (declared hints apply regardless)
+        self.hints = hints or (lambda fn_name: None)
+        self.samples = samples
+        self.cpu_cores = cpu_cores
+        self.memory_mb = memory_mb
+        self.poll_interval = poll_interval
+        self.enabled = enabled
+
+        self._measurements: Dict[str, List[Dict[str, float]]] = defaultdict(list)
+        self._active = 0  # Local invocations running now
+        self._generation = 0  # Bumped on every start, so overlapping samples are discarded
+        self._routes = defaultdict(int)
+        self._lock = threading.Lock()
+        self.stats = {"sampled": 0, "discarded": 0}
+
+    def begin(self, fn_name: str) -> Optional[_Sample]:
+        """
+        Mark the start of a local invocation.
+
+        Returns:
+            Sample to pass to end(), or None if the function is not being measured
+        """
+        with self._lock:
+            measurements = self._measurements[fn_name]
+            self._active += 1
+            self._generation += 1
+            if (not self.enabled or self._active > 1 or self.hints(fn_name) in WORKLOAD_CLASSES
+                    or len(measurements) >= self.samples):
+                return None
+            generation = self._generation
+        return _Sample(generation, self.poll_interval)
+
+    def end(self, fn_name: str, sample: Optional[_Sample], success: bool = True):
+        """Mark the end of a local invocation, keeping its sample if it ran alone."""
+        usage = sample.finish() if sample is not None else None
+        with self._lock:
+            self._active = max(0, self._active - 1)
+            if usage is None:
+                return
+            if not success or sample.generation != self._generation:
+                self.stats["discarded"] += 1
+                return
+            if len(self._measurements[fn_name]) < self.samples:
+                self._measurements[fn_name].append(usage)
+                self.stats["sampled"] += 1
+
+    def classify(self, fn_name: str) -> Optional[str]:
+        """
+        Get the workload class of a function.
+
+        Returns:
+            Declared class if set, else the measured class once enough samples
+            are in, else None
+        """
+        hint = self.hints(fn_name)
+        if hint in WORKLOAD_CLASSES:
+            return hint
+        profile = self.profile(fn_name)
+        if profile is None:
+            return None
+        if profile["memory_mb"] >= self.memory_mb:
+            return "memory"
+        if profile["cpu_cores"] >= self.cpu_cores:
+            return "cpu"
+        return "io"
+
+    def profile(self, fn_name: str) -> Optional[Dict[str, float]]:
+        """Median resource usage of a function's samples (None until enough samples)."""
+        with self._lock:
+            measurements = list(self._measurements.get(fn_name, []))
+        if len(measurements) < self.samples:
+            return None
+        return {
+            key: float(np.median([m[key] for m in measurements]))
+            for key in ("duration", "cpu_cores", "memory_mb", "net_mb_s")
+        }
+
+    def record_route(self, workload_class: Optional[str]):
+        """Count a routing decision made for a workload class (None: unclassified)."""
+        with self._lock:
+            self._routes[workload_class or "unknown"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-function class, source and measured profile, with routing counts."""
+        with self._lock:
+            functions = list(self._measurements)
+        return {
+            **self.stats,
+            "routes": dict(self._routes),
+            "functions": {
+                fn_name: {
+                    "class": self.classify(fn_name),
+                    "declared": self.hints(fn_name) in WORKLOAD_CLASSES,
+                    "samples": len(self._measurements[fn_name]),
+                    "profile": {key: round(value, 4) for key, value in (self.profile(fn_name) or {}).items()}
+                }
+                for fn_name in functions
+            }
+        }
@@ -0,0 +1,52 @@
+"""
+In-flight request tracking for scheduling targets.
+Counts requests this agent currently has outstanding against each node or zone.
+"""
+import threading
+from contextlib import contextmanager
+from collections import defaultdict
+from typing import Dict
+
+
+class InFlightTracker:
+    """Thread-safe per-target counters of outstanding requests."""
+
+    def __init__(self):
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def increment(self, key: str) -> int:
+        """Mark one more request as outstanding for the given target."""
+        with self._lock:
+            self._counts[key] += 1
+            return self._counts[key]
+
+    def decrement(self, key: str) -> int:
+        """Mark one outstanding request for the given target as finished."""
+        with self._lock:
+            self._counts[key] = max(0, self._counts[key] - 1)
+            return self._counts[key]
+
+    @contextmanager
+    def track(self, key: str):
+        """
+        Context manager counting a request as in flight while the block runs.
+
+        Args:
+            key: Node ID or zone key (see circuit_breaker.zone_key) the request is sent to
+        """
+        self.increment(key)
+        try:
+            yield
+        finally:
+            self.decrement(key)
+
+    def get(self, key: str) -> int:
+        """Get the number of requests currently in flight to a target."""
+        with self._lock:
+            return self._counts.get(key, 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Get a copy of all non-zero in-flight counters."""
+        with self._lock:
+            return {key: count for key, count in self._counts.items() if count > 0}
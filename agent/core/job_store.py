@@ -0,0 +1,233 @@
+"""
+Job store for asynchronous invocations.
+Holds the results of /entry?async=1 requests until the client fetches them
+(long-polling /result/<id>) or they expire, and notifies optional callback URLs.
+"""
+import threading
+import time
+import uuid
+import requests
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional
+
+from core import envelope, wire_format
+
+
+def deliver_result(url: str, result: Dict[str, Any], status_code: int,
+                   binary: bool = True, timeout: float = 10):
+    """
+    Post a finished invocation's envelope to an agent's /job/<id> endpoint.
+
+    Args:
+        url: reply_to URL of the entry agent
+        result: Result envelope
+        status_code: HTTP status of the invocation
+        binary: Send a binary frame instead of JSON
+
+    Raises:
+        requests.RequestException: If the delivery failed
+    """
+    if binary:
+        response = requests.post(
+            url, data=wire_format.pack_envelope(result, http_status=status_code),
+            headers={"Content-Type": wire_format.CONTENT_TYPE}, timeout=timeout
+        )
+    else:
+        response = requests.post(
+            url, json={**envelope.to_json(result), "http_status": status_code}, timeout=timeout
+        )
+    response.raise_for_status()
+
+
+class JobStore:
+    """Bounded, TTL'd store of asynchronous invocation results."""
+
+    def __init__(self,
+                 max_jobs: int = 10000,
+                 ttl: float = 600.0,  # Seconds a job (pending or finished) is kept
+                 max_wait: float = 30.0,  # Longest long-poll wait in seconds
+                 callback_timeout: float = 10.0,
+                 on_handoff_expired: Optional[Callable[[Dict[str, Any]], Any]] = None):  # Called per lost handoff
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.max_wait = max_wait
+        self.callback_timeout = callback_timeout
+        self.on_handoff_expired = on_handoff_expired
+
+        # Job ID -> {"status", "created", "result", "http_status", "callback"}, oldest first
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Handoff ID -> {"created", "reply_to", "context"} for requests forwarded asynchronously
+        self._handoffs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self.stats = {
+            "created": 0, "completed": 0, "expired": 0, "rejected": 0,
+            "callbacks_sent": 0, "callbacks_failed": 0,
+            "deliveries_sent": 0, "deliveries_failed": 0,  # Results relayed to other agents
+            "handoffs": 0, "handoffs_expired": 0
+        }
+
+    def create(self, callback_url: Optional[str] = None) -> Optional[str]:
+        """
+        Register a new pending job.
+
+        Args:
+            callback_url: URL the result is posted to when the job finishes
+
+        Returns:
+            Job ID, or None if the store is full of unfinished jobs
+        """
+        with self._cond:
+            lost = self._expire()
+            job_id = None
+            if len(self._jobs) >= self.max_jobs:
+                # Make room by dropping the oldest finished job
+                finished = next((job_id for job_id, job in self._jobs.items()
+                                 if job["status"] != "pending"), None)
+                if finished is not None:
+                    del self._jobs[finished]
+
+            if len(self._jobs) < self.max_jobs:
+                job_id = uuid.uuid4().hex
+                self._jobs[job_id] = {
+                    "status": "pending", "created": time.time(),
+                    "result": None, "http_status": None, "callback": callback_url
+                }
+                self.stats["created"] += 1
+            else:
+                self.stats["rejected"] += 1
+        self._report_lost(lost)
+        return job_id
+
+    def hand_off(self, reply_to: str, context: Dict[str, Any]) -> str:
+        """
+        Register a request this agent forwarded asynchronously. The next agent
+        delivers the result to this agent's /job/<handoff ID> first, which
+        passes it on to reply_to.
+
+        Args:
+            reply_to: Where the result goes next (the upstream agent's /job URL)
+            context: What this agent needs to finish the hop when the result arrives
+
+        Returns:
+            Handoff ID
+        """
+        with self._cond:
+            lost = self._expire()
+            handoff_id = uuid.uuid4().hex
+            self._handoffs[handoff_id] = {"created": time.time(), "reply_to": reply_to, "context": context}
+            self.stats["handoffs"] += 1
+        self._report_lost(lost)
+        return handoff_id
+
+    def take_handoff(self, handoff_id: str) -> Optional[Dict[str, Any]]:
+        """Remove and return a handoff (None if unknown, expired or already taken)."""
+        with self._cond:
+            return self._handoffs.pop(handoff_id, None)
+
+    def complete(self, job_id: str, result: Dict[str, Any], status_code: int) -> bool:
+        """
+        Store a job's result, waking long-polling clients and firing its callback.
+
+        Returns:
+            False if the job is unknown, expired or already finished
+        """
+        if isinstance(result.get("resp"), envelope.StreamBody):
+            result = {**result, "resp": result["resp"].read()}
+
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != "pending":
+                return False
+            job["status"] = "failed" if status_code >= 400 or "error" in result else "done"
+            job["result"] = result
+            job["http_status"] = status_code
+            job["elapsed"] = round(time.time() - job["created"], 6)
+            self.stats["completed"] += 1
+            self._cond.notify_all()
+            callback = job["callback"]
+
+        if callback:
+            threading.Thread(target=self._send_callback, args=(job_id, callback), daemon=True).start()
+        return True
+
+    def wait(self, job_id: str, timeout: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        Get a job, waiting up to timeout seconds (capped at max_wait) for it to finish.
+
+        Returns:
+            Copy of the job, or None if it is unknown or expired
+        """
+        deadline = time.time() + min(max(timeout, 0.0), self.max_wait)
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                remaining = deadline - time.time()
+                if job["status"] != "pending" or remaining <= 0:
+                    return dict(job)
+                self._cond.wait(remaining)
+
+    def _send_callback(self, job_id: str, url: str):
+        """Post a finished job's result to its callback URL (JSON, best effort)."""
+        with self._cond:
+            job = dict(self._jobs.get(job_id) or {})
+        if not job:
+            return
+        try:
+            response = requests.post(url, json={
+                "job_id": job_id, "status": job["status"], "http_status": job["http_status"],
+                "response": envelope.to_json(job["result"])
+            }, timeout=self.callback_timeout)
+            response.raise_for_status()
+            key = "callbacks_sent"
+        except requests.RequestException:
+            key = "callbacks_failed"
+        with self._cond:
+            self.stats[key] += 1
+
+    def record_delivery(self, success: bool):
+        """Count a result this agent relayed to another agent's job store."""
+        with self._cond:
+            self.stats["deliveries_sent" if success else "deliveries_failed"] += 1
+
+    def _expire(self) -> List[Dict[str, Any]]:
+        """
+        Drop jobs and handoffs older than the TTL (caller holds the lock).
+
+        Returns:
+            Handoffs whose result never arrived
+        """
+        now = time.time()
+        while self._jobs:
+            job_id, job = next(iter(self._jobs.items()))
+            if now - job["created"] <= self.ttl:
+                break
+            del self._jobs[job_id]
+            self.stats["expired"] += 1
+
+        lost = []
+        while self._handoffs:
+            handoff_id, handoff = next(iter(self._handoffs.items()))
+            if now - handoff["created"] <= self.ttl:
+                break
+            lost.append(self._handoffs.pop(handoff_id))
+            self.stats["handoffs_expired"] += 1
+        return lost
+
+    def _report_lost(self, lost: List[Dict[str, Any]]):
+        """Pass expired handoffs to on_handoff_expired (outside the lock)."""
+        if self.on_handoff_expired is None:
+            return
+        for handoff in lost:
+            try:
+                self.on_handoff_expired(handoff)
+            except Exception:
+                pass  # Creating a job must not fail for a lost handoff
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get job counters and the number of pending jobs and handoffs."""
+        with self._cond:
+            pending = sum(1 for job in self._jobs.values() if job["status"] == "pending")
+            return {**self.stats, "held": len(self._jobs), "pending": pending,
+                    "handoffs_pending": len(self._handoffs)}
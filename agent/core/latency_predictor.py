@@ -0,0 +1,187 @@
+"""
+Latency prediction for routing decisions.
+Keeps EWMA latency and variance per (node, function) and combines them with
+node load and in-flight counts into an expected completion time.
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Any, Optional, Tuple
+
+
+class LatencyPredictor:
+    """Predicts completion time of a function on a node or zone."""
+
+    def __init__(self,
+                 ewma_alpha: float = 0.2,
+                 confidence: float = 1.0,  # Std deviations added to the expectation
+                 queue_weight: float = 1.0,  # Slowdown per request already in flight
+                 load_weight: float = 0.5,  # Slowdown per unit of normalized load
+                 load_ttl: float = 10.0):  # Seconds a load report stays valid
+
+        self.ewma_alpha = ewma_alpha
+        self.confidence = confidence
+        self.queue_weight = queue_weight
+        self.load_weight = load_weight
+        self.load_ttl = load_ttl
+
+        # EWMA state per (identifier, fn_name): [mean, variance, samples]
+        self._stats: Dict[Tuple[str, str], list] = {}
+        # Latest normalized load per identifier: (timestamp, load)
+        self._node_load: Dict[str, Tuple[float, float]] = {}
+        # Latest used memory and CPU fractions per identifier: (timestamp, used)
+        self._node_memory: Dict[str, Tuple[float, float]] = {}
+        self._node_cpu: Dict[str, Tuple[float, float]] = {}
+
+        # Prediction error tracking: predictor vs. window-mean baseline
+        self._errors = defaultdict(lambda: {"predictor_abs": 0.0, "baseline_abs": 0.0, "count": 0})
+        self._lock = threading.Lock()
+
+    def observe(self, identifier: str, fn_name: str, duration: float,
+                baseline: Optional[float] = None):
+        """
+        Fold an observed latency into the EWMA state.
+
+        Args:
+            identifier: Node ID or zone the request was served by
+            fn_name: Function name
+            duration: Observed latency in seconds
+            baseline: Window-mean estimate prior to this observation, used to
+                      compare prediction error against the mean-based weights
+        """
+        key = (identifier, fn_name)
+        with self._lock:
+            state = self._stats.get(key)
+            if state is None:
+                self._stats[key] = [duration, 0.0, 1]
+                return
+
+            mean, var, samples = state
+
+            # Track error of the estimates made before seeing this sample
+            # (the window mean is 0.0 without recent history, as in TargetSelector)
+            errors = self._errors[fn_name]
+            errors["predictor_abs"] += abs(duration - mean)
+            errors["baseline_abs"] += abs(duration - (baseline or 0.0))
+            errors["count"] += 1
+
+            # Incremental EWMA of mean and variance
+            diff = duration - mean
+            incr = self.ewma_alpha * diff
+            mean += incr
+            var = (1 - self.ewma_alpha) * (var + diff * incr)
+            self._stats[key] = [mean, var, samples + 1]
+
+    def update_node_load(self, identifier: str, load: float):
+        """
+        Record the current normalized load of a node (1.0 = fully busy).
+
+        Args:
+            identifier: Node ID
+            load: Normalized load value
+        """
+        with self._lock:
+            self._node_load[identifier] = (time.time(), load)
+
+    def get_node_load(self, identifier: str) -> float:
+        """Get the latest normalized load of a node (0.0 if unknown or stale)."""
+        with self._lock:
+            entry = self._node_load.get(identifier)
+        if entry is None or time.time() - entry[0] > self.load_ttl:
+            return 0.0
+        return entry[1]
+
+    def update_node_memory(self, identifier: str, used: float):
+        """
+        Record the current memory use of a node as a fraction of its memory.
+
+        Args:
+            identifier: Node ID
+            used: Used memory fraction (1.0 = full)
+        """
+        with self._lock:
+            self._node_memory[identifier] = (time.time(), used)
+
+    def get_node_memory(self, identifier: str, default: Optional[float] = 0.0) -> Optional[float]:
+        """Get the latest used memory fraction of a node (default if unknown or stale)."""
+        with self._lock:
+            entry = self._node_memory.get(identifier)
+        if entry is None or time.time() - entry[0] > self.load_ttl:
+            return default
+        return entry[1]
+
+    def update_node_cpu(self, identifier: str, used: float):
+        """
+        Record the current CPU utilization of a node.
+
+        Args:
+            identifier: Node ID
+            used: Busy fraction of the node's CPU (1.0 = all cores busy)
+        """
+        with self._lock:
+            self._node_cpu[identifier] = (time.time(), used)
+
+    def get_node_cpu(self, identifier: str, default: Optional[float] = None) -> Optional[float]:
+        """Get the latest CPU utilization of a node (default if unknown or stale)."""
+        with self._lock:
+            entry = self._node_cpu.get(identifier)
+        if entry is None or time.time() - entry[0] > self.load_ttl:
+            return default
+        return entry[1]
+
+    def predict(self, identifier: str, fn_name: str, inflight: int = 0) -> Dict[str, Any]:
+        """
+        Predict completion time of a function on a node or zone.
+
+        Args:
+            identifier: Node ID or zone identifier
+            fn_name: Function name
+            inflight: Requests currently in flight to the target
+
+        Returns:
+            Dict with expected completion time, its standard deviation and the
+            score (expected + confidence * stddev) used for ranking
+        """
+        with self._lock:
+            state = self._stats.get((identifier, fn_name))
+            if state is None:
+                # Unknown target: use the function's average so it gets explored
+                known = [s[0] for (_, fn), s in self._stats.items() if fn == fn_name]
+                mean = sum(known) / len(known) if known else 0.0
+                var, samples = 0.0, 0
+            else:
+                mean, var, samples = state
+
+        slowdown = (1 + self.queue_weight * inflight) * (1 + self.load_weight * self.get_node_load(identifier))
+        expected = mean * slowdown
+        stddev = math.sqrt(max(var, 0.0)) * slowdown
+
+        return {
+            "expected": expected,
+            "stddev": stddev,
+            "score": expected + self.confidence * stddev,
+            "samples": samples
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get predictor state and prediction error compared to the window mean."""
+        with self._lock:
+            return {
+                "estimates": {
+                    f"{identifier}/{fn_name}": {
+                        "mean": round(mean, 6),
+                        "stddev": round(math.sqrt(max(var, 0.0)), 6),
+                        "samples": samples
+                    }
+                    for (identifier, fn_name), (mean, var, samples) in self._stats.items()
+                },
+                "errors": {
+                    fn_name: {
+                        "predictor_mae": round(err["predictor_abs"] / err["count"], 6),
+                        "baseline_mae": round(err["baseline_abs"] / err["count"], 6),
+                        "count": err["count"]
+                    }
+                    for fn_name, err in self._errors.items() if err["count"] > 0
+                }
+            }
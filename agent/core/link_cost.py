@@ -0,0 +1,158 @@
+"""
+Link cost estimation between this agent and its peers.
+Learns per-link round-trip time and transfer cost from passive timings of
+forwarded requests and optional lightweight probes.
+"""
+import threading
+import time
+import requests
+from typing import Dict, Any, Optional, Callable, List
+
+from core.config_manager import agent_url
+
+
+class LinkCostEstimator:
+    """Estimates the network overhead of sending a request over a link."""
+
+    def __init__(self,
+                 ewma_alpha: float = 0.2,
+                 default_alpha: float = 0.3,  # Multiplicative hop penalty used until a link is measured
+                 small_payload_bytes: int = 64 * 1024,  # Forwards below this size count as pure RTT
+                 priors: Optional[Dict[str, float]] = None):  # Prior RTT in seconds per zone
+
+        self.ewma_alpha = ewma_alpha
+        self.default_alpha = default_alpha
+        self.small_payload_bytes = small_payload_bytes
+        self.priors = priors or {}
+
+        # Link state keyed by "node:<id>" or "zone:<zone>": rtt, seconds per byte, samples
+        self._links: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._probe_thread = None
+
+    def _update(self, key: str, rtt: Optional[float] = None, per_byte: Optional[float] = None):
+        """Fold RTT and/or per-byte transfer samples into a link's EWMA state."""
+        link = self._links.setdefault(key, {"rtt": None, "per_byte": 0.0, "samples": 0})
+        if rtt is not None:
+            link["rtt"] = rtt if link["rtt"] is None else (
+                (1 - self.ewma_alpha) * link["rtt"] + self.ewma_alpha * rtt
+            )
+        if per_byte is not None:
+            link["per_byte"] = (1 - self.ewma_alpha) * link["per_byte"] + self.ewma_alpha * per_byte
+        link["samples"] += 1
+
+    def record_forward(self, node_id: str, zone: str, elapsed: float,
+                       remote_time: Optional[float], payload_bytes: int = 0):
+        """
+        Record passive timing of a forwarded request.
+
+        Args:
+            node_id: Peer node the request was sent to
+            zone: Zone of the peer node
+            elapsed: Round-trip time measured by this agent
+            remote_time: Processing time reported by the peer (its total_time)
+            payload_bytes: Size of the forwarded payload
+        """
+        if remote_time is None:
+            return
+
+        overhead = max(0.0, elapsed - remote_time)
+        with self._lock:
+            for key in (f"node:{node_id}", f"zone:{zone}"):
+                link = self._links.get(key)
+                if payload_bytes < self.small_payload_bytes or link is None or link["rtt"] is None:
+                    self._update(key, rtt=overhead)
+                else:
+                    # Attribute overhead beyond the known RTT to payload transfer
+                    transfer = max(0.0, overhead - link["rtt"])
+                    self._update(key, per_byte=transfer / payload_bytes)
+
+    def record_probe(self, node_id: str, zone: str, rtt: float):
+        """Record the round-trip time of an explicit probe."""
+        with self._lock:
+            self._update(f"node:{node_id}", rtt=rtt)
+            self._update(f"zone:{zone}", rtt=rtt)
+
+    def estimate_overhead(self, node_id: str, zone: str, payload_bytes: int = 0) -> Optional[float]:
+        """
+        Estimate network overhead of sending a request to a peer.
+
+        Args:
+            node_id: Peer node ID
+            zone: Zone of the peer node
+            payload_bytes: Size of the payload to be sent
+
+        Returns:
+            Estimated overhead in seconds, or None if the link is unknown
+        """
+        with self._lock:
+            for key in (f"node:{node_id}", f"zone:{zone}"):
+                link = self._links.get(key)
+                if link is not None and link["rtt"] is not None:
+                    return link["rtt"] + link["per_byte"] * payload_bytes
+
+        if zone in self.priors:
+            return self.priors[zone]
+        return None
+
+    def penalize(self, duration: float, hop: int, node_id: str, zone: str,
+                 payload_bytes: int = 0) -> float:
+        """
+        Apply the hop penalty of the link towards a peer to an observed duration.
+
+        Args:
+            duration: Observed duration of the offloaded request
+            hop: Hop count reported by the peer
+            node_id: Peer node ID
+            zone: Zone of the peer node
+            payload_bytes: Size of the forwarded payload
+
+        Returns:
+            Penalized duration (falls back to the constant alpha for unknown links)
+        """
+        overhead = self.estimate_overhead(node_id, zone, payload_bytes)
+        if overhead is None:
+            return duration * (1 + self.default_alpha * hop)
+        return duration + overhead * hop
+
+    def start_probing(self, peers: Callable[[], List[Dict[str, Any]]], interval: float,
+                      timeout: float = 2.0, on_response: Optional[Callable[[Any], Any]] = None):
+        """
+        Start a background thread probing each peer's /ping endpoint.
+
+        Args:
+            peers: Callable returning the current list of peer nodes
+            interval: Seconds between probe rounds
+            timeout: Probe request timeout in seconds
+            on_response: Called with the headers of every probe response
+        """
+        if self._probe_thread is not None or interval <= 0:
+            return
+
+        def probe_loop():
+            while True:
+                for node in peers():
+                    try:
+                        start_time = time.time()
+                        response = requests.get(f"{agent_url(node)}/ping", timeout=timeout)
+                        self.record_probe(node["id"], node["zone"], time.time() - start_time)
+                        if on_response is not None:
+                            on_response(response.headers)
+                    except requests.RequestException:
+                        pass  # Unreachable peers are handled by the forwarding path
+                time.sleep(interval)
+
+        self._probe_thread = threading.Thread(target=probe_loop, daemon=True)
+        self._probe_thread.start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current per-link estimates."""
+        with self._lock:
+            return {
+                key: {
+                    "rtt": round(link["rtt"], 6) if link["rtt"] is not None else None,
+                    "per_mb": round(link["per_byte"] * 1024 * 1024, 6),
+                    "samples": link["samples"]
+                }
+                for key, link in self._links.items()
+            }
@@ -0,0 +1,121 @@
+"""
+Data locality tracking for object-backed functions.
+Maps objects (and their buckets) referenced by request payloads to the nodes
+and zones that hold them or have recently fetched them, so target selection
+can prefer candidates close to the data.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, Union
+from urllib.parse import urlparse
+
+
+def object_key(payload: Union[str, bytes, None],
+               payload_ref: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Extract the object a request reads from its payload.
+
+    Args:
+        payload: Inline payload, e.g. an object URL for image-resize
+        payload_ref: Reference of a payload held in the payload store
+
+    Returns:
+        Object key "<host>/<bucket>/<path>" (None if the payload names no object)
+    """
+    if payload_ref:
+        if "bucket" in payload_ref:
+            return f"s3/{payload_ref['bucket']}/{payload_ref['key']}"
+        payload = payload_ref.get("url")
+    if isinstance(payload, bytes):
+        if len(payload) > 2048:
+            return None
+        payload = payload.decode("utf-8", errors="ignore")
+    if not isinstance(payload, str):
+        return None
+
+    url = urlparse(payload.strip())
+    if url.scheme not in ("http", "https", "s3") or not url.netloc:
+        return None
+    return f"{url.netloc}{url.path}"
+
+
+def bucket_key(key: str) -> str:
+    """Get the "<host>/<bucket>" prefix of an object key."""
+    return "/".join(key.split("/", 2)[:2])
+
+
+class LocalityMap:
+    """Tracks which nodes and zones hold or recently fetched each object."""
+
+    def __init__(self,
+                 ttl: float = 600.0,  # Seconds a fetched object is assumed to stay warm
+                 max_objects: int = 10000,
+                 homes: Optional[Dict[str, str]] = None):  # Host or host/bucket -> node ID or zone
+        self.ttl = ttl
+        self.max_objects = max_objects
+        self.homes = homes or {}
+
+        # Object key -> {node ID or zone: last fetch timestamp}, least recent first
+        self._objects: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "unkeyed": 0}
+
+    def record(self, key: Optional[str], node_id: Optional[str] = None, zone: Optional[str] = None):
+        """
+        Record that a node (and its zone) fetched an object.
+
+        Args:
+            key: Object key from object_key (ignored if None)
+            node_id: Node that fetched the object
+            zone: Zone of that node
+        """
+        if key is None:
+            return
+        now = time.time()
+        with self._lock:
+            holders = self._objects.pop(key, {})
+            for identifier in (node_id, zone):
+                if identifier is not None:
+                    holders[identifier] = now
+            self._objects[key] = holders
+            while len(self._objects) > self.max_objects:
+                self._objects.popitem(last=False)
+
+    def holders(self, key: Optional[str]) -> Set[str]:
+        """
+        Get the node IDs and zones holding an object: recent fetchers plus
+        the configured home of its bucket or host.
+        """
+        if key is None:
+            return set()
+        now = time.time()
+        with self._lock:
+            recent = {
+                identifier for identifier, ts in self._objects.get(key, {}).items()
+                if now - ts <= self.ttl
+            }
+        for prefix in (bucket_key(key), key.split("/", 1)[0]):
+            if prefix in self.homes:
+                recent.add(self.homes[prefix])
+        return recent
+
+    def record_choice(self, key: Optional[str], colocated: bool):
+        """Count whether a selection could be served close to its data."""
+        with self._lock:
+            if key is None:
+                self.stats["unkeyed"] += 1
+            elif colocated:
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracked object count and co-located selection counters."""
+        with self._lock:
+            keyed = self.stats["hits"] + self.stats["misses"]
+            return {
+                "objects": len(self._objects),
+                **self.stats,
+                "hit_rate": round(self.stats["hits"] / keyed, 4) if keyed else 0.0
+            }
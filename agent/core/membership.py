@@ -0,0 +1,337 @@
+"""
+SWIM-style gossip membership between agents.
+Every protocol period an agent pings one member (round-robin over a shuffled
+list); if no ack arrives it asks a few other members to ping it on its
+behalf, and only if none of them gets an ack is the member suspected. A
+suspected member that does not refute within the suspicion timeout (by
+gossiping a higher incarnation number) is declared dead. Membership changes
+are disseminated incrementally, piggybacked on pings and acks a bounded
+number of times each. Members start from the static topology and the seeds;
+new agents join through any seed.
+"""
+import math
+import random
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional
+
+from core.config_manager import agent_url
+
+ALIVE = "alive"
+SUSPECT = "suspect"
+DEAD = "dead"
+
+
+class Membership:
+    """Live member list of the cluster, maintained by SWIM failure detection and gossip."""
+
+    def __init__(self,
+                 self_node: Dict[str, Any],
+                 nodes: Optional[List[Dict[str, Any]]] = None,  # Initially known members (static topology)
+                 seeds: Optional[List[Dict[str, Any]]] = None,  # Members to join through
+                 protocol_period: float = 1.0,  # Seconds between probes
+                 ping_timeout: float = 0.3,  # Seconds to wait for a direct or indirect ack
+                 indirect_probes: int = 3,  # Members asked to probe a target that missed its ack
+                 suspicion_timeout: float = 5.0,  # Seconds a suspect has to refute before it is dead
+                 dead_retention: float = 60.0,  # Seconds dead members are remembered
+                 retransmit_mult: int = 3,  # Each update is sent retransmit_mult * log2(members) times
+                 max_updates: int = 8,  # Updates piggybacked per message
+                 on_response: Optional[Callable[[Any], Any]] = None):  # Called with the headers of every reply
+        self.self_id = self_node["id"]
+        self.protocol_period = protocol_period
+        self.ping_timeout = ping_timeout
+        self.indirect_probes = indirect_probes
+        self.suspicion_timeout = suspicion_timeout
+        self.dead_retention = dead_retention
+        self.retransmit_mult = retransmit_mult
+        self.max_updates = max_updates
+        self.on_response = on_response
+
+        now = time.time()
+        self.incarnation = 0
+        # node ID -> {"node", "state", "incarnation", "changed"}
+        self._members: Dict[str, Dict[str, Any]] = {
+            node["id"]: {"node": dict(node), "state": ALIVE, "incarnation": 0, "changed": now}
+            for node in (nodes or []) if node["id"] != self.self_id
+        }
+        self._members[self.self_id] = {"node": dict(self_node), "state": ALIVE, "incarnation": 0, "changed": now}
+        self.seeds = [node for node in (seeds or []) if node["id"] != self.self_id]
+
+        self._broadcasts: Dict[str, Dict[str, Any]] = {}  # node ID -> {"update", "sent"}
+        self._probe_order: List[str] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, indirect_probes))
+        self._thread = None
+        self._stopped = threading.Event()
+        self.stats = {"probes": 0, "indirect_probes": 0, "suspected": 0, "declared_dead": 0,
+                      "refuted": 0, "joined": 0, "updates_received": 0}
+
+    # --- Member state -----------------------------------------------------
+
+    def _update(self, member_id: str) -> Dict[str, Any]:
+        """Gossip update describing a member's current state (caller holds the lock)."""
+        member = self._members[member_id]
+        return {"id": member_id, "state": member["state"],
+                "incarnation": member["incarnation"], "node": member["node"]}
+
+    def _broadcast(self, member_id: str):
+        """Queue a member's current state for dissemination (caller holds the lock)."""
+        self._broadcasts[member_id] = {"update": self._update(member_id), "sent": 0}
+
+    def _set_state(self, member_id: str, state: str, incarnation: int, node: Optional[Dict[str, Any]] = None):
+        """Change a member's state and disseminate it (caller holds the lock)."""
+        member = self._members.get(member_id)
+        if member is None:
+            member = {"node": node, "state": state, "incarnation": incarnation, "changed": time.time()}
+            self._members[member_id] = member
+        if node is not None:
+            member["node"] = node
+        if member["state"] != state:
+            member["changed"] = time.time()
+        member["state"] = state
+        member["incarnation"] = incarnation
+        self._broadcast(member_id)
+
+    def apply(self, update: Dict[str, Any]) -> bool:
+        """
+        Apply a gossip update, following SWIM precedence: a higher incarnation
+        wins, suspect overrides alive at the same incarnation, dead overrides
+        both. Suspicions of this agent are refuted with a new incarnation.
+
+        Args:
+            update: {"id", "state", "incarnation", "node"}
+
+        Returns:
+            True if the update changed the member list
+        """
+        member_id, state, incarnation = update["id"], update["state"], update["incarnation"]
+        with self._lock:
+            self.stats["updates_received"] += 1
+            if member_id == self.self_id:
+                if state != ALIVE and incarnation >= self.incarnation:
+                    self.incarnation = incarnation + 1
+                    self.stats["refuted"] += 1
+                    self._set_state(self.self_id, ALIVE, self.incarnation)
+                return False
+
+            current = self._members.get(member_id)
+            if current is None:
+                if update.get("node") is None:
+                    return False
+                self._set_state(member_id, state, incarnation, update["node"])
+                if state == ALIVE:
+                    self.stats["joined"] += 1
+                return True
+
+            known = current["incarnation"]
+            if state == ALIVE:
+                accept = incarnation > known
+            elif state == SUSPECT:
+                accept = (current["state"] == ALIVE and incarnation >= known) or \
+                         (current["state"] == SUSPECT and incarnation > known)
+            else:
+                accept = current["state"] != DEAD and incarnation >= known
+            if not accept:
+                return False
+            if state == ALIVE and current["state"] == DEAD:
+                self.stats["joined"] += 1
+            self._set_state(member_id, state, incarnation, update.get("node"))
+            return True
+
+    def apply_all(self, updates: List[Dict[str, Any]]):
+        """Apply a list of gossip updates."""
+        for update in updates or []:
+            self.apply(update)
+
+    def _receive(self, message: Dict[str, Any]):
+        """Apply the sender's own update and the updates piggybacked on a message."""
+        self.apply_all(([message["from"]] if message.get("from") else []) + message.get("updates", []))
+
+    def outgoing(self) -> List[Dict[str, Any]]:
+        """
+        Updates to piggyback on the next message: the least-sent first, each
+        retired after retransmit_mult * log2(members) transmissions.
+        """
+        with self._lock:
+            limit = self.retransmit_mult * max(1, math.ceil(math.log2(len(self._members) + 1)))
+            chosen = sorted(self._broadcasts.items(), key=lambda item: item[1]["sent"])[:self.max_updates]
+            updates = []
+            for member_id, broadcast in chosen:
+                broadcast["sent"] += 1
+                updates.append(broadcast["update"])
+                if broadcast["sent"] >= limit:
+                    del self._broadcasts[member_id]
+            return updates
+
+    def self_update(self) -> Dict[str, Any]:
+        """This agent's own alive update, sent with every message."""
+        with self._lock:
+            return self._update(self.self_id)
+
+    # --- Protocol messages ------------------------------------------------
+
+    def handle_ping(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a ping with an ack carrying this agent's updates."""
+        self._receive(body)
+        return {"from": self.self_update(), "updates": self.outgoing()}
+
+    def handle_ping_req(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Probe a member on behalf of the requester and report whether it acked."""
+        self._receive(body)
+        with self._lock:
+            target = self._members.get(body.get("target"))
+            node = target["node"] if target is not None else None
+        ack = node is not None and self._ping(node)
+        return {"ack": ack, "from": self.self_update(), "updates": self.outgoing()}
+
+    def handle_join(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Admit a joining agent and return the full member list."""
+        if body.get("from"):
+            self.apply(body["from"])
+        with self._lock:
+            members = [self._update(member_id) for member_id in self._members]
+        return {"members": members}
+
+    def _post(self, node: Dict[str, Any], endpoint: str, body: Dict[str, Any],
+              timeout: float) -> Optional[Dict[str, Any]]:
+        """Send a gossip message (None on any failure)."""
+        try:
+            response = requests.post(f"{agent_url(node)}{endpoint}", json=body, timeout=timeout)
+            if self.on_response is not None:
+                self.on_response(response.headers)
+            if response.status_code != 200:
+                return None
+            return response.json()
+        except (requests.RequestException, ValueError):
+            return None
+
+    def _ping(self, node: Dict[str, Any]) -> bool:
+        """Ping a member directly; the ack's updates are applied."""
+        reply = self._post(node, "/gossip/ping",
+                           {"from": self.self_update(), "updates": self.outgoing()}, self.ping_timeout)
+        if reply is None:
+            return False
+        self._receive(reply)
+        return True
+
+    def _ping_req(self, helper: Dict[str, Any], target_id: str) -> bool:
+        """Ask a member to ping a target for us."""
+        reply = self._post(helper, "/gossip/ping_req",
+                           {"from": self.self_update(), "target": target_id, "updates": self.outgoing()},
+                           2 * self.ping_timeout)
+        if reply is None:
+            return False
+        self._receive(reply)
+        return bool(reply.get("ack"))
+
+    # --- Protocol loop ----------------------------------------------------
+
+    def _next_target(self) -> Optional[Dict[str, Any]]:
+        """Next member to probe, round-robin over a list reshuffled every pass."""
+        with self._lock:
+            while True:
+                if not self._probe_order:
+                    self._probe_order = [member_id for member_id, member in self._members.items()
+                                         if member_id != self.self_id and member["state"] != DEAD]
+                    random.shuffle(self._probe_order)
+                    if not self._probe_order:
+                        return None
+                member = self._members.get(self._probe_order.pop())
+                if member is not None and member["state"] != DEAD:
+                    return member
+
+    def probe(self):
+        """Run one protocol period: probe a member, then expire suspicions and dead members."""
+        member = self._next_target()
+        if member is not None:
+            self.stats["probes"] += 1
+            target = member["node"]
+            acked = self._ping(target)
+            if not acked:
+                with self._lock:
+                    helpers = [m["node"] for member_id, m in self._members.items()
+                               if member_id not in (self.self_id, target["id"]) and m["state"] == ALIVE]
+                helpers = random.sample(helpers, min(self.indirect_probes, len(helpers)))
+                if helpers:
+                    self.stats["indirect_probes"] += 1
+                    results = self._executor.map(lambda helper: self._ping_req(helper, target["id"]), helpers)
+                    acked = any(list(results))
+            if not acked:
+                with self._lock:
+                    current = self._members.get(target["id"])
+                    if current is not None and current["state"] == ALIVE:
+                        self.stats["suspected"] += 1
+                        self._set_state(target["id"], SUSPECT, current["incarnation"])
+        self._expire()
+
+    def _expire(self):
+        """Declare timed-out suspects dead and forget long-dead members."""
+        now = time.time()
+        with self._lock:
+            for member_id, member in list(self._members.items()):
+                if member["state"] == SUSPECT and now - member["changed"] > self.suspicion_timeout:
+                    self.stats["declared_dead"] += 1
+                    self._set_state(member_id, DEAD, member["incarnation"])
+                elif member["state"] == DEAD and now - member["changed"] > self.dead_retention:
+                    del self._members[member_id]
+                    self._broadcasts.pop(member_id, None)
+
+    def join(self) -> bool:
+        """Fetch the member list from the first reachable seed."""
+        for seed in self.seeds:
+            reply = self._post(seed, "/gossip/join", {"from": self.self_update()}, 2 * self.ping_timeout)
+            if reply is not None:
+                self.apply_all(reply.get("members", []))
+                return True
+        return False
+
+    def start(self):
+        """Join through the seeds and start the protocol loop in a background thread."""
+        if self._thread is not None:
+            return
+
+        def protocol_loop():
+            joined = self.join()
+            while not self._stopped.wait(self.protocol_period):
+                if not joined:
+                    joined = self.join()
+                try:
+                    self.probe()
+                except Exception:
+                    pass  # A failed period must not stop failure detection
+
+        self._thread = threading.Thread(target=protocol_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the protocol loop (the agent leaves silently and will be detected as failed)."""
+        self._stopped.set()
+
+    # --- Views ------------------------------------------------------------
+
+    def topology(self) -> Dict[str, Dict[str, Any]]:
+        """Live topology: node ID -> node for every member not declared dead."""
+        with self._lock:
+            return {member_id: member["node"] for member_id, member in self._members.items()
+                    if member["state"] != DEAD}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get protocol counters and every member's state."""
+        now = time.time()
+        with self._lock:
+            return {
+                **self.stats,
+                "incarnation": self.incarnation,
+                "pending_updates": len(self._broadcasts),
+                "members": {
+                    member_id: {
+                        "state": member["state"],
+                        "incarnation": member["incarnation"],
+                        "since": round(now - member["changed"], 3),
+                        "address": agent_url(member["node"])
+                    }
+                    for member_id, member in self._members.items()
+                }
+            }
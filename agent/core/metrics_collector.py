@@ -1,23 +1,47 @@
 """
 System metrics collection and monitoring utilities.
 Provides system load, CPU usage, and other performance metrics.
+Samples are kept in a multi-resolution time-series store, fed every second by
+a background sampler once started (or on demand, at most once per second).
 """
 import psutil
+import threading
 import time
-from typing import Dict, Any
-from collections import defaultdict, deque
+from typing import Callable, Dict, Any, Optional
+
+from core.timeseries import TimeSeriesStore
+
+# Metrics sampled from the system; extra sources add their own names
+SYSTEM_METRICS = ["cpu_percent", "load_1min", "memory_percent"]
 
 
 class MetricsCollector:
     """Collects and manages system performance metrics."""
 
-    def __init__(self, history_size: int = 100):
-        self.history_size = history_size
-        self.cpu_history = deque(maxlen=history_size)
-        self.load_history = deque(maxlen=history_size)
-        self.memory_history = deque(maxlen=history_size)
+    def __init__(self,
+                 sources: Optional[Dict[str, Callable[[], float]]] = None,  # Extra metric name -> reader
+                 interval: float = 1.0,  # Seconds between samples
+                 **store_config):  # TimeSeriesStore retention (raw_seconds, resolutions)
+        self.sources = sources or {}
+        self.update_interval = interval
+        self.store = TimeSeriesStore(SYSTEM_METRICS + list(self.sources), **store_config)
         self.last_update = 0
-        self.update_interval = 1.0  # Update every second
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start a background thread sampling every interval."""
+        if self._thread is not None or self.update_interval <= 0:
+            return
+        psutil.cpu_percent(interval=None)  # Prime the CPU counter
+
+        def sample_loop():
+            while True:
+                time.sleep(self.update_interval)
+                self._update_metrics()
+
+        self._thread = threading.Thread(target=sample_loop, daemon=True)
+        self._thread.start()
 
     def get_system_load(self) -> Dict[str, Any]:
         """
@@ -29,8 +53,10 @@ class MetricsCollector:
         self._update_metrics()
 
         try:
-            # Get current metrics
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            # Get current metrics; the sampler's latest CPU reading avoids blocking
+            cpu_percent = self.store.latest("cpu_percent") if self._thread is not None else None
+            if cpu_percent is None:
+                cpu_percent = psutil.cpu_percent(interval=0.1)
             load_avg = psutil.getloadavg()
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
@@ -50,15 +76,13 @@ class MetricsCollector:
             }
 
             # Add historical averages
-            if self.cpu_history:
-                load_metrics["cpu_avg_1min"] = round(
-                    sum(list(self.cpu_history)[-60:]) / min(60, len(self.cpu_history)), 2
-                )
+            cpu_window = self.store.window("cpu_percent", 60)
+            if cpu_window["samples"]:
+                load_metrics["cpu_avg_1min"] = round(cpu_window["mean"], 2)
 
-            if self.load_history:
-                load_metrics["load_avg_1min"] = round(
-                    sum(list(self.load_history)[-60:]) / min(60, len(self.load_history)), 2
-                )
+            load_window = self.store.window("load_1min", 60)
+            if load_window["samples"]:
+                load_metrics["load_avg_1min"] = round(load_window["mean"], 2)
 
             return load_metrics
 
@@ -69,24 +93,50 @@ class MetricsCollector:
             }
 
     def _update_metrics(self):
-        """Update historical metrics if enough time has passed."""
-        now = time.time()
-        if now - self.last_update >= self.update_interval:
-            try:
-                # Collect and store metrics
-                cpu_percent = psutil.cpu_percent(interval=None)
-                load_avg = psutil.getloadavg()[0]
-                memory_percent = psutil.virtual_memory().percent
+        """Record a sample if enough time has passed since the last one."""
+        with self._lock:
+            now = time.time()
+            if now - self.last_update < self.update_interval:
+                return
+            self.last_update = now
 
-                self.cpu_history.append(cpu_percent)
-                self.load_history.append(load_avg)
-                self.memory_history.append(memory_percent)
+        try:
+            # Collect and store metrics
+            values = {
+                "cpu_percent": psutil.cpu_percent(interval=None),
+                "load_1min": psutil.getloadavg()[0],
+                "memory_percent": psutil.virtual_memory().percent
+            }
+            for name, read in self.sources.items():
+                try:
+                    values[name] = read()
+                except Exception:
+                    pass  # A failing source must not drop the system sample
+            self.store.record(values, now)
 
-                self.last_update = now
+        except Exception:
+            # Silently ignore metrics collection errors
+            pass
 
-            except Exception:
-                # Silently ignore metrics collection errors
-                pass
+    def get_window(self, minutes: float = 1) -> Dict[str, Any]:
+        """
+        Summarize every metric over the last minutes.
+
+        Args:
+            minutes: Number of minutes to summarize
+
+        Returns:
+            Dictionary mapping metric names to sample count, min, mean, max,
+            P95 and slope per minute
+        """
+        seconds = minutes * 60
+        summary = {}
+        for metric in self.store.metrics:
+            window = self.store.window(metric, seconds)
+            slope = self.store.slope(metric, seconds)
+            window["slope_per_min"] = round(slope * 60, 4) if slope is not None else None
+            summary[metric] = window
+        return summary
 
     def get_load_trend(self, minutes: int = 5) -> Dict[str, Any]:
         """
@@ -98,18 +148,17 @@ class MetricsCollector:
         Returns:
             Dictionary containing trend analysis
         """
-        samples = min(minutes * 60, len(self.load_history))
-        if samples < 2:
+        seconds = minutes * 60
+        now = time.time()
+        recent = self.store.window("load_1min", seconds / 2, now)
+        previous = self.store.window("load_1min", seconds / 2, now - seconds / 2)
+        samples = recent["samples"] + previous["samples"]
+        if not recent["samples"] or not previous["samples"]:
             return {"trend": "insufficient_data", "samples": samples}
 
-        recent_loads = list(self.load_history)[-samples:]
-
-        # Calculate trend
-        first_half = recent_loads[:samples // 2]
-        second_half = recent_loads[samples // 2:]
-
-        avg_first = sum(first_half) / len(first_half)
-        avg_second = sum(second_half) / len(second_half)
+        avg_first = previous["mean"]
+        avg_second = recent["mean"]
+        slope = self.store.slope("load_1min", seconds, now)
 
         trend_direction = "increasing" if avg_second > avg_first else "decreasing"
         trend_magnitude = abs(avg_second - avg_first)
@@ -119,6 +168,7 @@ class MetricsCollector:
             "magnitude": round(trend_magnitude, 3),
             "current_avg": round(avg_second, 3),
             "previous_avg": round(avg_first, 3),
+            "slope_per_min": round(slope * 60, 4) if slope is not None else None,
             "samples": samples,
             "time_period_minutes": minutes
         }
@@ -156,9 +206,8 @@ class MetricsCollector:
                 "trend_analysis": trend,
                 "is_overloaded": self.is_overloaded(),
                 "collection_stats": {
-                    "cpu_samples": len(self.cpu_history),
-                    "load_samples": len(self.load_history),
-                    "memory_samples": len(self.memory_history),
+                    **self.store.get_stats(),
+                    "sampling": self._thread is not None,
                     "last_update": self.last_update
                 }
             }
@@ -167,4 +216,4 @@ class MetricsCollector:
             return {
                 "error": f"Failed to generate performance summary: {str(e)}",
                 "timestamp": time.time()
-            }
\ No newline at end of file
+            }
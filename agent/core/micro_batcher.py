@@ -0,0 +1,171 @@
+"""
+Micro-batching of agent-to-agent forwards.
+Coalesces requests headed to the same agent within a short window into one
+/entry_batch call, so per-request cross-zone overhead is paid once per batch.
+"""
+import json
+import threading
+import time
+import requests
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from core import envelope, wire_format
+
+
+class MicroBatcher:
+    """Collects forwards per destination and sends them as batches."""
+
+    def __init__(self, window: float = 0.002, max_batch: int = 32,
+                 timeout: float = 60, max_workers: int = 16, binary: bool = False,
+                 on_response: Optional[Callable[[Any], Any]] = None):
+        """
+        Args:
+            window: Seconds to wait for more requests after the first one
+            max_batch: Batch size that triggers an immediate send
+            timeout: Request timeout for a batch call in seconds
+            max_workers: Concurrent batch calls in flight
+            binary: Send batches as binary frames and return result envelopes
+                    instead of JSON bodies
+            on_response: Called with the headers of every batch response
+        """
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.binary = binary
+        self.on_response = on_response
+
+        self._pending: Dict[Tuple[str, str], List[tuple]] = {}
+        self._deadlines = deque()  # (deadline, key, batch) in window order
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flusher = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.stats = {"requests": 0, "batches": 0}
+
+    def submit(self, base_url: str, endpoint: str, data: Dict[str, Any]) -> Tuple[int, Any]:
+        """
+        Queue a request for the destination agent and wait for its result.
+
+        Args:
+            base_url: Agent base URL, e.g. http://host:31113
+            endpoint: Endpoint the request is meant for (/entry or /schedule)
+            data: Request body
+
+        Returns:
+            Tuple of (HTTP status, response body) for this request; the body is
+            a result envelope in binary mode
+
+        Raises:
+            requests.RequestException: If the batch call failed or no result
+                                       arrived within the timeout
+        """
+        future = Future()
+        key = (base_url, endpoint)
+        ready = None
+
+        with self._lock:
+            self.stats["requests"] += 1
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = []
+                self._pending[key] = batch
+                self._deadlines.append((time.monotonic() + self.window, key, batch))
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                    self._flusher.start()
+                self._wakeup.notify()
+            batch.append((data, future))
+            if len(batch) >= self.max_batch:
+                ready = self._pending.pop(key)
+
+        if ready is not None:
+            self._executor.submit(self._send, key, ready)
+        try:
+            return future.result(timeout=self.timeout + self.window)
+        except FutureTimeoutError:
+            raise requests.Timeout(f"No batch result from {base_url} within {self.timeout} s")
+
+    def _flush_loop(self):
+        """Send each batch once its window expired, unless it was already sent full."""
+        while True:
+            with self._wakeup:
+                while not self._deadlines:
+                    self._wakeup.wait()
+                deadline, key, batch = self._deadlines[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._wakeup.wait(delay)
+                    continue
+                self._deadlines.popleft()
+                if self._pending.get(key) is not batch:
+                    continue
+                del self._pending[key]
+            self._executor.submit(self._send, key, batch)
+
+    def _send(self, key: Tuple[str, str], batch: List[tuple]):
+        """Send a batch and resolve each request's future as its result streams in."""
+        base_url, endpoint = key
+        futures = [future for _, future in batch]
+        with self._lock:
+            self.stats["batches"] += 1
+
+        try:
+            if self.binary:
+                self._send_frames(base_url, endpoint, batch, futures)
+            else:
+                response = requests.post(
+                    f"{base_url}/entry_batch",
+                    json={"endpoint": endpoint,
+                          "requests": [wire_format.request_to_json(data) for data, _ in batch]},
+                    stream=True,
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                if self.on_response is not None:
+                    self.on_response(response.headers)
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    item = json.loads(line)
+                    futures[item["index"]].set_result((item["status"], item["response"]))
+
+            error = requests.RequestException("Batch response ended before all results arrived")
+        except Exception as e:
+            # Whatever failed (even encoding the batch), no caller may be left waiting
+            error = e if isinstance(e, requests.RequestException) else requests.RequestException(str(e))
+
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def _send_frames(self, base_url: str, endpoint: str, batch: List[tuple], futures: List[Future]):
+        """Send a batch as binary frames: a header frame, then one frame per request."""
+        body = wire_format.pack({"endpoint": endpoint}) + b"".join(
+            wire_format.pack_request(data) for data, _ in batch
+        )
+        response = requests.post(
+            f"{base_url}/entry_batch",
+            data=body,
+            headers={"Content-Type": wire_format.CONTENT_TYPE, "Accept": wire_format.CONTENT_TYPE},
+            stream=True,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        if self.on_response is not None:
+            self.on_response(response.headers)
+        for meta, result in wire_format.iter_frames(response.iter_content(chunk_size=65536)):
+            index = meta.pop("index")
+            status_code = meta.pop("http_status")
+            futures[index].set_result((status_code, envelope.join(meta, result)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching counters and the average batch size."""
+        with self._lock:
+            batches = self.stats["batches"]
+            return {
+                "requests": self.stats["requests"],
+                "batches": batches,
+                "avg_batch_size": round(self.stats["requests"] / batches, 2) if batches else 0.0
+            }
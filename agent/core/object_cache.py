@@ -0,0 +1,212 @@
+"""
+Node-local read-through cache for function inputs.
+Functions such as image-resize download their input from an object URL; the
+agent rewrites such payloads to its own /cache endpoint, which serves the
+object from disk and fetches it from the origin only on a miss. Concurrent
+misses for the same object share a single fetch.
+"""
+import hashlib
+import os
+import shutil
+import threading
+import requests
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import quote, urlparse
+
+
+class _Fetch:
+    """An origin fetch shared by all requests that missed on the same URL."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.data: Optional[bytes] = None
+        self.error: Optional[Exception] = None
+
+
+class ObjectCache:
+    """Disk-backed object cache with a size budget and LRU or LFU eviction."""
+
+    def __init__(self,
+                 base_url: str,
+                 directory: str = "/tmp/agent-object-cache",
+                 max_bytes: int = 1024 ** 3,
+                 eviction: str = "lru",  # lru or lfu
+                 allowed_hosts: Optional[List[str]] = None,  # host:port of origins that may be cached
+                 timeout: float = 60):
+        """
+        Args:
+            base_url: This agent's base URL, e.g. http://host:31113
+        """
+        if eviction not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy: {eviction}")
+
+        self.base_url = base_url
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.allowed_hosts = set(allowed_hosts or [])  # Empty: nothing is cached
+        self.timeout = timeout
+
+        # Entries are not persisted across restarts, so start from an empty directory
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+        # URL -> {"size", "hits"}, least recently used first
+        self._entries: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._fetches: Dict[str, _Fetch] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0, "misses": 0, "shared_misses": 0, "evictions": 0,
+            "bytes_saved": 0, "bytes_fetched": 0
+        }
+
+    def cacheable(self, url: str) -> bool:
+        """
+        Check whether a URL may be served through the cache. Only allowed
+        origins are fetched, so /cache cannot be used as an open proxy.
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.netloc:
+            return False
+        return parsed.netloc in self.allowed_hosts
+
+    def cache_url(self, url: str, base_url: Optional[str] = None) -> str:
+        """
+        Build the cache endpoint URL that serves an object.
+
+        Args:
+            url: Origin URL of the object
+            base_url: Agent whose cache should serve it (defaults to this agent)
+        """
+        return f"{base_url or self.base_url}/cache?url={quote(url, safe='')}"
+
+    def get(self, url: str) -> Tuple[bytes, bool]:
+        """
+        Get an object, reading through to the origin on a miss.
+
+        Args:
+            url: Origin URL of the object
+
+        Returns:
+            Tuple of (object bytes, whether it was served from the cache)
+
+        Raises:
+            ValueError: If the URL is not cacheable
+            requests.RequestException: If the origin fetch failed
+        """
+        if not self.cacheable(url):
+            raise ValueError(f"URL not cacheable: {url}")
+
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                entry["hits"] += 1
+                self._entries.move_to_end(url)
+
+        if entry is not None:
+            data = self._read(url)  # None if the entry was evicted meanwhile
+            if data is not None:
+                with self._lock:
+                    self.stats["hits"] += 1
+                    self.stats["bytes_saved"] += len(data)
+                return data, True
+
+        with self._lock:
+            fetch = self._fetches.get(url)
+            leader = fetch is None
+            if leader:
+                fetch = _Fetch()
+                self._fetches[url] = fetch
+                self.stats["misses"] += 1
+            else:
+                self.stats["shared_misses"] += 1
+
+        if not leader:
+            fetch.done.wait(self.timeout)
+            if fetch.error is not None:
+                raise fetch.error
+            if fetch.data is None:
+                raise requests.Timeout(f"Timed out waiting for shared fetch of {url}")
+            with self._lock:
+                self.stats["bytes_saved"] += len(fetch.data)
+            return fetch.data, True
+
+        try:
+            # Redirects are not followed: they could lead outside the allowed origins
+            response = requests.get(url, timeout=self.timeout, allow_redirects=False)
+            response.raise_for_status()
+            if response.is_redirect:
+                raise requests.HTTPError(f"Origin redirected {url}", response=response)
+            fetch.data = response.content
+            self._store(url, fetch.data)
+            return fetch.data, False
+        except Exception as e:
+            fetch.error = e
+            raise
+        finally:
+            with self._lock:
+                self._fetches.pop(url, None)
+            fetch.done.set()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def _read(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._path(url), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _store(self, url: str, data: bytes):
+        """Write an object to disk and evict entries until the budget holds."""
+        if len(data) > self.max_bytes:
+            return
+        tmp_path = f"{self._path(url)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(url))
+
+        with self._lock:
+            self._drop(url, remove_file=False)
+            self._entries[url] = {"size": len(data), "hits": 0}
+            self._size += len(data)
+            self.stats["bytes_fetched"] += len(data)
+            while self._size > self.max_bytes:
+                self._drop(self._victim())
+                self.stats["evictions"] += 1
+
+    def _victim(self) -> str:
+        """Pick the entry to evict (caller holds the lock)."""
+        if self.eviction == "lfu":
+            # Fewest hits; ties go to the least recently used entry
+            return min(enumerate(self._entries.items()),
+                       key=lambda item: (item[1][1]["hits"], item[0]))[1][0]
+        return next(iter(self._entries))
+
+    def _drop(self, url: str, remove_file: bool = True):
+        """Remove an entry (caller holds the lock)."""
+        entry = self._entries.pop(url, None)
+        if entry is None:
+            return
+        self._size -= entry["size"]
+        if remove_file:
+            try:
+                os.remove(self._path(url))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rate, bytes saved and occupancy of the cache."""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"] + self.stats["shared_misses"]
+            served = self.stats["hits"] + self.stats["shared_misses"]
+            return {
+                **self.stats,
+                "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+                "objects": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes
+            }
@@ -0,0 +1,251 @@
+"""
+Pass-by-reference storage for large request payloads.
+The entry agent stores a large payload once and forwards only a reference;
+the node that finally executes the function fetches it directly, once. The
+default backend is a local directory served by the owning agent at
+/payload/<key>; an S3-compatible store (e.g. the MinIO deployment) can be
+used instead when boto3 is installed.
+"""
+import hashlib
+import os
+import threading
+import time
+import requests
+from collections import defaultdict
+from typing import Dict, Any, Iterable, Iterator, Optional, Union
+
+try:
+    import boto3
+except ImportError:  # Only needed for the s3 backend
+    boto3 = None
+
+
+class PayloadStore:
+    """Stores large payloads and resolves payload references."""
+
+    def __init__(self,
+                 base_url: str,
+                 enabled: bool = False,  # Store large payloads (references are always resolved)
+                 threshold_bytes: int = 256 * 1024,  # Payloads above this size are passed by reference
+                 directory: str = "/tmp/agent-payloads",
+                 ttl: float = 300.0,  # Seconds a stored payload is kept
+                 backend: str = "local",  # local or s3
+                 s3: Optional[Dict[str, Any]] = None,  # endpoint_url, bucket, access_key, secret_key
+                 timeout: float = 60):
+        """
+        Args:
+            base_url: This agent's base URL, e.g. http://host:31113
+        """
+        self.base_url = base_url
+        self.enabled = enabled
+        self.threshold_bytes = threshold_bytes
+        self.directory = directory
+        self.ttl = ttl
+        self.backend = backend
+        self.timeout = timeout
+
+        self.s3_client = None
+        self.bucket = None
+        if backend == "s3":
+            if boto3 is None:
+                raise RuntimeError("payload_store backend 's3' requires boto3")
+            s3 = s3 or {}
+            self.bucket = s3.get("bucket", "agent-payloads")
+            self.s3_client = boto3.client(
+                "s3",
+                endpoint_url=s3.get("endpoint_url"),
+                aws_access_key_id=s3.get("access_key"),
+                aws_secret_access_key=s3.get("secret_key")
+            )
+        os.makedirs(directory, exist_ok=True)  # Also stages streamed uploads for s3
+
+        self._stored: Dict[str, float] = {}  # Key -> store timestamp
+        self._lock = threading.Lock()
+        self.stats = defaultdict(int)
+        self.avoided_by_hop: Dict[int, int] = defaultdict(int)
+
+    def should_store(self, payload: Union[str, bytes]) -> bool:
+        """Check whether a payload's encoded size is large enough to pass by reference."""
+        if not self.enabled or not isinstance(payload, (str, bytes)):
+            return False
+        size = len(payload.encode("utf-8")) if isinstance(payload, str) else len(payload)
+        return size > self.threshold_bytes
+
+    def put(self, payload: Union[str, bytes]) -> Dict[str, Any]:
+        """
+        Store a payload and build its reference.
+
+        Args:
+            payload: Inline payload from the client
+
+        Returns:
+            Reference with the key, size, fetch location and original type
+        """
+        data = payload.encode("utf-8") if isinstance(payload, str) else payload
+        key = hashlib.sha256(data).hexdigest()
+        self._expire()
+
+        with self._lock:
+            known = key in self._stored
+        if not known:
+            if self.s3_client is not None:
+                self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=data)
+            else:
+                # Write then rename, so readers never see a partial file
+                tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._path(key))
+
+        return self._commit(key, len(data), isinstance(payload, str))
+
+    def put_stream(self, chunks: Iterable[bytes], text: bool = False) -> Dict[str, Any]:
+        """
+        Store a payload read chunk by chunk (e.g. from the inbound request body)
+        without holding it in memory.
+
+        Args:
+            chunks: Iterable of payload chunks
+            text: Whether the payload should be resolved back to text
+
+        Returns:
+            Reference to the stored payload
+        """
+        self._expire()
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = os.path.join(self.directory, f"upload.{threading.get_ident()}.{time.time()}.tmp")
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+
+        key = digest.hexdigest()
+        if self.s3_client is not None:
+            self.s3_client.upload_file(tmp_path, self.bucket, key)
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, self._path(key))
+        return self._commit(key, size, text)
+
+    def _commit(self, key: str, size: int, text: bool) -> Dict[str, Any]:
+        """Register a stored payload and build its reference."""
+        with self._lock:
+            self._stored[key] = time.time()
+            self.stats["stored"] += 1
+            self.stats["stored_bytes"] += size
+
+        ref = {"key": key, "size": size, "text": text}
+        if self.s3_client is not None:
+            ref["bucket"] = self.bucket
+        else:
+            ref["url"] = f"{self.base_url}/payload/{key}"
+        return ref
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Get the file of a payload stored by this agent (None if unknown or expired)."""
+        with self._lock:
+            if key not in self._stored or self.s3_client is not None:
+                return None
+        path = self._path(key)
+        return path if os.path.exists(path) else None
+
+    def read(self, key: str) -> Optional[bytes]:
+        """Read a payload stored by this agent (None if unknown or expired)."""
+        path = self.local_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def fetch(self, ref: Dict[str, Any]) -> Union[str, bytes]:
+        """
+        Resolve a reference to the original payload, reading locally when this
+        agent holds it and fetching it from the owner otherwise.
+
+        Raises:
+            requests.RequestException: If the payload could not be fetched
+        """
+        data = self.read(ref["key"]) if self.s3_client is None else None
+        if data is None:
+            if "bucket" in ref and self.s3_client is not None:
+                data = self.s3_client.get_object(Bucket=ref["bucket"], Key=ref["key"])["Body"].read()
+            else:
+                response = requests.get(ref["url"], timeout=self.timeout)
+                response.raise_for_status()
+                data = response.content
+            with self._lock:
+                self.stats["fetched"] += 1
+                self.stats["fetched_bytes"] += len(data)
+        return data.decode("utf-8") if ref.get("text") else data
+
+    def open_stream(self, ref: Dict[str, Any], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Resolve a reference to an iterator of payload chunks, so the payload
+        can be piped to the gateway without buffering it.
+
+        Raises:
+            requests.RequestException: If the payload could not be fetched
+        """
+        path = self.local_path(ref["key"])
+        if path is not None:
+            return self._file_chunks(path, chunk_size)
+
+        if "bucket" in ref and self.s3_client is not None:
+            body = self.s3_client.get_object(Bucket=ref["bucket"], Key=ref["key"])["Body"]
+            chunks = body.iter_chunks(chunk_size)
+        else:
+            response = requests.get(ref["url"], timeout=self.timeout, stream=True)
+            response.raise_for_status()
+            chunks = response.iter_content(chunk_size)
+        with self._lock:
+            self.stats["fetched"] += 1
+            self.stats["fetched_bytes"] += ref["size"]
+        return chunks
+
+    @staticmethod
+    def _file_chunks(path: str, chunk_size: int) -> Iterator[bytes]:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def record_forward(self, hop: int, ref: Dict[str, Any]):
+        """Count the payload bytes a forward avoided by carrying a reference."""
+        with self._lock:
+            self.avoided_by_hop[hop] += ref["size"]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _expire(self):
+        """Drop payloads older than the TTL."""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, ts in self._stored.items() if now - ts > self.ttl]
+            for key in expired:
+                del self._stored[key]
+        for key in expired:
+            try:
+                if self.s3_client is not None:
+                    self.s3_client.delete_object(Bucket=self.bucket, Key=key)
+                else:
+                    os.remove(self._path(key))
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get stored/fetched counters and bytes avoided per forwarding hop."""
+        with self._lock:
+            return {
+                **self.stats,
+                "held": len(self._stored),
+                "bytes_avoided": sum(self.avoided_by_hop.values()),
+                "bytes_avoided_by_hop": dict(self.avoided_by_hop)
+            }
@@ -0,0 +1,166 @@
+"""
+Node pressure signals for offload decisions.
+Reads Linux pressure stall information (PSI) for CPU, memory and I/O, from the
+cgroup v2 group holding the FaaS containers when there is one (so function
+pressure is told apart from system noise) and from /proc/pressure otherwise.
+Stall fractions are computed from the cumulative stall counters between reads,
+so they react within a read interval instead of the tens of seconds the load
+average takes. Without PSI the score falls back to the 1-minute load average
+per core.
+"""
+import os
+import threading
+import time
+import psutil
+from typing import Dict, Any, List, Optional
+
+RESOURCES = ["cpu", "memory", "io"]
+
+
+def parse_psi(text: str) -> Dict[str, Dict[str, float]]:
+    """
+    Parse a PSI file ("some avg10=0.00 avg60=0.00 avg300=0.00 total=0" lines).
+
+    Returns:
+        Dict mapping "some"/"full" to their averages (percent) and total (microseconds)
+    """
+    parsed = {}
+    for line in text.splitlines():
+        kind, _, fields = line.partition(" ")
+        if not fields:
+            continue
+        parsed[kind] = {
+            key: float(value)
+            for key, value in (field.split("=", 1) for field in fields.split())
+        }
+    return parsed
+
+
+class PressureMonitor:
+    """Normalized node pressure score from PSI and FaaS cgroup statistics, cached per read interval."""
+
+    def __init__(self,
+                 psi_root: str = "/proc/pressure",
+                 cgroup_root: str = "/sys/fs/cgroup",
+                 cgroups: Optional[List[str]] = None,  # Candidate FaaS container groups under cgroup_root
+                 threshold: float = 0.2,  # Stall fraction above which the node is under pressure
+                 load_per_core: float = 1.0,  # Load average per core above which the node is loaded (no PSI)
+                 min_interval: float = 0.5):  # Seconds a reading is reused
+        self.psi_root = psi_root
+        self.cgroup_root = cgroup_root
+        self.cgroups = cgroups if cgroups is not None else ["openfaas-fn", "kubepods.slice", "kubepods"]
+        self.threshold = threshold
+        self.load_per_core = load_per_core
+        self.min_interval = min_interval
+        self.cores = psutil.cpu_count() or 1
+
+        self.cgroup = self._find_cgroup()
+        # Path -> (timestamp, cumulative counter) of the previous read
+        self._counters: Dict[str, tuple] = {}
+        self._last: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def _find_cgroup(self) -> Optional[str]:
+        """First configured FaaS cgroup that exists on a cgroup v2 hierarchy."""
+        if not os.path.exists(os.path.join(self.cgroup_root, "cgroup.controllers")):
+            return None
+        for name in self.cgroups:
+            path = os.path.join(self.cgroup_root, name)
+            if os.path.exists(os.path.join(path, "cpu.pressure")):
+                return path
+        return None
+
+    def _read(self, path: str) -> Optional[str]:
+        """Read a proc/sysfs file (None if missing or unreadable)."""
+        try:
+            with open(path, "r") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _rate(self, key: str, total: float, now: float, fallback: float) -> float:
+        """Per-second increase of a cumulative counter since the previous read (caller holds the lock)."""
+        previous = self._counters.get(key)
+        self._counters[key] = (now, total)
+        if previous is None or now - previous[0] <= 0 or total < previous[1]:
+            return fallback
+        return (total - previous[1]) / (now - previous[0])
+
+    def _stall(self, path: str, now: float) -> Optional[float]:
+        """Fraction of time some task stalled on a resource since the previous read."""
+        text = self._read(path)
+        if text is None:
+            return None
+        some = parse_psi(text).get("some")
+        if some is None:
+            return None
+        # First read: the 10 s average stands in for the interval rate
+        return min(1.0, self._rate(path, some["total"], now, some["avg10"] * 1e4) / 1e6)
+
+    def _cgroup_stats(self, now: float) -> Dict[str, Any]:
+        """CPU use, throttling and memory of the FaaS cgroup."""
+        stats: Dict[str, Any] = {"path": self.cgroup}
+        cpu_stat = self._read(os.path.join(self.cgroup, "cpu.stat")) or ""
+        counters = dict(line.split() for line in cpu_stat.splitlines() if len(line.split()) == 2)
+        if "usage_usec" in counters:
+            usage = self._rate("cgroup:usage", float(counters["usage_usec"]), now, 0.0)
+            stats["cpu_cores"] = round(usage / 1e6, 3)
+        if "throttled_usec" in counters:
+            throttled = self._rate("cgroup:throttled", float(counters["throttled_usec"]), now, 0.0)
+            stats["throttled"] = round(min(1.0, throttled / 1e6), 4)
+        current = self._read(os.path.join(self.cgroup, "memory.current"))
+        limit = self._read(os.path.join(self.cgroup, "memory.max"))
+        if current is not None:
+            stats["memory_mb"] = round(int(current) / (1024 ** 2), 1)
+            if limit is not None and limit.strip() != "max":
+                stats["memory_used"] = round(int(current) / int(limit), 4)
+        return stats
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Get the node's current pressure.
+
+        Returns:
+            Dict with per-resource stall fractions, the score (highest stall
+            fraction, or load average per core without PSI), the threshold it
+            is compared against, the level (score / threshold, 1.0 = at the
+            threshold) and whether the node is overloaded
+        """
+        with self._lock:
+            now = time.time()
+            if self._last is not None and now - self._last["timestamp"] < self.min_interval:
+                return self._last
+
+            root = self.cgroup
+            stalls = {}
+            for resource in RESOURCES:
+                stall = None
+                if root is not None:
+                    stall = self._stall(os.path.join(root, f"{resource}.pressure"), now)
+                if stall is None:
+                    stall = self._stall(os.path.join(self.psi_root, resource), now)
+                if stall is not None:
+                    stalls[resource] = round(stall, 4)
+
+            if stalls:
+                source, score, threshold = "psi", max(stalls.values()), self.threshold
+            else:
+                source, score = "loadavg", psutil.getloadavg()[0] / self.cores
+                threshold = self.load_per_core
+
+            self._last = {
+                "source": source,
+                "cgroup": self._cgroup_stats(now) if root is not None else None,
+                **stalls,
+                "score": round(score, 4),
+                "threshold": threshold,
+                "level": round(score / threshold, 4) if threshold > 0 else 0.0,
+                "overloaded": score > threshold,
+                "cores": self.cores,
+                "timestamp": now
+            }
+            return self._last
+
+    def overloaded(self) -> bool:
+        """Check whether the node is above its pressure threshold."""
+        return self.sample()["overloaded"]
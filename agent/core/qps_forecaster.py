@@ -0,0 +1,126 @@
+"""
+Per-function QPS forecasting for architecture selection.
+Holt's linear trend method (Holt-Winters with an additive season when
+season_length is set) over the QPS samples of the tail-ratio scheduler, so
+architecture weights can follow where load is heading rather than where it was.
+"""
+import math
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional
+
+
+class QPSForecaster:
+    """Exponential-smoothing forecaster of per-function QPS, with forecast error tracking."""
+
+    def __init__(self,
+                 alpha: float = 0.5,  # Level smoothing
+                 beta: float = 0.3,  # Trend smoothing
+                 gamma: float = 0.1,  # Season smoothing (only with season_length)
+                 season_length: int = 0,  # Samples per season (0: no seasonality)
+                 horizon: int = 3):  # Samples to look ahead
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.season_length = season_length
+        self.horizon = horizon
+
+        # fn_name -> {"level", "trend", "season", "samples"}
+        self._state: Dict[str, Dict[str, Any]] = {}
+        # fn_name -> forecasts awaiting their observation: (target sample, forecast)
+        self._pending: Dict[str, deque] = defaultdict(deque)
+        # fn_name -> last observed values, for the naive (persistence) baseline
+        self._history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.horizon))
+        self._errors = defaultdict(lambda: {"abs": 0.0, "sq": 0.0, "naive_abs": 0.0, "count": 0})
+        self._lock = threading.Lock()
+
+    def observe(self, fn_name: str, qps: float):
+        """
+        Fold a QPS sample into the model, scoring the forecast made for it.
+
+        Args:
+            fn_name: Function name
+            qps: QPS measured over the last sampling interval
+        """
+        with self._lock:
+            state = self._state.get(fn_name)
+            if state is None:
+                state = {"level": qps, "trend": 0.0, "season": [0.0] * self.season_length, "samples": 0}
+                self._state[fn_name] = state
+            else:
+                season = self._season(state, state["samples"])
+                level = self.alpha * (qps - season) + (1 - self.alpha) * (state["level"] + state["trend"])
+                state["trend"] = self.beta * (level - state["level"]) + (1 - self.beta) * state["trend"]
+                if self.season_length:
+                    index = state["samples"] % self.season_length
+                    state["season"][index] = self.gamma * (qps - level) + (1 - self.gamma) * season
+                state["level"] = level
+
+            self._score(fn_name, state["samples"], qps)
+            state["samples"] += 1
+            self._pending[fn_name].append(
+                (state["samples"] - 1 + self.horizon, self._project(state, self.horizon))
+            )
+
+    def _season(self, state: Dict[str, Any], sample: int) -> float:
+        """Seasonal component for a sample index (caller holds the lock)."""
+        if not self.season_length:
+            return 0.0
+        return state["season"][sample % self.season_length]
+
+    def _project(self, state: Dict[str, Any], steps: int) -> float:
+        """Forecast `steps` samples past the latest one (caller holds the lock)."""
+        last = state["samples"] - 1
+        value = state["level"] + steps * state["trend"] + self._season(state, last + steps)
+        return max(0.0, value)
+
+    def _score(self, fn_name: str, sample: int, qps: float):
+        """Compare a new sample against the forecast made for it (caller holds the lock)."""
+        pending = self._pending[fn_name]
+        history = self._history[fn_name]
+        while pending and pending[0][0] < sample:
+            pending.popleft()
+        if pending and pending[0][0] == sample:
+            _, forecast = pending.popleft()
+            errors = self._errors[fn_name]
+            errors["abs"] += abs(qps - forecast)
+            errors["sq"] += (qps - forecast) ** 2
+            # Naive forecast: the value seen `horizon` samples earlier
+            errors["naive_abs"] += abs(qps - history[0]) if len(history) == self.horizon else 0.0
+            errors["count"] += 1
+        history.append(qps)
+
+    def forecast(self, fn_name: str, steps: Optional[int] = None) -> Optional[float]:
+        """
+        Forecast a function's QPS.
+
+        Args:
+            fn_name: Function name
+            steps: Samples to look ahead (defaults to the configured horizon)
+
+        Returns:
+            Forecast QPS, or None before the first sample
+        """
+        with self._lock:
+            state = self._state.get(fn_name)
+            if state is None:
+                return None
+            return self._project(state, self.horizon if steps is None else steps)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current forecast and forecast error per function."""
+        with self._lock:
+            stats = {}
+            for fn_name, state in self._state.items():
+                errors = self._errors[fn_name]
+                count = errors["count"]
+                stats[fn_name] = {
+                    "level": round(state["level"], 4),
+                    "trend": round(state["trend"], 4),
+                    "forecast": round(self._project(state, self.horizon), 4),
+                    "mae": round(errors["abs"] / count, 4) if count else None,
+                    "rmse": round(math.sqrt(errors["sq"] / count), 4) if count else None,
+                    "naive_mae": round(errors["naive_abs"] / count, 4) if count else None,
+                    "scored": count
+                }
+            return {"horizon": self.horizon, "functions": stats}
@@ -0,0 +1,96 @@
+"""
+Retry and fallback policy for failed requests.
+Re-routes a failed attempt once through another architecture, bounded by a
+retry budget so retries cannot amplify into a retry storm.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional
+
+
+class RetryPolicy:
+    """Decides whether and where a failed request may be retried."""
+
+    # Default architecture to fall back to when an attempt fails
+    DEFAULT_FALLBACK = {
+        "decentralized": "federated",
+        "federated": "centralized",
+        "centralized": "decentralized"
+    }
+
+    def __init__(self,
+                 budget_ratio: float = 0.1,  # Retries allowed per request in the window
+                 min_retries: int = 3,  # Retries always allowed per window at low traffic
+                 window: float = 10.0,  # Budget window in seconds
+                 fallback: Optional[Dict[str, str]] = None,
+                 enabled: bool = True):
+
+        self.budget_ratio = budget_ratio
+        self.min_retries = min_retries
+        self.window = window
+        self.fallback = dict(self.DEFAULT_FALLBACK, **(fallback or {}))
+        self.enabled = enabled
+
+        self.requests = deque()  # Timestamps of first attempts
+        self.retries = deque()  # Timestamps of retries spent
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        """Drop budget entries that left the window."""
+        for log in (self.requests, self.retries):
+            while log and now - log[0] > self.window:
+                log.popleft()
+
+    def record_request(self):
+        """Count a first attempt towards the retry budget."""
+        now = time.time()
+        with self._lock:
+            self.requests.append(now)
+            self._prune(now)
+            self.counters["requests"] += 1
+
+    def try_acquire(self) -> bool:
+        """
+        Spend one retry from the budget.
+
+        Returns:
+            True if the retry is allowed, False if the budget is exhausted
+        """
+        if not self.enabled:
+            return False
+
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            allowed = self.budget_ratio * len(self.requests) + self.min_retries
+            if len(self.retries) >= allowed:
+                self.counters["retries_denied"] += 1
+                return False
+            self.retries.append(now)
+            self.counters["retries_spent"] += 1
+            return True
+
+    def fallback_arch(self, arch: str) -> str:
+        """Get the architecture a failed attempt should be re-routed through."""
+        return self.fallback.get(arch, "decentralized")
+
+    def record_retry_outcome(self, success: bool):
+        """Count whether a retry attempt succeeded."""
+        with self._lock:
+            self.counters["retries_succeeded" if success else "retries_failed"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get retry counters and current budget usage."""
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            return {
+                "counters": dict(self.counters),
+                "budget": {
+                    "window_requests": len(self.requests),
+                    "window_retries": len(self.retries),
+                    "allowed": round(self.budget_ratio * len(self.requests) + self.min_retries, 2)
+                }
+            }
@@ -3,12 +3,38 @@
 Main scheduler service that orchestrates function execution
 across different architectures (centralized, federated, decentralized).
 """
+import json
 import time
 import random
 import psutil
 import requests
 from collections import defaultdict, deque
+from contextlib import nullcontext
+from urllib.parse import urlparse
+from core import envelope, wire_format
+from core.admission_controller import AdmissionController, AdmissionRejected
+from core.autoscaler import ScalingController
+from core.circuit_breaker import CircuitBreakerRegistry, zone_key
+from core.config_manager import agent_url
+from core.cluster_view import ClusterView
+from core.cold_start import ColdStartTracker, Prewarmer
 from core.execution_engine import ExecutionEngine
+from core.fair_queue import TenantFairness
+from core.function_profiler import FunctionProfiler
+from core.inflight_tracker import InFlightTracker
+from core.latency_predictor import LatencyPredictor
+from core.link_cost import LinkCostEstimator
+from core.micro_batcher import MicroBatcher
+from core.payload_store import PayloadStore
+from core.pressure import PressureMonitor
+from core.qps_forecaster import QPSForecaster
+from core.locality_map import LocalityMap, object_key
+from core.membership import Membership
+from core.metrics_collector import MetricsCollector
+from core.object_cache import ObjectCache
+from core.job_store import JobStore
+from core.retry_policy import RetryPolicy
+from core.slo_controller import SLOController
 from core.tail_scheduler import TailRatioScheduler
 from core.target_selector import TargetSelector
 
@@ -17,75 +43,321 @@ class SchedulerService:
     
     def __init__(self, config_manager):
         self.config_manager = config_manager
-        self.execution_engine = ExecutionEngine()
-        self.tail_scheduler = TailRatioScheduler()
-        self.target_selector = TargetSelector()
+        gateway_config = config_manager.get_section("gateway")
+        self.execution_engine = ExecutionEngine(
+            local_gateway_url=f"{gateway_config.get('url', 'http://127.0.0.1:31112')}/function",
+            gateway_auth=(gateway_config["user"], gateway_config.get("password", ""))
+            if "user" in gateway_config else None
+        )
+        # Optional QPS forecasting so architecture ratios shift ahead of load ramps
+        forecast_config = dict(config_manager.get_section("forecast"))
+        forecaster = QPSForecaster(**forecast_config) if forecast_config.pop("enabled", False) else None
+        self.tail_scheduler = TailRatioScheduler(forecaster=forecaster)
+        
+        # Architecture policies selectable per function for dynamic architecture
+        slo_config = dict(config_manager.get_section("arch_policy").get("slo") or {})
+        self.arch_policies = {
+            "tail_ratio": self.tail_scheduler,
+            "slo": SLOController(
+                slo_lookup=lambda fn_name: config_manager.get_function_config(fn_name).get("slo_p95"),
+                **slo_config
+            )
+        }
+        self.inflight = InFlightTracker()
+        self.predictor = LatencyPredictor()
+        
+        # PSI / FaaS cgroup pressure of this node, used by the offload checks
+        self.pressure = PressureMonitor(**config_manager.get_section("pressure"))
+        
+        # Per-second node metrics (with the pressure score) kept at several resolutions
+        self.metrics = MetricsCollector(
+            sources={"pressure": lambda: self.pressure.sample()["score"]},
+            **config_manager.get_section("metrics")
+        )
+        self.metrics.start()
+        
+        # Per-target circuit breakers; failures are recorded with a latency penalty
+        breaker_config = dict(config_manager.get_section("circuit_breaker"))
+        self.failure_penalty = breaker_config.pop("failure_penalty", 10.0)
+        self.breakers = CircuitBreakerRegistry(**breaker_config)
+        
+        # Objects read by requests and the nodes/zones that hold them
+        locality_config = dict(config_manager.get_section("locality"))
+        locality_slack = locality_config.pop("slack", 2)
+        self.locality = LocalityMap(**locality_config)
+        
+        # Workload class per function (declared or sampled on this gateway) for profiled routing
+        profiling_config = dict(config_manager.get_section("profiling"))
+        load_slack = profiling_config.pop("load_slack", 0.1)
+        memory_limit = profiling_config.pop("memory_limit", 0.85)
+        self.profiler = FunctionProfiler(
+            hints=lambda fn_name: config_manager.get_function_config(fn_name).get("profile"),
+            **profiling_config
+        )
+        
+        self.target_selector = TargetSelector(
+            inflight=self.inflight, predictor=self.predictor, breakers=self.breakers,
+            locality=self.locality, locality_slack=locality_slack,
+            profiler=self.profiler, load_slack=load_slack, memory_limit=memory_limit
+        )
         
         # Performance tracking
         self.response_log = defaultdict(deque)
         self.total_time_log = defaultdict(deque)
         self.TIME_WINDOW = 60
         self.TOTAL_TIME_WINDOW = 60
-        self.alpha = 0.3  # Hop penalty factor
+        self.DEFAULT_MAX_HOPS = 2
+        
+        # Offload loop prevention counters
+        self.loop_counters = defaultdict(int)
+        
+        # Per-link hop penalties learned from forwards and optional probes
+        link_config = config_manager.get_section("link_cost")
+        self.link_cost = LinkCostEstimator(
+            ewma_alpha=link_config.get("ewma_alpha", 0.2),
+            default_alpha=link_config.get("default_alpha", 0.3),
+            priors=link_config.get("priors")
+        )
+        
+        # Re-routing of failed attempts, bounded by a retry budget
+        retry_config = config_manager.get_section("retry")
+        self.retry_policy = RetryPolicy(
+            budget_ratio=retry_config.get("budget_ratio", 0.1),
+            min_retries=retry_config.get("min_retries", 3),
+            window=retry_config.get("window", 10.0),
+            fallback=retry_config.get("fallback"),
+            enabled=retry_config.get("enabled", True)
+        )
+        
+        # Adaptive concurrency limits for the entry point, local gateway and targets
+        self.admission = AdmissionController(**config_manager.get_section("admission"))
+        
+        # Weighted fair sharing between tenants identified by the request tag
+        self.fairness = TenantFairness(config_manager.get_section("tenants"))
+        
+        # Agent-to-agent wire format: JSON, or binary frames with a per-peer fallback
+        # to JSON for agents that do not understand them (mixed-version clusters)
+        self.binary_wire = config_manager.get_section("wire").get("format", "json") == "binary"
+        self.json_peers = set()  # Base URLs of peers that answered a frame with JSON
+        
+        # Stream pass-by-reference payloads and results in chunks instead of buffering them
+        stream_config = config_manager.get_section("streaming")
+        self.streaming = stream_config.get("enabled", False)
+        self.stream_chunk_size = int(stream_config.get("chunk_kb", 64) * 1024)
+        
+        # Large payloads are stored once at the entry agent and forwarded by reference;
+        # references from other agents are resolved even when storing is disabled here
+        store_config = dict(config_manager.get_section("payload_store"))
+        threshold_kb = store_config.pop("threshold_kb", 256)
+        self.payload_store = PayloadStore(
+            agent_url(config_manager.self_node),
+            threshold_bytes=int(threshold_kb * 1024),
+            **store_config
+        )
+        
+        # Node-local read-through cache for object URL inputs of opted-in functions
+        cache_config = dict(config_manager.get_section("object_cache"))
+        self.object_cache = None
+        if cache_config.pop("enabled", False):
+            max_mb = cache_config.pop("max_mb", 1024)
+            if "allowed_hosts" not in cache_config:
+                cache_config["allowed_hosts"] = self._object_store_hosts()
+            self.object_cache = ObjectCache(
+                agent_url(config_manager.self_node),
+                max_bytes=int(max_mb * 1024 * 1024),
+                **cache_config
+            )
+        
+        # Results of asynchronous invocations accepted by this agent
+        async_config = dict(config_manager.get_section("async"))
+        async_config.pop("workers", None)  # Used by the API layer
+        self.self_url = agent_url(config_manager.self_node)
+        self.jobs = JobStore(on_handoff_expired=self._handoff_lost, **async_config)
+        
+        # Cold starts are classified per (node, function) and kept out of the
+        # tail-ratio inputs; the optional prewarmer keeps soon-needed nodes warm
+        cold_config = dict(config_manager.get_section("cold_start"))
+        prewarm_config = dict(cold_config.pop("prewarm", None) or {})
+        self.cold_starts = ColdStartTracker(**cold_config)
+        self.prewarmer = None
+        if prewarm_config.pop("enabled", False):
+            self.prewarmer = Prewarmer(self.cold_starts, **prewarm_config)
+            self.prewarmer.start(self._prewarm_candidates, self._prewarm)
+        
+        # Replica scaling hints for functions run on this node's gateway
+        self.autoscaler = ScalingController(
+            self.execution_engine, limits=config_manager.get_function_config,
+            **config_manager.get_section("autoscaling")
+        )
+        self.autoscaler.start()
+        
+        # Load snapshots piggybacked on agent responses, polled only for idle peers
+        self.cluster = ClusterView(
+            config_manager.self_node["id"], self._load_snapshot, on_update=self._on_peer_load,
+            **config_manager.get_section("cluster_view")
+        )
+        self.cluster.start_polling(self._peer_nodes)
+        
+        # Optional SWIM gossip membership; the topology then follows live members
+        membership_config = dict(config_manager.get_section("membership"))
+        self.membership = None
+        if membership_config.pop("enabled", False):
+            membership_config.pop("seeds", None)  # Validated and resolved by the config manager
+            self.membership = Membership(
+                config_manager.self_node, nodes=list(config_manager.static_topology.values()),
+                seeds=config_manager.membership_seeds,
+                on_response=lambda headers: self.cluster.fold(headers, source="polled"),
+                **membership_config
+            )
+            config_manager.attach_membership(self.membership)
+            self.membership.start()
+        self.link_cost.start_probing(
+            self._peer_nodes, link_config.get("probe_interval", 0),
+            on_response=lambda headers: self.cluster.fold(headers, source="polled")
+        )
+        
+        # Optional coalescing of forwards to the same agent into /entry_batch calls
+        batch_config = config_manager.get_section("batching")
+        self.batcher = None
+        if batch_config.get("enabled", False):
+            self.batcher = MicroBatcher(
+                window=batch_config.get("window_ms", 2) / 1000,
+                max_batch=batch_config.get("max_batch", 32),
+                binary=self.binary_wire,
+                on_response=self.cluster.fold
+            )
     
-    def handle_request(self, data):
-        """Handle incoming execution request and route to appropriate architecture."""
+    def handle_request(self, data, force_offload=False):
+        """
+        Handle incoming execution request and route to appropriate architecture.
+        With force_offload the request is not executed on this node if it can be
+        sent elsewhere (used when the admission queue is full).
+        """
         total_start = time.time()
+        data = self._store_large_payload(data)
         
         # Extract request parameters
         request_params = self._extract_request_params(data)
+        request_params["force_offload"] = force_offload
+        self._visit(request_params)
         
         # Dynamic architecture selection if needed
         if request_params["arch"] == "dynamic":
-            request_params["arch"] = self._select_dynamic_architecture(
-                request_params["fn_name"]
-            )
+            # A request may name the policy, e.g. to compare policies from the load generator
+            fn_name = request_params["fn_name"]
+            try:
+                policy_name = data.get("arch_policy") or self.config_manager.get_arch_policy(fn_name)
+                request_params["arch"] = self._select_dynamic_architecture(fn_name, policy_name)
+            except (KeyError, ValueError) as e:
+                return {"response": {"error": f"Unsupported architecture policy: {e}"}, "status": 400}
+            request_params["arch_policy"] = policy_name
+        
+        if request_params["arch"] not in ("centralized", "federated", "decentralized"):
+            return {
+                "response": {"error": f"Unsupported architecture: {request_params['arch']}"},
+                "status": 400
+            }
+        
+        # Only the entry agent retries, so retries are not multiplied along the path
+        is_entry = request_params["attempt"] == 1 and len(request_params["path"]) == 1
+        if is_entry:
+            self.retry_policy.record_request()
+            fn_config = self.config_manager.get_function_config(request_params["fn_name"])
+            # Only functions with a keep-warm input can be prewarmed
+            if (self.prewarmer is not None and fn_config.get("prewarm", True)
+                    and "prewarm_payload" in fn_config):
+                self.prewarmer.record_arrival(request_params["fn_name"])
+        
+        result = self._route_attempt(request_params)
+        attempts = [self._attempt_summary(request_params, result)]
+        
+        if self._is_failed(result["response"]) and is_entry and self.retry_policy.try_acquire():
+            # Re-route once through the fallback architecture with a fresh path
+            retry_params = self._extract_request_params(data)
+            retry_params["arch"] = self.retry_policy.fallback_arch(request_params["arch"])
+            retry_params["attempt"] = 2
+            retry_params["force_offload"] = force_offload
+            self._visit(retry_params)
+            
+            result = self._route_attempt(retry_params)
+            attempts.append(self._attempt_summary(retry_params, result))
+            self.retry_policy.record_retry_outcome(not self._is_failed(result["response"]))
+            request_params = retry_params
+        elif (request_params["attempt"] > 1 and len(request_params["path"]) == 1
+              and not envelope.is_accepted(result["response"])):
+            # A retry of a handed-off request (see retry_handoff) that finished on this agent
+            self.retry_policy.record_retry_outcome(not self._is_failed(result["response"]))
+        
+        # Add execution metadata to the flat envelope
+        total_time = time.time() - total_start
+        result["response"]["total_time"] = round(total_time, 6)
+        result["response"]["hop"] = request_params["hop"]
+        result["response"]["architecture"] = request_params["arch"]
+        if "arch_policy" in request_params:
+            result["response"]["arch_policy"] = request_params["arch_policy"]
+        result["response"]["attempt"] = request_params["attempt"]
+        if len(attempts) > 1:
+            result["response"]["attempts"] = attempts
+        envelope.add_hop(result["response"], self.config_manager.self_node["id"],
+                         request_params["arch"], total_time)
+        
+        return result
+    
+    def _route_attempt(self, params):
+        """Run one routing attempt through the request's architecture handler."""
+        attempt_start = time.time()
         
         try:
             # Route to appropriate architecture handler
-            if request_params["arch"] == "centralized":
-                result = self._handle_centralized(request_params)
-            elif request_params["arch"] == "federated":
-                result = self._handle_federated(request_params)
-            elif request_params["arch"] == "decentralized":
-                result = self._handle_decentralized(request_params)
+            if params["arch"] == "centralized":
+                result = self._handle_centralized(params)
+            elif params["arch"] == "federated":
+                result = self._handle_federated(params)
             else:
-                return {
-                    "response": {"error": f"Unsupported architecture: {request_params['arch']}"},
-                    "status": 400
-                }
-            
-            # Add execution metadata
-            result["response"]["total_time"] = round(time.time() - total_start, 6)
-            result["response"]["hop"] = request_params["hop"]
-            result["response"]["architecture"] = request_params["arch"]
-            
-            # Record performance metrics
-            self._record_total_time(request_params["fn_name"], 
-                                  request_params["arch"], 
-                                  result["response"]["total_time"])
-            
-            return result
-            
+                result = self._handle_decentralized(params)
         except Exception as e:
             return {
                 "response": {"error": f"Execution failed: {str(e)}"},
                 "status": 500
             }
+        
+        # Record performance metrics (an async handoff says nothing about completion
+        # time, and cold starts would read as architecture tail latency)
+        if envelope.is_accepted(result["response"]):
+            pass
+        elif result["response"].get("cold_start"):
+            self.cold_starts.record_excluded()
+        else:
+            self._record_total_time(params["fn_name"], params["arch"],
+                                    round(time.time() - attempt_start, 6))
+        return result
+    
+    def _attempt_summary(self, params, result):
+        """Summarize one attempt for the response's attempt list."""
+        summary = {"architecture": params["arch"], "status": result["status"]}
+        if self._is_failed(result["response"]):
+            summary["failed"] = True
+        return summary
     
     def schedule_function(self, data):
         """Direct function scheduling (used in centralized architecture)."""
+        start_time = time.time()
         request_params = self._extract_request_params(data)
+        self._visit(request_params)
         
         if request_params["arch"] == "centralized":
-            return self._handle_centralized_scheduling(request_params)
+            result = self._handle_centralized_scheduling(request_params)
         elif request_params["arch"] == "federated":
-            return self._handle_federated_scheduling(request_params)
+            result = self._handle_federated_scheduling(request_params)
         else:
             return {
                 "response": {"error": "Unsupported scheduling architecture"},
                 "status": 500
             }
+        
+        envelope.add_hop(result["response"], self.config_manager.self_node["id"],
+                         request_params["arch"], time.time() - start_time)
+        return result
     
     def _extract_request_params(self, data):
         """Extract and validate request parameters."""
@@ -93,20 +365,105 @@ class SchedulerService:
             "tag": data.get("tag", "default"),
             "fn_name": data.get("fn_name", "hello"),
             "payload": data.get("payload", ""),
+            "payload_ref": data.get("payload_ref"),  # Set when the payload is passed by reference
             "deadline": data.get("deadline", ""),
             "hop": data.get("hop", 0),
+            "path": list(data.get("path", [])),  # Node IDs already visited
+            "attempt": data.get("attempt", 1),  # Retry attempt number (set by the entry agent)
+            "reply_to": data.get("reply_to"),  # Entry agent URL for asynchronous results
             "arch": data.get("arch", self.config_manager.get_architecture())
         }
     
-    def _select_dynamic_architecture(self, fn_name):
-        """Select architecture dynamically based on performance metrics."""
+    def _store_large_payload(self, data):
+        """Replace a large inline payload with a reference into the payload store."""
+        if data.get("payload_ref") or not self.payload_store.should_store(data.get("payload")):
+            return data
+        ref = self.payload_store.put(data["payload"])
+        self_node = self.config_manager.self_node
+        self.locality.record(object_key(None, ref), self_node["id"], self_node["zone"])
+        return {**data, "payload": "", "payload_ref": ref}
+    
+    def _data_key(self, params):
+        """Get the object a request reads (None if its payload names none)."""
+        if "data_key" not in params:
+            params["data_key"] = object_key(params["payload"], params.get("payload_ref"))
+        return params["data_key"]
+    
+    def _resolve_payload(self, params):
+        """
+        Get the request payload, fetching it from the payload store if it was
+        passed by reference (as an iterator of chunks when streaming).
+        
+        Returns:
+            Tuple of (payload, error result or None)
+        """
+        ref = params.get("payload_ref")
+        if not ref:
+            return params["payload"], None
+        try:
+            if self.streaming:
+                return self.payload_store.open_stream(ref, self.stream_chunk_size), None
+            return self.payload_store.fetch(ref), None
+        except Exception as e:
+            return None, {"error": f"Payload fetch failed: {str(e)}", "status": "failed"}
+    
+    def _cache_payload(self, params, payload, node):
+        """
+        Rewrite an object URL payload to the object cache of the node whose
+        gateway runs the function, for functions with cache_inputs enabled.
+        """
+        if (self.object_cache is None or not isinstance(payload, str)
+                or not self.config_manager.get_function_config(params["fn_name"]).get("cache_inputs")):
+            return payload
+        url = payload.strip()
+        if not self.object_cache.cacheable(url):
+            return payload
+        return self.object_cache.cache_url(url, agent_url(node))
+    
+    def _visit(self, params):
+        """Append this node to the request's path vector, detecting loops."""
+        self_id = self.config_manager.self_node["id"]
+        params["loop"] = self_id in params["path"]
+        if params["loop"]:
+            self.loop_counters["loops_detected"] += 1
+        else:
+            params["path"].append(self_id)
+    
+    def _max_hops(self, fn_name):
+        """Get the offload hop limit configured for a function."""
+        return self.config_manager.get_function_config(fn_name).get(
+            "max_hops", self.DEFAULT_MAX_HOPS
+        )
+    
+    def _must_stay(self, params):
+        """Check whether a request must not be offloaded any further."""
+        return params["loop"] or params["hop"] >= self._max_hops(params["fn_name"])
+    
+    def _exclude_visited(self, candidates, params, key="id"):
+        """
+        Drop candidates whose node (or zone, with key="zone") is already on the
+        request's path, keeping this node's own entry.
+        """
+        self_node = self.config_manager.self_node
+        topo = self.config_manager.topo_map
+        visited = {topo[node_id][key] for node_id in params["path"] if node_id in topo}
+        visited.discard(self_node[key])
+        
+        filtered = [n for n in candidates if n[key] not in visited]
+        if len(filtered) < len(candidates):
+            self.loop_counters["loops_suppressed"] += 1
+        return filtered
+    
+    def _select_dynamic_architecture(self, fn_name, policy_name="tail_ratio"):
+        """Select architecture dynamically with the given architecture policy."""
         durations_dict = {
             "centralized": self._get_recent_total_times(fn_name + "_centralized"),
             "federated": self._get_recent_total_times(fn_name + "_federated"),
             "decentralized": self._get_recent_total_times(fn_name + "_decentralized")
         }
-        arch_ratios = self.tail_scheduler.update_ratios(fn_name, durations_dict)
-        return self.tail_scheduler.select_arch(arch_ratios)
+        policy = self.arch_policies[policy_name]
+        arch_ratios = policy.update_ratios(fn_name, durations_dict)
+        return policy.select_arch(arch_ratios)
     
     def _handle_centralized(self, params):
         """Handle request in centralized architecture."""
@@ -117,14 +474,11 @@ class SchedulerService:
             # Select target and execute
             available_targets = list(topo.values())
             target = self.target_selector.select_target(
-                available_targets, params["fn_name"], self.response_log
+                available_targets, params["fn_name"], self.response_log,
+                self._selection_policy(params), self._data_key(params)
             )
             
-            start_time = time.time()
-            result = self.execution_engine.invoke_remote_faas(
-                params["fn_name"], params["payload"], target
-            )
-            duration = time.time() - start_time
+            result, duration = self._invoke_target(params, target)
             
             self._record_response_time(target["id"], params["fn_name"], duration)
             return {"response": result, "status": 200}
@@ -142,9 +496,7 @@ class SchedulerService:
         if node_role == "edge-controller":
             return self._handle_federated_edge_controller(params)
         elif node_role == "cloud-controller":
-            result = self.execution_engine.invoke_local_faas(
-                params["fn_name"], params["payload"]
-            )
+            result, _ = self._invoke_local(params)
             return {"response": result, "status": 200}
         else:
             # Forward to edge controller in same zone
@@ -163,29 +515,50 @@ class SchedulerService:
         """Handle request in decentralized architecture."""
         self_node = self.config_manager.self_node
         topo = self.config_manager.topo_map
+        pressure = self.pressure.sample()
+        self.predictor.update_node_load(self_node["id"], pressure["level"])
+        self.predictor.update_node_memory(self_node["id"], psutil.virtual_memory().percent / 100)
+        cpu = self.metrics.store.latest("cpu_percent")
+        if cpu is not None:
+            self.predictor.update_node_cpu(self_node["id"], cpu / 100)
         
-        # Decide whether to execute locally or offload
-        if params["hop"] >= 2 or psutil.getloadavg()[0] <= 2:
+        # Decide whether to execute locally or offload; the predicted policy
+        # compares local and remote completion times instead of a load cut-off
+        # Under load, only tenants holding at least their fair share are offloaded
+        predicted = self._selection_policy(params) == "predicted"
+        forced = params.get("force_offload") and not self._must_stay(params)
+        stay = not pressure["overloaded"] or not self.fairness.over_share(params["tag"])
+        if not forced and (self._must_stay(params) or (not predicted and stay)):
             target = self_node
         else:
-            candidates = list(topo.values())
+            candidates = self._exclude_visited(list(topo.values()), params)
+            if forced:
+                candidates = [n for n in candidates if n["id"] != self_node["id"]] or [self_node]
             target = self.target_selector.select_target(
-                candidates, params["fn_name"], self.response_log
+                candidates, params["fn_name"], self.response_log,
+                self._selection_policy(params), self._data_key(params)
             )
         
-        start_time = time.time()
-        
         if target["id"] != self_node["id"]:
             # Offload to another node
-            result = self._offload_to_node(params, target)
+            start_time = time.time()
+            self.breakers.on_dispatch(target["id"])
+            with self.inflight.track(target["id"]):
+                result = self._offload_to_node(params, target)
             duration = time.time() - start_time
-            duration *= 1 + self.alpha * result.get("hop", 0)
+            if envelope.is_accepted(result):
+                duration = None  # Handed off; the outcome is recorded when the result arrives
+            else:
+                duration = self._apply_link_penalty(
+                    duration, result, target, params["payload"]
+                )
+                success = not self._is_failed(result)
+                duration = self._record_outcome(target["id"], success, duration)
+                if success:
+                    self.locality.record(self._data_key(params), target["id"], target["zone"])
         else:
             # Execute locally
-            result = self.execution_engine.invoke_local_faas(
-                params["fn_name"], params["payload"]
-            )
-            duration = time.time() - start_time
+            result, duration = self._invoke_local(params)
         
         self._record_response_time(target["id"], params["fn_name"], duration)
         return {"response": result, "status": 200}
@@ -204,21 +577,15 @@ class SchedulerService:
         topo = self.config_manager.topo_map
         available_targets = list(topo.values())
         target = self.target_selector.select_target(
-            available_targets, params["fn_name"], self.response_log
+            available_targets, params["fn_name"], self.response_log,
+            self._selection_policy(params), self._data_key(params)
         )
         
-        start_time = time.time()
-        result = self.execution_engine.invoke_remote_faas(
-            params["fn_name"], params["payload"], target
-        )
-        duration = time.time() - start_time
+        result, duration = self._invoke_target(params, target)
         
         self._record_response_time(target["id"], params["fn_name"], duration)
         
-        return {
-            "response": {"resp": result.get("resp")},
-            "status": 200
-        }
+        return {"response": result, "status": 200}
     
     def _handle_federated_scheduling(self, params):
         """Handle direct scheduling in federated architecture."""
@@ -246,21 +613,15 @@ class SchedulerService:
             }
         
         target = self.target_selector.select_target(
-            available_targets, params["fn_name"], self.response_log
+            available_targets, params["fn_name"], self.response_log,
+            self._selection_policy(params), self._data_key(params)
         )
         
-        start_time = time.time()
-        result = self.execution_engine.invoke_remote_faas(
-            params["fn_name"], params["payload"], target
-        )
-        duration = time.time() - start_time
+        result, duration = self._invoke_target(params, target)
         
         self._record_response_time(target["id"], params["fn_name"], duration)
         
-        return {
-            "response": {"resp": result.get("resp")},
-            "status": 200
-        }
+        return {"response": result, "status": 200}
     
     def _handle_federated_edge_controller(self, params):
         """Handle federated scheduling from edge controller perspective."""
@@ -268,14 +629,21 @@ class SchedulerService:
         node_zone = self_node.get("zone")
         topo = self.config_manager.topo_map
         
-        # Decide whether to execute locally or offload
-        if params["hop"] >= 2 or psutil.getloadavg()[0] <= 2:
+        # Decide whether to execute locally or offload; under load, only tenants
+        # holding at least their fair share are offloaded
+        forced = params.get("force_offload") and not self._must_stay(params)
+        stay = not self.pressure.overloaded() or not self.fairness.over_share(params["tag"])
+        if not forced and (self._must_stay(params) or stay):
             target = self_node
         else:
             candidates = [n for n in topo.values() 
                          if n["role"] in ("cloud-controller", "edge-controller")]
+            candidates = self._exclude_visited(candidates, params, key="zone")
+            if forced:
+                candidates = [n for n in candidates if n["zone"] != node_zone] or [self_node]
             target = self.target_selector.select_zone(
-                candidates, params["fn_name"], self.response_log
+                candidates, params["fn_name"], self.response_log,
+                self._selection_policy(params), self._data_key(params)
             )
         
         if target["zone"] != node_zone:
@@ -287,26 +655,33 @@ class SchedulerService:
     
     def _offload_to_zone(self, params, target):
         """Offload request to another zone."""
-        url = f"http://{target['address']}:31113/entry"
         params["hop"] = params["hop"] + 1
         
+        key = zone_key(target["zone"])
+        start_time = time.time()
+        self.breakers.on_dispatch(key)
         try:
-            start_time = time.time()
-            response = requests.post(url, json=params, timeout=60)
-            duration = time.time() - start_time
-            duration *= 1 + self.alpha * response.json().get("hop", 0)
-            
-            self._record_response_time(target["zone"], params["fn_name"], duration)
-            
-            return {
-                "response": {
-                    "message": f"Offloaded to zone {target['zone']}",
-                    "response": response.json()
-                },
-                "status": response.status_code
-            }
-        except requests.RequestException as e:
-            return {"response": {"error": str(e)}, "status": 500}
+            with self.inflight.track(key):
+                status_code, remote_response = self._forward(target, "/entry", params, key)
+        except Exception as e:
+            # Any error must reach the breaker, or a half-open trial slot is never released
+            self._record_outcome(key, False, time.time() - start_time)
+            return {"response": {"error": str(e), "status": "failed"}, "status": 500}
+        
+        if envelope.is_accepted(remote_response):
+            # Handed off; the outcome is recorded when the result arrives
+            return {"response": remote_response, "status": status_code}
+        
+        duration = time.time() - start_time
+        duration = self._apply_link_penalty(duration, remote_response, target, params["payload"])
+        failed = status_code >= 500 or self._is_failed(remote_response)
+        duration = self._record_outcome(key, not failed, duration)
+        if not failed:
+            self.locality.record(self._data_key(params), zone=target["zone"])
+        
+        self._record_response_time(key, params["fn_name"], duration)
+        
+        return {"response": remote_response, "status": status_code}
     
     def _execute_in_local_zone(self, params):
         """Execute function in local zone."""
@@ -317,16 +692,13 @@ class SchedulerService:
         # Select target within local zone
         schedule_targets = [n for n in topo.values() if n["zone"] == node_zone]
         target = self.target_selector.select_target(
-            schedule_targets, params["fn_name"], self.response_log
+            schedule_targets, params["fn_name"], self.response_log,
+            self._selection_policy(params), self._data_key(params)
         )
         
-        start_time = time.time()
-        result = self.execution_engine.invoke_remote_faas(
-            params["fn_name"], params["payload"], target
-        )
-        duration = time.time() - start_time
+        result, duration = self._invoke_target(params, target)
         
-        self._record_response_time(node_zone, params["fn_name"], duration)
+        self._record_response_time(zone_key(node_zone), params["fn_name"], duration)
         
         return {"response": result, "status": 200}
     
@@ -341,43 +713,373 @@ class SchedulerService:
                 "status": 500
             }
         
-        controller = random.choice(controllers)
-        url = f"http://{controller['address']}:31113{endpoint}"
-        
-        try:
-            response = requests.post(url, json=params, timeout=60)
-            return {"response": response.json(), "status": response.status_code}
-        except requests.RequestException as e:
-            return {"response": {"error": str(e)}, "status": 500}
+        controller = random.choice(self.breakers.filter_available(controllers))
+        return self._forward_to_specific_controller(params, controller, endpoint)
     
     def _forward_to_specific_controller(self, params, controller, endpoint):
         """Forward request to a specific controller."""
-        url = f"http://{controller['address']}:31113{endpoint}"
-        
+        start_time = time.time()
+        self.breakers.on_dispatch(controller["id"])
         try:
-            response = requests.post(url, json=params, timeout=60)
-            return {"response": response.json(), "status": response.status_code}
-        except requests.RequestException as e:
-            return {"response": {"error": str(e)}, "status": 500}
+            with self.inflight.track(controller["id"]):
+                status_code, body = self._forward(controller, endpoint, params, controller["id"])
+        except Exception as e:
+            # Any error must reach the breaker, or a half-open trial slot is never released
+            self._record_outcome(controller["id"], False, time.time() - start_time)
+            return {"response": {"error": str(e), "status": "failed"}, "status": 500}
+        
+        if not envelope.is_accepted(body):  # A handoff's outcome is recorded when the result arrives
+            failed = status_code >= 500 or self._is_failed(body)
+            self._record_outcome(controller["id"], not failed, time.time() - start_time)
+        return {"response": body, "status": status_code}
     
     def _offload_to_node(self, params, target):
         """Offload request to another node in decentralized mode."""
-        url = f"http://{target['address']}:31113/entry"
         params["hop"] = params["hop"] + 1
         
         try:
-            response = requests.post(url, json=params, timeout=60)
-            return {
-                "message": f"Offloaded to node {target['id']}",
-                "response": response.json()
-            }
-        except requests.RequestException as e:
-            return {"error": str(e)}
+            _, body = self._forward(target, "/entry", params, target["id"])
+            return body
+        except Exception as e:
+            # Returned as a failed envelope so the caller records it with the breaker
+            return {"error": str(e), "status": "failed"}
+    
+    def _forward(self, node, endpoint, params, key):
+        """
+        Send a request to another agent. An asynchronous request is handed off
+        with this agent's /job/<handoff ID> as reply_to, so its result passes
+        back through this agent (see finish_handoff) on the way to the entry agent.
+        
+        Args:
+            key: Breaker key of the target (node ID or zone key)
+        
+        Returns:
+            Tuple of (HTTP status, result envelope)
+        """
+        if not params.get("reply_to"):
+            return self._post_to_agent(node, endpoint, params)
+        
+        # The entry agent's first attempt may still be retried once the result is in
+        is_entry = len(params["path"]) == 1
+        handoff_id = self.jobs.hand_off(params["reply_to"], {
+            "key": key, "arch": params["arch"], "hop": params["hop"], "attempt": params["attempt"],
+            "entry": is_entry, "retry": dict(params) if is_entry and params["attempt"] == 1 else None
+        })
+        try:
+            status_code, body = self._post_to_agent(
+                node, endpoint, {**params, "reply_to": f"{self.self_url}/job/{handoff_id}"}
+            )
+        except Exception:
+            self.jobs.take_handoff(handoff_id)
+            raise
+        if not envelope.is_accepted(body):
+            self.jobs.take_handoff(handoff_id)  # Answered right away, nothing will be delivered
+        return status_code, body
+    
+    def finish_handoff(self, handoff_id, result, status_code):
+        """
+        Take the delivered result of a request this agent handed off: record the
+        target's breaker outcome and add this hop to the envelope, as a
+        synchronous forward would have.
+        
+        Returns:
+            The handoff ({"reply_to", "context", ...}), or None if it is unknown
+        """
+        handoff = self.jobs.take_handoff(handoff_id)
+        if handoff is None:
+            return None
+        context = handoff["context"]
+        elapsed = time.time() - handoff["created"]
+        failed = status_code >= 500 or self._is_failed(result)
+        self._record_outcome(context["key"], not failed, elapsed)
+        if context["entry"] and context["attempt"] > 1:
+            self.retry_policy.record_retry_outcome(not failed)
+        
+        result["total_time"] = round(elapsed, 6)
+        result["hop"] = context["hop"]
+        result["architecture"] = context["arch"]
+        result["attempt"] = context["attempt"]
+        envelope.add_hop(result, self.config_manager.self_node["id"], context["arch"], elapsed)
+        return handoff
+    
+    def retry_handoff(self, handoff, result, status_code):
+        """
+        Build the retry of an entry agent's first attempt whose handed-off
+        result failed (through the fallback architecture, like a synchronous retry).
+        
+        Returns:
+            Request data for the retry, or None if it is not retried
+        """
+        request_params = handoff["context"]["retry"]
+        failed = status_code >= 500 or self._is_failed(result)
+        if request_params is None or not failed or not self.retry_policy.try_acquire():
+            return None
+        return {
+            **request_params, "path": [], "hop": 0, "attempt": 2,
+            "arch": self.retry_policy.fallback_arch(request_params["arch"]),
+            "reply_to": handoff["reply_to"]
+        }
+    
+    def _handoff_lost(self, handoff):
+        """Record a failure for a handoff whose result never arrived."""
+        self._record_outcome(handoff["context"]["key"], False, time.time() - handoff["created"])
+    
+    def _post_to_agent(self, node, endpoint, params):
+        """
+        Send a request to another agent, through the micro-batcher when enabled.
+        In binary mode the payload and result cross the wire as raw frame bodies;
+        a peer that rejects frames or answers them with JSON is remembered and
+        gets JSON from then on.
+        
+        Returns:
+            Tuple of (HTTP status, result envelope)
+        """
+        base_url = agent_url(node)
+        if params.get("payload_ref"):
+            self.payload_store.record_forward(params["hop"], params["payload_ref"])
+        binary = self.binary_wire and base_url not in self.json_peers
+        if self.batcher is not None and base_url not in self.json_peers:
+            status_code, body = self.batcher.submit(base_url, endpoint, params)
+            return status_code, body if self.binary_wire else envelope.from_json(body)
+        
+        if binary:
+            response = requests.post(
+                f"{base_url}{endpoint}", data=wire_format.pack_request(params), timeout=60,
+                headers={"Content-Type": wire_format.CONTENT_TYPE, "Accept": wire_format.CONTENT_TYPE},
+                stream=self.streaming
+            )
+            content_type = response.headers.get("Content-Type", "")
+            if response.status_code == 415 or not content_type.startswith(wire_format.CONTENT_TYPE):
+                # The peer could not parse the frame, so nothing ran there; resend as JSON
+                response.close()
+                self.json_peers.add(base_url)
+                return self._post_to_agent(node, endpoint, params)
+            self.cluster.fold(response.headers)
+            if self.streaming:
+                # The result body is passed on upstream as it arrives
+                return response.status_code, wire_format.decode_stream(
+                    content_type, response.iter_content(self.stream_chunk_size), response.close
+                )
+        else:
+            response = requests.post(f"{base_url}{endpoint}", json=wire_format.request_to_json(params),
+                                     timeout=60)
+            self.cluster.fold(response.headers)
+        return response.status_code, wire_format.decode_response(
+            response.headers.get("Content-Type", ""), response.content
+        )
+    
+    def _object_store_hosts(self):
+        """
+        host:port of the configured object stores: the payload store's S3
+        endpoint and the hosts of the locality bucket homes.
+        """
+        hosts = set()
+        s3_endpoint = self.config_manager.get_section("payload_store").get("s3", {}).get("endpoint_url")
+        if s3_endpoint:
+            hosts.add(urlparse(s3_endpoint).netloc)
+        for home in self.config_manager.get_section("locality").get("homes", {}):
+            hosts.add(home.split("/", 1)[0])
+        return sorted(host for host in hosts if host)
+    
+    def _selection_policy(self, params):
+        """Get the target selection policy configured for the request's architecture."""
+        return self.config_manager.get_selection_policy(params["arch"])
+    
+    def _invoke_target(self, params, target):
+        """
+        Invoke function on a target node's FaaS gateway, tracking it as in flight.
+        Returns the result and the duration to record (penalized on failure,
+        None if the invocation was rejected before being sent).
+        """
+        payload, error = self._resolve_payload(params)
+        if error is not None:
+            return error, None
+        payload = self._cache_payload(params, payload, target)
+        try:
+            self.admission.acquire(f"target:{target['id']}")
+        except AdmissionRejected:
+            return self._rejected_result(target["id"]), None
+        
+        suspected, replicas = self._cold_start_hint(params["fn_name"], target["id"], target)
+        start_time = time.time()
+        self.breakers.on_dispatch(target["id"])
+        with self.inflight.track(target["id"]), self._track_gateway(params["fn_name"], target["id"]):
+            result = self.execution_engine.invoke_remote_faas(
+                params["fn_name"], payload, target, stream=self.streaming
+            )
+        duration = time.time() - start_time
+        success = not self._is_failed(result)
+        self.admission.release(f"target:{target['id']}", duration, success, params["fn_name"])
+        self._classify_cold_start(result, target["id"], params["fn_name"], duration,
+                                  success, suspected, replicas)
+        if success:
+            self.locality.record(self._data_key(params), target["id"], target["zone"])
+        return result, self._record_outcome(target["id"], success, duration)
+    
+    def _invoke_local(self, params):
+        """Invoke function on the local FaaS gateway, tracking it as in flight."""
+        self_id = self.config_manager.self_node["id"]
+        payload, error = self._resolve_payload(params)
+        if error is not None:
+            return error, None
+        payload = self._cache_payload(params, payload, self.config_manager.self_node)
+        try:
+            self.admission.acquire("local")
+        except AdmissionRejected:
+            return self._rejected_result(self_id), None
+        
+        suspected, replicas = self._cold_start_hint(params["fn_name"], self_id)
+        sample = self.profiler.begin(params["fn_name"])
+        start_time = time.time()
+        self.breakers.on_dispatch(self_id)
+        with self.inflight.track(self_id), self._track_gateway(params["fn_name"], self_id):
+            result = self.execution_engine.invoke_local_faas(
+                params["fn_name"], payload, stream=self.streaming
+            )
+        duration = time.time() - start_time
+        success = not self._is_failed(result)
+        self.profiler.end(params["fn_name"], sample, success)
+        if success:
+            self.cluster.observe_local(duration)
+        self.admission.release("local", duration, success, params["fn_name"])
+        self._classify_cold_start(result, self_id, params["fn_name"], duration,
+                                  success, suspected, replicas)
+        if success:
+            self_node = self.config_manager.self_node
+            self.locality.record(self._data_key(params), self_id, self_node["zone"])
+        return result, self._record_outcome(self_id, success, duration)
+    
+    def _track_gateway(self, fn_name, node_id):
+        """
+        Count an invocation towards scaling if it runs on this node's gateway
+        (demand for autoscaling source "agent"; in-flight count otherwise).
+        """
+        if node_id == self.config_manager.self_node["id"]:
+            return self.autoscaler.track(fn_name)
+        return nullcontext()
+    
+    def _cold_start_hint(self, fn_name, node_id, target=None):
+        """
+        Check before an invocation whether it may hit a cold container, asking
+        the gateway for available replicas after an idle gap if configured.
+        
+        Returns:
+            Tuple of (idle gap elapsed, available replicas or None)
+        """
+        suspected = self.cold_starts.suspect(node_id, fn_name)
+        replicas = None
+        if suspected and self.cold_starts.replica_check:
+            self.cold_starts.record_replica_check()
+            status = self.execution_engine.get_function_status(fn_name, target)
+            if status is not None:
+                replicas = status.get("availableReplicas")
+        return suspected, replicas
+    
+    def _classify_cold_start(self, result, node_id, fn_name, duration, success, suspected, replicas):
+        """Classify a finished invocation, flagging cold starts in its envelope."""
+        if not success:
+            self.cold_starts.touch(node_id, fn_name)
+        elif self.cold_starts.classify(node_id, fn_name, duration, suspected, replicas):
+            result["cold_start"] = True
+    
+    def _prewarm_candidates(self):
+        """Nodes to keep warm in preference order: this node, its zone, then the rest."""
+        self_node = self.config_manager.self_node
+        peers = self._peer_nodes()
+        return ([self_node] + [n for n in peers if n["zone"] == self_node["zone"]]
+                + [n for n in peers if n["zone"] != self_node["zone"]])
+    
+    def _prewarm(self, fn_name, node):
+        """Send a keep-warm invocation of a function to a node's gateway."""
+        payload = self.config_manager.get_function_config(fn_name)["prewarm_payload"]
+        if node["id"] == self.config_manager.self_node["id"]:
+            result = self.execution_engine.invoke_local_faas(fn_name, payload)
+        else:
+            result = self.execution_engine.invoke_remote_faas(fn_name, payload, node)
+        return not self._is_failed(result)
+    
+    def _load_snapshot(self):
+        """Compact load of this node attached to every response it sends."""
+        memory = self.metrics.store.latest("memory_percent")
+        cpu = self.metrics.store.latest("cpu_percent")
+        return {
+            "l": self.pressure.sample()["level"],  # Pressure relative to the offload threshold
+            "m": round(memory / 100, 3) if memory is not None else None,  # Used memory fraction
+            "c": round(cpu / 100, 3) if cpu is not None else None,  # CPU utilization
+            "q": self.admission.queue_depth("entry"),  # Requests admitted or waiting at the entry
+            "g": self.inflight.get(self.config_manager.self_node["id"])  # Invocations on the local gateway
+        }
+    
+    def _on_peer_load(self, node_id, snapshot):
+        """Feed a peer's load snapshot to the latency predictor."""
+        if snapshot.get("l") is not None:
+            self.predictor.update_node_load(node_id, snapshot["l"])
+        if snapshot.get("m") is not None:
+            self.predictor.update_node_memory(node_id, snapshot["m"])
+        if snapshot.get("c") is not None:
+            self.predictor.update_node_cpu(node_id, snapshot["c"])
+    
+    def _rejected_result(self, node_id):
+        """Result for an invocation rejected by the gateway's admission queue."""
+        return {
+            "error": f"Gateway of {node_id} is at its concurrency limit",
+            "status": "failed",
+            "rejected": True,
+            "target_node": node_id
+        }
+    
+    def _is_failed(self, response):
+        """Check whether a result envelope reports a failure."""
+        return envelope.is_failed(response)
+    
+    def _record_outcome(self, key, success, duration):
+        """
+        Record a call outcome with the target's circuit breaker.
+        Failed calls are recorded with at least the failure penalty so they
+        count against the target in response-time based selection.
+        """
+        self.breakers.record(key, success, duration)
+        return duration if success else max(duration, self.failure_penalty)
+    
+    def _peer_nodes(self):
+        """Get all topology nodes other than this one."""
+        self_id = self.config_manager.self_node["id"]
+        return [n for n in self.config_manager.topo_map.values() if n["id"] != self_id]
+    
+    def _payload_size(self, payload):
+        """Get approximate size of a request payload in bytes."""
+        if isinstance(payload, bytes):
+            return len(payload)
+        if isinstance(payload, str):
+            return len(payload.encode("utf-8"))
+        return len(json.dumps(payload))
+    
+    def _apply_link_penalty(self, duration, remote_response, target, payload):
+        """Learn link cost from a forward's timing and apply the link's hop penalty."""
+        payload_bytes = self._payload_size(payload)
+        if not isinstance(remote_response, dict):
+            remote_response = {}
+        self.link_cost.record_forward(
+            target["id"], target["zone"], duration,
+            remote_response.get("total_time"), payload_bytes
+        )
+        return self.link_cost.penalize(
+            duration, remote_response.get("hop", 0),
+            target["id"], target["zone"], payload_bytes
+        )
     
     def _record_response_time(self, node_id, fn_name, duration):
-        """Record response time for performance tracking."""
+        """Record response time for performance tracking (skipped for rejected calls)."""
+        if duration is None:
+            return
         now = time.time()
         key = (node_id, fn_name)
+        
+        # Feed the predictor, passing the window mean so both can be compared
+        recent = [d for ts, d in self.response_log.get(key, []) if now - ts <= self.TIME_WINDOW]
+        baseline = sum(recent) / len(recent) if recent else None
+        self.predictor.observe(node_id, fn_name, duration, baseline)
+        
         self.response_log[key].append((now, duration))
         
         # Clean old entries
@@ -396,8 +1098,9 @@ class SchedulerService:
                now - self.total_time_log[key][0][0] > self.TOTAL_TIME_WINDOW):
             self.total_time_log[key].popleft()
         
-        # Record in tail scheduler
-        self.tail_scheduler.record_arch_perf(arch, total_time)
+        # Record in the architecture policies
+        for policy in self.arch_policies.values():
+            policy.record_arch_perf(arch, total_time)
     
     def _get_recent_total_times(self, key):
         """Get recent total execution times for a specific function-architecture combination."""
@@ -406,8 +1109,41 @@ class SchedulerService:
                 if now - ts <= self.TOTAL_TIME_WINDOW]
     
     def get_architecture_metrics(self):
-        """Get current architecture performance metrics."""
-        return self.tail_scheduler.get_metrics()
+        """Get current architecture performance metrics, with the state of the other policies."""
+        metrics = self.tail_scheduler.get_metrics()
+        metrics["policies"] = {
+            name: policy.get_metrics()
+            for name, policy in self.arch_policies.items() if policy is not self.tail_scheduler
+        }
+        return metrics
+    
+    def get_inflight(self):
+        """Get current in-flight request counts per target."""
+        return self.inflight.snapshot()
+    
+    def get_routing_stats(self):
+        """Get state of the routing components (in-flight counts, latency predictions)."""
+        return {
+            "inflight": self.inflight.snapshot(),
+            "predictor": self.predictor.get_stats(),
+            "links": self.link_cost.get_stats(),
+            "loops": dict(self.loop_counters),
+            "breakers": self.breakers.get_stats(),
+            "retries": self.retry_policy.get_stats(),
+            "admission": self.admission.get_stats(),
+            "tenants": self.fairness.get_stats(),
+            "batching": self.batcher.get_stats() if self.batcher else None,
+            "json_peers": sorted(self.json_peers),
+            "payload_store": self.payload_store.get_stats(),
+            "locality": self.locality.get_stats(),
+            "object_cache": self.object_cache.get_stats() if self.object_cache else None,
+            "jobs": self.jobs.get_stats(),
+            "cold_starts": self.cold_starts.get_stats(),
+            "prewarm": self.prewarmer.get_stats() if self.prewarmer else None,
+            "autoscaling": self.autoscaler.get_stats(),
+            "profiles": self.profiler.get_stats(),
+            "cluster": self.cluster.get_stats()
+        }
     
     def get_recent_durations(self):
         """Get recent durations for all architectures."""
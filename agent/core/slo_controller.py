@@ -0,0 +1,118 @@
+"""
+SLO-driven architecture policy.
+A PI controller per function drives a "centralization level" u in [0, 2] from
+the relative error between the observed P95 total time and a setpoint below
+the function's P95 SLO: u = 0 sends everything decentralized, u = 1 everything
+federated, u = 2 everything centralized, with linear splits in between. The
+integral term is frozen while the output is saturated (anti-windup), and u
+moves by a bounded step per update, faster towards centralization than back,
+since an overloaded architecture's tail grows much faster than it recovers.
+"""
+import math
+import time
+import numpy as np
+from typing import Callable, Dict, Any, List, Optional
+
+from core.arch_policy import ArchitecturePolicy
+
+U_MAX = 2.0
+
+
+class SLOController(ArchitecturePolicy):
+    """PI controller splitting traffic between architectures to hold a P95 SLO."""
+
+    def __init__(self,
+                 slo_lookup: Optional[Callable[[str], Optional[float]]] = None,  # fn_name -> P95 SLO
+                 default_slo: float = 1.0,  # P95 SLO in seconds for functions without one
+                 kp: float = 0.5,  # Proportional gain (per unit of relative error)
+                 ki: float = 0.1,  # Integral gain (per unit of relative error and second)
+                 setpoint: float = 0.8,  # Target P95 as a fraction of the SLO (headroom for noise)
+                 max_step_up: float = 0.5,  # Largest increase of u per update
+                 max_step_down: float = 0.1,  # Largest decrease of u per update
+                 min_samples: int = 10,
+                 recent_samples: int = 50,  # Total times making up the observed P95
+                 sample_interval: float = 2.0):
+        self.slo_lookup = slo_lookup or (lambda fn_name: None)
+        self.default_slo = default_slo
+        self.kp = kp
+        self.ki = ki
+        self.setpoint = setpoint
+        self.max_step_up = max_step_up
+        self.max_step_down = max_step_down
+        self.min_samples = min_samples
+        self.recent_samples = recent_samples
+        self.sample_interval = sample_interval
+
+        # fn_name -> {"u", "integral", "last_update", "p95", "error", "slo"}
+        self._state: Dict[str, Dict[str, Any]] = {}
+
+    def slo(self, fn_name: str) -> float:
+        """Get the P95 SLO of a function in seconds."""
+        return self.slo_lookup(fn_name) or self.default_slo
+
+    def update_ratios(self, fn_name: str, durations_dict: Dict[str, List[float]]) -> Dict[str, float]:
+        """
+        Run one controller step if the sample interval has passed. The
+        observed P95 is taken over the latest total times of each architecture
+        in proportion to the current split, so it tracks the traffic the
+        controller is sending now rather than the whole time window.
+
+        Args:
+            fn_name: Function name to update ratios for
+            durations_dict: Dictionary mapping architecture names to duration lists
+
+        Returns:
+            Updated architecture ratios
+        """
+        now = time.time()
+        state = self._state.setdefault(fn_name, {
+            "u": 0.0, "integral": 0.0, "last_update": now, "p95": None, "error": None, "slo": None
+        })
+        elapsed = now - state["last_update"]
+        ratios = self._split(state["u"])
+        recent = [
+            d for arch, durations in durations_dict.items()
+            for d in durations[-math.ceil(ratios.get(arch, 0) * self.recent_samples):]
+            if ratios.get(arch, 0) > 0
+        ]
+        if elapsed < self.sample_interval or len(recent) < self.min_samples:
+            return ratios
+
+        slo = self.slo(fn_name)
+        p95 = float(np.percentile(recent, 95))
+        target = self.setpoint * slo
+        error = (p95 - target) / target
+        dt = min(elapsed, 5 * self.sample_interval)  # Idle gaps must not dump into the integral
+
+        integral = state["integral"] + self.ki * error * dt
+        u_raw = self.kp * error + integral
+        u_sat = min(max(u_raw, 0.0), U_MAX)
+        # Anti-windup: keep integrating only while the output is not pushed further into saturation
+        if not ((u_raw > U_MAX and error > 0) or (u_raw < 0.0 and error < 0)):
+            state["integral"] = min(max(integral, -U_MAX), U_MAX)
+
+        step = min(max(u_sat - state["u"], -self.max_step_down), self.max_step_up)
+        state.update(u=state["u"] + step, last_update=now, p95=p95, error=error, slo=slo)
+        return self._split(state["u"])
+
+    def _split(self, u: float) -> Dict[str, float]:
+        """Map a centralization level to architecture ratios."""
+        if u <= 1.0:
+            ratios = {"decentralized": 1.0 - u, "federated": u, "centralized": 0.0}
+        else:
+            ratios = {"decentralized": 0.0, "federated": U_MAX - u, "centralized": u - 1.0}
+        return {arch: round(value, 3) for arch, value in ratios.items()}
+
+    def get_metrics(self) -> Dict:
+        """Get per-function SLO, observed P95, error, controller state and ratios."""
+        return {
+            fn_name: {
+                "slo": state["slo"],
+                "p95": round(state["p95"], 6) if state["p95"] is not None else None,
+                "error": round(state["error"], 4) if state["error"] is not None else None,
+                "u": round(state["u"], 4),
+                "integral": round(state["integral"], 4),
+                "arch_ratios": self._split(state["u"])
+            }
+            for fn_name, state in list(self._state.items())
+        }
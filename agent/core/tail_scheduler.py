@@ -3,13 +3,14 @@ Tail-aware scheduler for dynamic architecture selection.
 Monitors tail latency metrics and adjusts architecture ratios accordingly.
 """
 import numpy as np
-import random
 import time
 from collections import defaultdict, deque
 from typing import Dict, List, Tuple
 
+from core.arch_policy import ArchitecturePolicy
 
-class TailRatioScheduler:
+
+class TailRatioScheduler(ArchitecturePolicy):
     """
     Dynamic scheduler that selects architectures based on tail latency metrics.
     Uses P95/P50 ratios to determine when to switch between architectures.
@@ -24,7 +25,8 @@ class TailRatioScheduler:
                  c_hard_f2c=2.7,  # Hard threshold for federated to centralized
                  alpha=0.1,
                  min_samples=10,
-                 sample_interval=2):
+                 sample_interval=2,
+                 forecaster=None):  # Optional QPSForecaster to act on projected load
 
         # Architecture ratio tracking per function
         self.arch_ratios: Dict[str, Dict[str, float]] = defaultdict(lambda: {
@@ -42,6 +44,7 @@ class TailRatioScheduler:
         self.c_hard_f2c = c_hard_f2c
         self.min_samples = min_samples
         self.sample_interval = sample_interval
+        self.forecaster = forecaster
 
         # Performance tracking structures
         self.prev_r_l = defaultdict(lambda: 1.0)  # Previous tail ratio values
@@ -72,6 +75,7 @@ class TailRatioScheduler:
         self.update_times[fn_name].append(now)
 
         # Calculate tail ratios (P95/P50) for each architecture
+        sampled = False
         for arch in ["centralized", "federated", "decentralized"]:
             durations = durations_dict.get(arch, [])
 
@@ -85,11 +89,7 @@ class TailRatioScheduler:
 
                 self.prev_r_l[(fn_name, arch)] = r_l
                 self.last_sample_time[(fn_name, arch)] = now
-
-                # Update QPS tracking
-                qps_now = len(self.update_times[fn_name]) / self.sample_interval
-                self.update_qps_log[fn_name].append(qps_now)
-                self.update_times[fn_name].clear()
+                sampled = True
 
             elif len(durations) <= self.min_samples:
                 r_l = 1.0  # Default ratio for insufficient samples
@@ -98,6 +98,14 @@ class TailRatioScheduler:
 
             r_prime_map[arch] = r_l
 
+        # Update QPS tracking once per sampling round, however many architectures were sampled
+        if sampled:
+            qps_now = len(self.update_times[fn_name]) / self.sample_interval
+            self.update_qps_log[fn_name].append(qps_now)
+            self.update_times[fn_name].clear()
+            if self.forecaster is not None:
+                self.forecaster.observe(fn_name, qps_now)
+
         # Calculate new architecture weights based on QPS and tail ratios
         new_ratios = self._calculate_architecture_weights(fn_name, r_prime_map)
 
@@ -115,9 +123,15 @@ class TailRatioScheduler:
         return self.arch_ratios[fn_name]
 
     def _calculate_architecture_weights(self, fn_name: str, r_prime_map: Dict[str, float]) -> Dict[str, float]:
-        """Calculate architecture weights based on tail ratios and QPS."""
+        """
+        Calculate architecture weights based on tail ratios and QPS. With a
+        forecaster, the projected QPS is used when it exceeds the current one,
+        so capacity is shifted ahead of a ramp but not released ahead of a drop.
+        """
         qps_log = self.update_qps_log[fn_name]
         qps_now = qps_log[-1] if qps_log else 0
+        if self.forecaster is not None:
+            qps_now = max(qps_now, self.forecaster.forecast(fn_name) or 0)
 
         # QPS thresholds for architecture transitions
         qps_threshold_fed = 0.5  # Threshold to consider federated
@@ -182,28 +196,6 @@ class TailRatioScheduler:
 
         return smoothed_ratios
 
-    def select_arch(self, ratio_dict: Dict[str, float]) -> str:
-        """
-        Select architecture based on probability distribution.
-
-        Args:
-            ratio_dict: Dictionary mapping architecture names to selection ratios
-
-        Returns:
-            Selected architecture name
-        """
-        architectures = list(ratio_dict.keys())
-        weights = list(ratio_dict.values())
-
-        # Ensure weights are non-negative
-        weights = [max(0, w) for w in weights]
-
-        # Fallback to decentralized if all weights are zero
-        if sum(weights) == 0:
-            return "decentralized"
-
-        return random.choices(population=architectures, weights=weights, k=1)[0]
-
     def record_arch_perf(self, arch: str, total_time: float):
         """Record performance data for an architecture."""
         if arch in self.arch_perf:
@@ -221,7 +213,8 @@ class TailRatioScheduler:
                 }
                 for arch, perf_deque in self.arch_perf.items()
             },
-            "qps_log": dict(self.update_qps_log)
+            "qps_log": dict(self.update_qps_log),
+            "forecast": self.forecaster.get_stats() if self.forecaster is not None else None
         }
 
     def update_thresholds(self, c_soft_d2f: float, c_hard_d2f: float,
@@ -5,26 +5,45 @@ Implements weighted selection based on historical performance metrics.
 import random
 import time
 from math import prod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from collections import defaultdict, deque
 
+from core.circuit_breaker import zone_key
+
+
+# Selection policies that can be configured per architecture
+SELECTION_POLICIES = ["weighted", "jsq", "p2c", "latency_queue", "predicted", "locality", "profiled"]
+
 
 class TargetSelector:
     """Implements intelligent target selection algorithms."""
 
-    def __init__(self, time_window=60):
+    def __init__(self, time_window=60, inflight=None, predictor=None, breakers=None,
+                 locality=None, locality_slack=2, profiler=None, load_slack=0.1, memory_limit=0.85):
         self.time_window = time_window
+        self.inflight = inflight  # Optional InFlightTracker for queue-aware policies
+        self.predictor = predictor  # Optional LatencyPredictor for the predicted policy
+        self.breakers = breakers  # Optional CircuitBreakerRegistry to skip open targets
+        self.locality = locality  # Optional LocalityMap for the locality policy
+        self.locality_slack = locality_slack  # Extra in-flight requests tolerated for co-location
+        self.profiler = profiler  # Optional FunctionProfiler for the profiled policy
+        self.load_slack = load_slack  # CPU utilization above the least busy target still considered
+        self.memory_limit = memory_limit  # Used memory fraction from which a target is under pressure
 
     def select_target(self, candidates: List[Dict[str, Any]],
                       fn_name: str,
-                      response_log: Dict) -> Dict[str, Any]:
+                      response_log: Dict,
+                      policy: str = "weighted",
+                      data_key: Optional[str] = None) -> Dict[str, Any]:
         """
-        Select optimal target node based on weighted response time distribution.
+        Select optimal target node using the given selection policy.
 
         Args:
             candidates: List of candidate nodes
             fn_name: Function name for performance lookup
             response_log: Historical response time data
+            policy: One of SELECTION_POLICIES (defaults to weighted response time)
+            data_key: Object the request reads, for the locality policy
 
         Returns:
             Selected target node
@@ -32,32 +51,29 @@ class TargetSelector:
         if not candidates:
             raise ValueError("No candidates available for selection")
 
+        if self.breakers is not None:
+            candidates = self.breakers.filter_available(candidates, "id")
+
         if len(candidates) == 1:
             return candidates[0]
 
-        # Calculate weighted response times for each candidate
-        wrt_list = []
-        for node in candidates:
-            node_id = node["id"]
-            avg_response_time = self._get_average_response_time(
-                node_id, fn_name, response_log
-            )
-            wrt_list.append((node, avg_response_time))
-
-        # Use weighted probability distribution for selection
-        selected_node = self._weighted_selection(wrt_list, candidates)
-        return selected_node
+        keyed = [(node, node["id"]) for node in candidates]
+        return self._select(keyed, fn_name, response_log, policy, data_key)
 
     def select_zone(self, candidates: List[Dict[str, Any]],
                     fn_name: str,
-                    response_log: Dict) -> Dict[str, Any]:
+                    response_log: Dict,
+                    policy: str = "weighted",
+                    data_key: Optional[str] = None) -> Dict[str, Any]:
         """
-        Select optimal zone based on weighted response time distribution.
+        Select optimal zone using the given selection policy.
 
         Args:
             candidates: List of candidate nodes with zone information
             fn_name: Function name for performance lookup
             response_log: Historical response time data
+            policy: One of SELECTION_POLICIES (defaults to weighted response time)
+            data_key: Object the request reads, for the locality policy
 
         Returns:
             Selected node representing the chosen zone
@@ -65,21 +81,227 @@ class TargetSelector:
         if not candidates:
             raise ValueError("No zone candidates available for selection")
 
+        if self.breakers is not None:
+            candidates = self.breakers.filter_available(candidates, "zone")
+
         if len(candidates) == 1:
             return candidates[0]
 
-        # Calculate weighted response times for each zone
-        wrt_list = []
-        for node in candidates:
-            zone = node["zone"]
-            avg_response_time = self._get_average_response_time(
-                zone, fn_name, response_log
+        keyed = [(node, zone_key(node["zone"])) for node in candidates]
+        return self._select(keyed, fn_name, response_log, policy, data_key)
+
+    def _select(self, keyed: List[tuple],
+                fn_name: str,
+                response_log: Dict,
+                policy: str,
+                data_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Dispatch selection to the configured policy.
+
+        Args:
+            keyed: List of (node, identifier) tuples, identifier being node ID or zone key
+            fn_name: Function name for performance lookup
+            response_log: Historical response time data
+            policy: Selection policy name
+            data_key: Object the request reads, for the locality policy
+
+        Returns:
+            Selected node
+        """
+        if policy == "weighted":
+            # Calculate weighted response times for each candidate
+            wrt_list = [
+                (node, self._get_average_response_time(key, fn_name, response_log)
+                 / self._get_health(key))
+                for node, key in keyed
+            ]
+            return self._weighted_selection(wrt_list, [node for node, _ in keyed])
+        elif policy == "jsq":
+            return self._join_shortest_queue(keyed)
+        elif policy == "p2c":
+            return self._power_of_two_choices(keyed, fn_name, response_log)
+        elif policy == "latency_queue":
+            return self._latency_queue_selection(keyed, fn_name, response_log)
+        elif policy == "predicted":
+            return self._predicted_selection(keyed, fn_name)
+        elif policy == "locality":
+            return self._locality_selection(keyed, fn_name, response_log, data_key)
+        elif policy == "profiled":
+            return self._profiled_selection(keyed, fn_name, response_log, data_key)
+        else:
+            raise ValueError(f"Unknown selection policy: {policy}")
+
+    def _get_health(self, key: str) -> float:
+        """Get health score of a target, floored to keep weights finite (1.0 if not tracked)."""
+        if self.breakers is None:
+            return 1.0
+        return max(self.breakers.get_health(key), 0.05)
+
+    def _get_inflight(self, key: str) -> int:
+        """Get in-flight request count for a target (0 if not tracked)."""
+        return self.inflight.get(key) if self.inflight is not None else 0
+
+    def _join_shortest_queue(self, keyed: List[tuple]) -> Dict[str, Any]:
+        """
+        Pick the target with the fewest in-flight requests, breaking ties randomly.
+
+        Args:
+            keyed: List of (node, identifier) tuples
+
+        Returns:
+            Selected node
+        """
+        queue_lengths = [(node, self._get_inflight(key)) for node, key in keyed]
+        shortest = min(length for _, length in queue_lengths)
+        return random.choice([node for node, length in queue_lengths if length == shortest])
+
+    def _power_of_two_choices(self, keyed: List[tuple],
+                              fn_name: str,
+                              response_log: Dict) -> Dict[str, Any]:
+        """
+        Sample two targets at random and keep the one with the shorter queue.
+        Ties are broken by average response time.
+
+        Args:
+            keyed: List of (node, identifier) tuples
+            fn_name: Function name for performance lookup
+            response_log: Historical response time data
+
+        Returns:
+            Selected node
+        """
+        sampled = random.sample(keyed, 2)
+        return min(
+            sampled,
+            key=lambda item: (
+                self._get_inflight(item[1]),
+                self._get_average_response_time(item[1], fn_name, response_log)
             )
-            wrt_list.append((node, avg_response_time))
+        )[0]
+
+    def _latency_queue_selection(self, keyed: List[tuple],
+                                 fn_name: str,
+                                 response_log: Dict) -> Dict[str, Any]:
+        """
+        Pick the target minimising average latency x (queue length + 1).
+        Targets without history score 0 and are therefore explored first.
+
+        Args:
+            keyed: List of (node, identifier) tuples
+            fn_name: Function name for performance lookup
+            response_log: Historical response time data
+
+        Returns:
+            Selected node
+        """
+        scored = [
+            (node, self._get_average_response_time(key, fn_name, response_log)
+             * (self._get_inflight(key) + 1) / self._get_health(key))
+            for node, key in keyed
+        ]
+        best = min(score for _, score in scored)
+        return random.choice([node for node, score in scored if score == best])
+
+    def _predicted_selection(self, keyed: List[tuple], fn_name: str) -> Dict[str, Any]:
+        """
+        Pick the target with the minimum predicted completion time.
+
+        Args:
+            keyed: List of (node, identifier) tuples
+            fn_name: Function name for performance lookup
+
+        Returns:
+            Selected node
+        """
+        if self.predictor is None:
+            raise ValueError("Predicted selection requires a latency predictor")
+
+        scored = [
+            (node, self.predictor.predict(key, fn_name, self._get_inflight(key))["score"])
+            for node, key in keyed
+        ]
+        best = min(score for _, score in scored)
+        return random.choice([node for node, score in scored if score == best])
 
-        # Use weighted probability distribution for selection
-        selected_node = self._weighted_selection(wrt_list, candidates)
-        return selected_node
+    def _locality_selection(self, keyed: List[tuple],
+                            fn_name: str,
+                            response_log: Dict,
+                            data_key: Optional[str]) -> Dict[str, Any]:
+        """
+        Prefer targets that hold the request's object (the node itself, or a
+        node in a zone holding it) unless they carry more than locality_slack
+        in-flight requests above the least loaded target. Falls back to
+        latency x queue selection over all targets.
+
+        Args:
+            keyed: List of (node, identifier) tuples
+            fn_name: Function name for performance lookup
+            response_log: Historical response time data
+            data_key: Object the request reads (None if unknown)
+
+        Returns:
+            Selected node
+        """
+        if self.locality is None:
+            raise ValueError("Locality selection requires a locality map")
+
+        holders = self.locality.holders(data_key)
+        least_loaded = min(self._get_inflight(key) for _, key in keyed)
+        within_bound = [
+            (node, key) for node, key in keyed
+            if self._get_inflight(key) <= least_loaded + self.locality_slack
+        ]
+        # Node-level holders first, then nodes in a zone that holds the object
+        for match in (lambda node, key: key in holders,
+                      lambda node, key: node.get("zone") in holders):
+            colocated = [(node, key) for node, key in within_bound if match(node, key)]
+            if colocated:
+                self.locality.record_choice(data_key, True)
+                return self._latency_queue_selection(colocated, fn_name, response_log)
+
+        self.locality.record_choice(data_key, False)
+        return self._latency_queue_selection(keyed, fn_name, response_log)
+
+    def _profiled_selection(self, keyed: List[tuple],
+                            fn_name: str,
+                            response_log: Dict,
+                            data_key: Optional[str]) -> Dict[str, Any]:
+        """
+        Route by the function's workload class: CPU-bound work to the targets
+        with the lowest CPU utilization, I/O-bound work close to its data,
+        memory-heavy work away from targets under memory pressure. Unclassified
+        functions, ties and candidates without a fresh CPU or memory report
+        fall back to latency x queue selection.
+
+        Args:
+            keyed: List of (node, identifier) tuples
+            fn_name: Function name for performance lookup
+            response_log: Historical response time data
+            data_key: Object the request reads (None if unknown)
+
+        Returns:
+            Selected node
+        """
+        if self.profiler is None:
+            raise ValueError("Profiled selection requires a function profiler")
+
+        workload_class = self.profiler.classify(fn_name)
+        self.profiler.record_route(workload_class)
+
+        if workload_class == "cpu" and self.predictor is not None:
+            cpu = [(node, key, self.predictor.get_node_cpu(key)) for node, key in keyed]
+            if all(used is not None for _, _, used in cpu):
+                least = min(used for _, _, used in cpu)
+                keyed = [(node, key) for node, key, used in cpu if used <= least + self.load_slack]
+        elif workload_class == "io" and self.locality is not None and data_key is not None:
+            return self._locality_selection(keyed, fn_name, response_log, data_key)
+        elif workload_class == "memory" and self.predictor is not None:
+            memory = [(node, key, self.predictor.get_node_memory(key, default=None)) for node, key in keyed]
+            if all(used is not None for _, _, used in memory):
+                relieved = [(node, key) for node, key, used in memory if used < self.memory_limit]
+                keyed = relieved or [min(memory, key=lambda item: item[2])[:2]]
+
+        return self._latency_queue_selection(keyed, fn_name, response_log)
 
     def select_random(self, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
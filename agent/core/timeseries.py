@@ -0,0 +1,222 @@
+"""
+Embedded multi-resolution time-series store for node metrics.
+Raw samples are kept at 1 s resolution in preallocated numpy ring buffers and
+rolled up into coarser tiers (10 s, 1 min, 10 min by default) with count, min,
+mean, max and P95 per bucket, each tier with a fixed number of buckets, so the
+memory used is fixed at construction. Range, window and slope queries read
+the finest tier that still covers the requested span.
+"""
+import threading
+import time
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+ROLLUP_FIELDS = ["count", "min", "mean", "max", "p95"]
+
+
+class _Ring:
+    """Ring of fixed-width time buckets for several metrics; a slot holds the bucket it was last written for."""
+
+    def __init__(self, resolution: int, capacity: int, metrics: List[str], fields: List[str]):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.buckets = np.full(capacity, -1, dtype=np.int64)  # Bucket number held by each slot
+        self.values = {
+            metric: {field: np.full(capacity, np.nan) for field in fields}
+            for metric in metrics
+        }
+
+    def nbytes(self) -> int:
+        return self.buckets.nbytes + sum(
+            array.nbytes for fields in self.values.values() for array in fields.values()
+        )
+
+    def span(self) -> int:
+        """Seconds of history the ring can hold."""
+        return self.resolution * self.capacity
+
+    def write(self, bucket: int, metric: str, field: str, value: float):
+        slot = bucket % self.capacity
+        if self.buckets[slot] != bucket:
+            # The slot is reused for a new bucket: drop what the old one held
+            self.buckets[slot] = bucket
+            for fields in self.values.values():
+                for array in fields.values():
+                    array[slot] = np.nan
+        self.values[metric][field][slot] = value
+
+    def select(self, first: int, last: int) -> np.ndarray:
+        """Slots holding buckets first..last (inclusive), ordered by bucket."""
+        mask = (self.buckets >= first) & (self.buckets <= last)
+        slots = np.nonzero(mask)[0]
+        return slots[np.argsort(self.buckets[slots])]
+
+
+class TimeSeriesStore:
+    """Fixed-size store of 1 s samples with min/mean/max/P95 rollups at coarser resolutions."""
+
+    def __init__(self,
+                 metrics: Sequence[str],
+                 raw_seconds: int = 900,  # Seconds of raw samples kept (at least the coarsest resolution)
+                 resolutions: Sequence[Tuple[int, int]] = ((10, 360), (60, 1440), (600, 1008))):  # (seconds, buckets)
+        self.metrics = list(metrics)
+        resolutions = sorted((int(seconds), int(buckets)) for seconds, buckets in resolutions)
+        raw_seconds = max([int(raw_seconds)] + [seconds for seconds, _ in resolutions])
+
+        self.raw = _Ring(1, raw_seconds, self.metrics, ["value"])
+        self.tiers = [_Ring(seconds, buckets, self.metrics, ROLLUP_FIELDS) for seconds, buckets in resolutions]
+        self._last_second: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def record(self, values: Dict[str, float], timestamp: Optional[float] = None):
+        """
+        Record one sample per metric for the current second, rolling up the
+        buckets that the new second closes.
+
+        Args:
+            values: Metric name -> value (unknown metrics are ignored)
+            timestamp: Sample time (defaults to now)
+        """
+        second = int(time.time() if timestamp is None else timestamp)
+        with self._lock:
+            previous = self._last_second
+            if previous is not None and second > previous:
+                # Roll up the buckets closed since the previous sample before its
+                # raw slots can be overwritten
+                for tier in self.tiers:
+                    first = previous // tier.resolution
+                    last = second // tier.resolution - 1
+                    for bucket in range(max(first, last - tier.capacity + 1), last + 1):
+                        self._rollup(tier, bucket)
+            for metric, value in values.items():
+                if metric in self.raw.values and value is not None:
+                    self.raw.write(second, metric, "value", float(value))
+            if previous is None or second > previous:
+                self._last_second = second
+
+    def _rollup(self, tier: _Ring, bucket: int):
+        """Summarize a closed bucket from the raw samples (caller holds the lock)."""
+        start = bucket * tier.resolution
+        slots = self.raw.select(start, start + tier.resolution - 1)
+        for metric in self.metrics:
+            samples = self.raw.values[metric]["value"][slots]
+            samples = samples[~np.isnan(samples)]
+            if samples.size == 0:
+                continue
+            tier.write(bucket, metric, "count", samples.size)
+            tier.write(bucket, metric, "min", samples.min())
+            tier.write(bucket, metric, "mean", samples.mean())
+            tier.write(bucket, metric, "max", samples.max())
+            tier.write(bucket, metric, "p95", np.percentile(samples, 95))
+
+    def _tier_for(self, seconds: float, resolution: Optional[int]):
+        """Finest ring covering the span, or the one with the requested resolution."""
+        rings = [self.raw] + self.tiers
+        if resolution is not None:
+            for ring in rings:
+                if ring.resolution == resolution:
+                    return ring
+            raise ValueError(f"Unknown resolution: {resolution}. "
+                             f"Must be one of {[ring.resolution for ring in rings]}")
+        for ring in rings:
+            if ring.span() >= seconds:
+                return ring
+        return rings[-1]
+
+    def query(self, metric: str, start: float, end: Optional[float] = None,
+              resolution: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get a metric's samples in a time range.
+
+        Args:
+            metric: Metric name
+            start: Range start timestamp
+            end: Range end timestamp (defaults to now)
+            resolution: Tier resolution in seconds (defaults to the finest covering the range)
+
+        Returns:
+            Dict with the resolution, bucket start timestamps and, per field
+            ("value" for raw samples, else count/min/mean/max/p95), numpy arrays
+        """
+        if metric not in self.raw.values:
+            raise KeyError(metric)
+        end = time.time() if end is None else end
+        with self._lock:
+            ring = self._tier_for(end - start, resolution)
+            slots = ring.select(int(start) // ring.resolution, int(end) // ring.resolution)
+            fields = ring.values[metric]
+            present = slots[~np.isnan(next(iter(fields.values()))[slots])]
+            return {
+                "resolution": ring.resolution,
+                "timestamps": ring.buckets[present] * ring.resolution,
+                **{field: array[present].copy() for field, array in fields.items()}
+            }
+
+    def window(self, metric: str, seconds: float, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Summarize a metric over the last `seconds`.
+
+        Returns:
+            Dict with sample count, min, mean, max and P95 (None without
+            samples); beyond the raw retention the P95 is the highest bucket P95
+        """
+        now = time.time() if now is None else now
+        series = self.query(metric, now - seconds + 1, now)
+        if series["timestamps"].size == 0:
+            return {"samples": 0, "min": None, "mean": None, "max": None, "p95": None,
+                    "resolution": series["resolution"]}
+        if series["resolution"] == 1:
+            values = series["value"]
+            summary = (values.size, values.min(), values.mean(), values.max(), np.percentile(values, 95))
+        else:
+            counts = series["count"]
+            summary = (int(counts.sum()), series["min"].min(),
+                       float(np.average(series["mean"], weights=counts)),
+                       series["max"].max(), series["p95"].max())
+        samples, low, mean, high, p95 = summary
+        return {
+            "samples": int(samples),
+            "min": round(float(low), 4),
+            "mean": round(float(mean), 4),
+            "max": round(float(high), 4),
+            "p95": round(float(p95), 4),
+            "resolution": series["resolution"]
+        }
+
+    def slope(self, metric: str, seconds: float, now: Optional[float] = None) -> Optional[float]:
+        """
+        Least-squares slope of a metric over the last `seconds`, in units per second.
+
+        Returns:
+            Slope, or None with fewer than two samples
+        """
+        now = time.time() if now is None else now
+        series = self.query(metric, now - seconds + 1, now)
+        values = series["value"] if series["resolution"] == 1 else series["mean"]
+        if values.size < 2:
+            return None
+        times = series["timestamps"] - series["timestamps"][0]
+        return float(np.polyfit(times, values, 1)[0])
+
+    def latest(self, metric: str) -> Optional[float]:
+        """Most recent raw sample of a metric (None if none recorded)."""
+        with self._lock:
+            if self._last_second is None:
+                return None
+            slots = self.raw.select(self._last_second, self._last_second)
+            if slots.size == 0:
+                return None
+            value = self.raw.values[metric]["value"][slots[0]]
+            return None if np.isnan(value) else float(value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the store's layout and fixed memory footprint."""
+        rings = [self.raw] + self.tiers
+        return {
+            "metrics": self.metrics,
+            "tiers": [
+                {"resolution": ring.resolution, "buckets": ring.capacity, "span": ring.span()}
+                for ring in rings
+            ],
+            "memory_bytes": sum(ring.nbytes() for ring in rings)
+        }
@@ -0,0 +1,241 @@
+"""
+Compact binary framing for agent-to-agent calls.
+A frame is a fixed header (version, metadata length, body length) followed by
+JSON metadata and the raw body, so request payloads and function results cross
+agents as bytes without base64 or JSON string escaping. Agents negotiate it via
+Content-Type / Accept; external clients keep using JSON.
+
+A streamed frame sets the body length to STREAMED and carries the body as
+length-prefixed chunks ending with an empty chunk, so a result can be passed
+on before it has been fully received.
+"""
+import base64
+import json
+import struct
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
+
+from core import envelope
+
+CONTENT_TYPE = "application/x-agent-frame"
+VERSION = 1
+
+# Version byte, metadata length, body length (network byte order)
+_HEADER = struct.Struct("!BII")
+# Chunk length prefix of a streamed body
+_CHUNK = struct.Struct("!I")
+# Body length marking a streamed body
+STREAMED = 0xFFFFFFFF
+
+
+def pack(meta: Dict[str, Any], body: bytes = b"") -> bytes:
+    """
+    Encode one frame.
+
+    Args:
+        meta: JSON-serializable metadata
+        body: Raw body bytes
+
+    Returns:
+        Encoded frame
+    """
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    return b"".join((_HEADER.pack(VERSION, len(meta_bytes), len(body)), meta_bytes, body))
+
+
+def unpack(data: bytes, offset: int = 0) -> Tuple[Dict[str, Any], bytes, int]:
+    """
+    Decode the frame starting at offset.
+
+    Returns:
+        Tuple of (metadata, body, offset of the next frame)
+
+    Raises:
+        ValueError: If the frame is truncated or has an unknown version
+    """
+    if len(data) - offset < _HEADER.size:
+        raise ValueError("Truncated frame header")
+    version, meta_len, body_len = _HEADER.unpack_from(data, offset)
+    if version != VERSION:
+        raise ValueError(f"Unsupported frame version: {version}")
+    if body_len == STREAMED:
+        raise ValueError("Streamed frame in a buffered message")
+
+    start = offset + _HEADER.size
+    end = start + meta_len + body_len
+    if len(data) < end:
+        raise ValueError("Truncated frame")
+    meta = json.loads(data[start:start + meta_len])
+    return meta, bytes(data[start + meta_len:end]), end
+
+
+def unpack_all(data: bytes) -> List[Tuple[Dict[str, Any], bytes]]:
+    """Decode a buffer holding several consecutive frames."""
+    frames = []
+    offset = 0
+    while offset < len(data):
+        meta, body, offset = unpack(data, offset)
+        frames.append((meta, body))
+    return frames
+
+
+def iter_frames(chunks: Iterable[bytes]) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+    """
+    Decode frames from a stream of byte chunks as soon as each is complete.
+
+    Raises:
+        ValueError: If the stream ends inside a frame
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= _HEADER.size:
+            _, meta_len, body_len = _HEADER.unpack_from(buffer)
+            if len(buffer) < _HEADER.size + meta_len + body_len:
+                break
+            meta, body, end = unpack(buffer)
+            del buffer[:end]
+            yield meta, body
+    if buffer:
+        raise ValueError("Stream ended inside a frame")
+
+
+def pack_request(params: Dict[str, Any]) -> bytes:
+    """Encode request parameters, carrying the payload as the frame body."""
+    meta = {key: value for key, value in params.items() if key != "payload"}
+    payload = params.get("payload", "")
+    if isinstance(payload, bytes):
+        return pack(meta, payload)
+    if isinstance(payload, str):
+        meta["payload_type"] = "text"
+        return pack(meta, payload.encode("utf-8"))
+    meta["payload"] = payload  # Structured payloads stay in the metadata
+    return pack(meta)
+
+
+def unpack_request(meta: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """Rebuild request parameters from a frame produced by pack_request."""
+    data = dict(meta)
+    if "payload" not in data:
+        data["payload"] = body.decode("utf-8") if data.pop("payload_type", None) == "text" else body
+    return data
+
+
+def request_to_json(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert request parameters into a JSON-safe dict for the JSON wire.
+    A bytes payload is sent as base64 (see envelope.to_json for results).
+    """
+    data = dict(params)
+    if isinstance(data.get("payload"), bytes):
+        data["payload"] = base64.b64encode(data["payload"]).decode("ascii")
+        data["payload_encoding"] = "base64"
+    return data
+
+
+def request_from_json(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild request parameters sent with request_to_json, restoring a bytes payload."""
+    params = dict(data)
+    if params.pop("payload_encoding", None) == "base64" and isinstance(params.get("payload"), str):
+        params["payload"] = base64.b64decode(params["payload"])
+    return params
+
+
+def pack_envelope(result: Dict[str, Any], **extra) -> bytes:
+    """Encode a result envelope, carrying the result bytes as the frame body."""
+    body, meta = envelope.split(result)
+    meta.update(extra)
+    return pack(meta, body)
+
+
+def pack_stream(meta: Dict[str, Any], chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Encode a frame whose body is sent chunk by chunk as it is produced."""
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    yield _HEADER.pack(VERSION, len(meta_bytes), STREAMED) + meta_bytes
+    for chunk in chunks:
+        if chunk:
+            yield _CHUNK.pack(len(chunk)) + chunk
+    yield _CHUNK.pack(0)
+
+
+def stream_envelope(result: Dict[str, Any]) -> Iterator[bytes]:
+    """Encode a result envelope, streaming its body if it is a StreamBody."""
+    resp = result.get("resp")
+    if not isinstance(resp, envelope.StreamBody):
+        yield pack_envelope(result)
+        return
+    meta = {key: value for key, value in result.items() if key != "resp"}
+    yield from pack_stream(meta, resp)
+
+
+class _Reader:
+    """Reads exact byte counts from an iterator of chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+
+    def read(self, size: int) -> bytes:
+        while len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                raise ValueError("Stream ended inside a frame")
+            self._buffer += chunk
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yield the chunks of a streamed body."""
+        while True:
+            (size,) = _CHUNK.unpack(self.read(_CHUNK.size))
+            if size == 0:
+                return
+            yield self.read(size)
+
+
+def decode_stream(content_type: str, chunks: Iterable[bytes],
+                  close=None) -> Dict[str, Any]:
+    """
+    Decode an agent response read incrementally. A streamed frame body is
+    returned as a StreamBody that is consumed as the caller passes it on.
+
+    Args:
+        content_type: Response content type
+        chunks: Iterable of response body chunks
+        close: Releases the response connection once the body was consumed
+    """
+    if not (content_type and content_type.startswith(CONTENT_TYPE)):
+        result = decode_response(content_type, b"".join(chunks))
+        if close is not None:
+            close()
+        return result
+
+    reader = _Reader(chunks)
+    version, meta_len, body_len = _HEADER.unpack(reader.read(_HEADER.size))
+    if version != VERSION:
+        raise ValueError(f"Unsupported frame version: {version}")
+    meta = json.loads(reader.read(meta_len))
+    if body_len != STREAMED:
+        body = reader.read(body_len)
+        if close is not None:
+            close()
+        return envelope.join(meta, body)
+
+    result = dict(meta)
+    result["resp"] = envelope.StreamBody(reader.chunks(), close=close)
+    return result
+
+
+def decode_response(content_type: str, content: bytes) -> Dict[str, Any]:
+    """
+    Decode an agent response into an envelope, whichever format it came in
+    (agents answer errors raised before negotiation with plain JSON).
+    """
+    if content_type and content_type.startswith(CONTENT_TYPE):
+        meta, body, _ = unpack(content)
+        return envelope.join(meta, body)
+
+    decoded = json.loads(content)
+    if not isinstance(decoded, dict):
+        return {"resp": content}
+    return envelope.from_json(decoded)
@@ -0,0 +1,8 @@
+"""
+Shared pytest setup: makes the agent modules importable as in app.py
+(``from core.x import ...``) when the suite runs from the repository root.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
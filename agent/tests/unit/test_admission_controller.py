@@ -0,0 +1,57 @@
+"""Unit tests for adaptive concurrency limits and admission control."""
+import pytest
+
+from core.admission_controller import AdaptiveLimit, AdmissionController, AdmissionRejected
+
+
+def test_limit_grows_while_in_use_and_latency_is_stable():
+    limit = AdaptiveLimit(initial_limit=4)
+    for _ in range(20):
+        limit.on_sample(0.1, True, in_use=4)
+    assert limit.get() > 4
+
+
+def test_limit_backs_off_on_failure_and_latency_spike():
+    limit = AdaptiveLimit(initial_limit=10, backoff=0.5, tolerance=2.0)
+    limit.on_sample(0.1, False, in_use=10)
+    assert limit.get() == 5
+
+    limit.on_sample(0.1, True, in_use=0)
+    limit.on_sample(0.5, True, in_use=0)
+    assert limit.get() == 2
+
+
+def test_limit_never_drops_below_minimum():
+    limit = AdaptiveLimit(initial_limit=4, min_limit=2, backoff=0.1)
+    for _ in range(10):
+        limit.on_sample(0.1, False, in_use=4)
+    assert limit.get() == 2
+
+
+def test_mixed_fast_and_slow_functions_are_not_congestion():
+    limit = AdaptiveLimit(initial_limit=16)
+    for i in range(200):
+        if i % 2:
+            limit.on_sample(1.5, True, in_use=16, fn_name="slow")
+        else:
+            limit.on_sample(0.05, True, in_use=16, fn_name="fast")
+    assert limit.get() >= 16
+
+
+def test_acquire_rejects_when_queue_is_full():
+    admission = AdmissionController(max_queue=0, initial_limit=1)
+    assert admission.acquire("entry") == 0.0
+    with pytest.raises(AdmissionRejected):
+        admission.acquire("entry")
+
+    admission.release("entry", 0.1, True, "fn")
+    assert admission.acquire("entry") == 0.0
+    assert admission.get_stats()["entry"]["rejected"] == 1
+
+
+def test_queued_request_times_out():
+    admission = AdmissionController(max_queue=4, queue_timeout=0.05, initial_limit=1)
+    admission.acquire("local")
+    with pytest.raises(AdmissionRejected):
+        admission.acquire("local")
+    assert admission.queue_depth("local") == 1
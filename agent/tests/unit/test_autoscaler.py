@@ -0,0 +1,62 @@
+"""Unit tests for the Little's-law scaling controller (the gateway is faked)."""
+from core.autoscaler import ScalingController
+
+
+class FakeGateway:
+    """Replica counts and invocation counters of a gateway."""
+
+    def __init__(self):
+        self.replicas = 1
+        self.counters = {}
+
+    def get_function_status(self, fn_name, target=None):
+        return {"replicas": self.replicas}
+
+    def scale_function(self, fn_name, replicas, target=None):
+        self.replicas = replicas
+        return True
+
+    def get_gateway_metrics(self, url=None):
+        return {fn: dict(counters) for fn, counters in self.counters.items()}
+
+
+def test_gateway_counters_drive_demand():
+    gateway = FakeGateway()
+    controller = ScalingController(gateway, window=10.0, target_concurrency=2.0, up_cooldown=0)
+    gateway.counters["resize"] = {"started": 0, "completed": 0, "seconds": 0.0, "timed": 0}
+    controller.run_once()  # Baseline scrape
+
+    # 100 calls from other callers in the window, 0.5 s each: 10 req/s x 0.5 s = 5 in the system
+    gateway.counters["resize"] = {"started": 102, "completed": 100, "seconds": 50.0, "timed": 100}
+    controller.run_once()
+
+    demand = controller.demand("resize")
+    assert demand["arrival_rate"] == 10.0
+    assert demand["latency"] == 0.5
+    assert demand["concurrency"] == 5.0
+    assert gateway.replicas == 3
+
+
+def test_gateway_source_does_not_double_count_tracked_calls():
+    controller = ScalingController(FakeGateway(), window=10.0)
+    with controller.track("resize"):
+        pass
+    assert controller.demand("resize")["arrival_rate"] == 0.0
+
+
+def test_agent_source_counts_tracked_calls():
+    controller = ScalingController(FakeGateway(), source="agent", window=10.0)
+    for _ in range(5):
+        controller.record("resize", 0.2)
+    demand = controller.demand("resize")
+    assert demand["arrival_rate"] == 0.5
+    assert abs(demand["latency"] - 0.2) < 1e-9
+
+
+def test_scale_down_waits_for_ratio_and_cooldown():
+    controller = ScalingController(FakeGateway(), source="agent", scale_down_ratio=0.7,
+                                   up_cooldown=0, down_cooldown=100)
+    assert controller.decide("resize", current=1, now=0) is None
+    assert controller.decide("resize", current=4, now=50) == 1
+    controller._last_scaled["resize"] = 50
+    assert controller.decide("resize", current=4, now=100) is None
@@ -0,0 +1,76 @@
+"""Unit tests for the circuit breaker and its registry."""
+from core.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, zone_key
+
+
+def test_trips_on_error_rate_after_min_requests():
+    breaker = CircuitBreaker(error_rate=0.5, min_requests=4)
+    for success in (True, False, True):
+        breaker.record(success, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.is_available()
+
+
+def test_trips_on_slow_calls():
+    breaker = CircuitBreaker(slow_rate=0.5, latency_threshold=1.0, min_requests=2)
+    breaker.record(True, 2.0)
+    breaker.record(True, 2.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_limits_trials_and_closes_on_success():
+    breaker = CircuitBreaker(min_requests=1, open_timeout=0.0, half_open_max=1)
+    breaker.record(False, 0.1)
+    assert breaker.is_available()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.on_dispatch()
+    assert not breaker.is_available()
+
+    breaker.record(True, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.is_available()
+
+
+def test_half_open_failure_reopens():
+    breaker = CircuitBreaker(min_requests=1, open_timeout=60.0)
+    breaker.record(False, 0.1)
+    breaker.opened_at -= 60.0
+    breaker.on_dispatch()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.record(False, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.is_available()
+
+
+def test_registry_counts_trips_and_tracks_health():
+    registry = CircuitBreakerRegistry(health_alpha=0.5, min_requests=1)
+    registry.record("edge1", False, 0.1)
+
+    stats = registry.get_stats()["edge1"]
+    assert stats["state"] == CircuitBreaker.OPEN
+    assert stats["trips"] == 1
+    assert registry.get_health("edge1") == 0.5
+    assert registry.get_health("unknown") == 1.0
+
+
+def test_filter_available_fails_open_when_all_breakers_are_open():
+    registry = CircuitBreakerRegistry(min_requests=1)
+    nodes = [{"id": "edge1"}, {"id": "edge2"}]
+    registry.record("edge1", False, 0.1)
+    assert registry.filter_available(nodes) == [{"id": "edge2"}]
+
+    registry.record("edge2", False, 0.1)
+    assert registry.filter_available(nodes) == nodes
+
+
+def test_zone_breaker_is_separate_from_node_with_same_name():
+    registry = CircuitBreakerRegistry(min_requests=1)
+    controllers = [{"id": "cloud", "zone": "edge-A"}, {"id": "ctl-b", "zone": "cloud"}]
+    registry.record(zone_key("cloud"), False, 0.1)
+    assert registry.is_available("cloud")
+    assert registry.filter_available(controllers) == controllers
+    assert registry.filter_available(controllers, "zone") == [controllers[0]]
@@ -0,0 +1,36 @@
+"""Unit tests for cold-start classification."""
+from core.cold_start import ColdStartTracker
+
+
+def test_slow_first_call_is_not_a_cold_start():
+    tracker = ColdStartTracker(min_cold=0.5)
+    suspected = tracker.suspect("edge1", "resize")
+    assert suspected
+    assert not tracker.classify("edge1", "resize", 2.0, suspected)
+
+
+def test_first_call_with_zero_replicas_is_a_cold_start():
+    tracker = ColdStartTracker()
+    assert tracker.classify("edge1", "resize", 2.0, True, replicas=0)
+    assert tracker.get_stats()["functions"]["edge1/resize"]["cold_starts"] == 1
+
+
+def test_slow_call_after_idle_gap_is_a_cold_start():
+    tracker = ColdStartTracker(idle_gap=300, outlier_factor=3.0, min_cold=0.5)
+    for _ in range(5):
+        tracker.classify("edge1", "resize", 0.2, tracker.suspect("edge1", "resize"))
+    assert not tracker.suspect("edge1", "resize")
+
+    tracker._state[("edge1", "resize")]["last"] -= 301
+    assert tracker.suspect("edge1", "resize")
+    assert not tracker.classify("edge1", "resize", 0.4, True)
+    tracker._state[("edge1", "resize")]["last"] -= 301
+    assert tracker.classify("edge1", "resize", 1.0, True)
+
+
+def test_service_time_uses_warm_samples_across_nodes():
+    tracker = ColdStartTracker()
+    for node_id, duration in (("edge1", 0.1), ("edge2", 0.3), ("edge2", 0.2)):
+        tracker.classify(node_id, "resize", duration, False)
+    assert tracker.service_time("resize") == 0.2
+    assert tracker.service_time("unknown") == 0.0
@@ -0,0 +1,61 @@
+"""Unit tests for weighted fair queueing tags and tenant rate limits."""
+from core.fair_queue import TenantFairness
+
+
+def test_finish_tags_follow_weights():
+    fairness = TenantFairness({"heavy": {"weight": 1}, "light": {"weight": 4}})
+    heavy = [fairness.stamp("heavy") for _ in range(2)]
+    light = [fairness.stamp("light") for _ in range(4)]
+    assert heavy == [1.0, 2.0]
+    assert light == [0.25, 0.5, 0.75, 1.0]
+
+
+def test_withdrawn_request_does_not_advance_tenant_tag():
+    fairness = TenantFairness()
+    rejected = fairness.stamp("a")
+    fairness.withdraw("a")
+    assert fairness.stamp("a") == rejected
+
+
+def test_start_commits_tag_and_advances_virtual_time():
+    fairness = TenantFairness()
+    first = fairness.stamp("a")
+    fairness.start("a", first)
+    assert fairness.last_finish["a"] == first
+    assert fairness.virtual_time == 0.0
+
+    second = fairness.stamp("a")
+    assert second == first + 1.0
+    fairness.start("a", second)
+    assert fairness.virtual_time == first
+
+    # An idle tenant starts from the current virtual time, not from zero
+    assert fairness.stamp("b") == fairness.virtual_time + 1.0
+
+
+def test_finish_records_completion_and_active_count():
+    fairness = TenantFairness()
+    fairness.start("a", fairness.stamp("a"))
+    assert fairness.get_stats()["a"]["active"] == 1
+
+    fairness.finish("a", 0.2)
+    stats = fairness.get_stats()["a"]
+    assert stats["active"] == 0
+    assert stats["avg_latency"] == 0.2
+
+
+def test_rate_limit_allows_burst_then_rejects():
+    fairness = TenantFairness({"a": {"rate_limit": 0.001, "burst": 2}})
+    assert fairness.allow("a")
+    assert fairness.allow("a")
+    assert not fairness.allow("a")
+    assert fairness.get_stats()["a"]["rejected"] == 1
+    assert fairness.allow("unlimited")
+
+
+def test_over_share_compares_active_work_with_weight():
+    fairness = TenantFairness({"a": {"weight": 1}, "b": {"weight": 3}})
+    for tag in ("a", "a", "b"):
+        fairness.start(tag, fairness.stamp(tag))
+    assert fairness.over_share("a")
+    assert not fairness.over_share("b")
@@ -0,0 +1,31 @@
+"""Unit tests for asynchronous job results and handoffs."""
+from core.job_store import JobStore
+
+
+def test_handoff_is_taken_once():
+    store = JobStore()
+    handoff_id = store.hand_off("http://entry:31113/job/1", {"key": "cloud"})
+    handoff = store.take_handoff(handoff_id)
+    assert handoff["reply_to"] == "http://entry:31113/job/1"
+    assert handoff["context"] == {"key": "cloud"}
+    assert store.take_handoff(handoff_id) is None
+
+
+def test_expired_handoff_is_reported_as_lost():
+    lost = []
+    store = JobStore(ttl=60, on_handoff_expired=lost.append)
+    handoff_id = store.hand_off("http://entry:31113/job/1", {"key": "cloud"})
+    store._handoffs[handoff_id]["created"] -= 120
+
+    assert store.create() is not None
+    assert [handoff["context"]["key"] for handoff in lost] == ["cloud"]
+    assert store.take_handoff(handoff_id) is None
+    assert store.get_stats()["handoffs_expired"] == 1
+
+
+def test_full_store_rejects_only_without_finished_jobs():
+    store = JobStore(max_jobs=1)
+    job_id = store.create()
+    assert store.create() is None
+    store.complete(job_id, {"resp": b"ok"}, 200)
+    assert store.create() is not None
@@ -0,0 +1,101 @@
+"""Unit tests for SWIM membership state merging and seed validation."""
+import pytest
+import yaml
+
+from core.config_manager import ConfigManager
+from core.membership import Membership, ALIVE, SUSPECT, DEAD
+
+NODES = [
+    {"id": "a", "address": "10.0.0.1", "role": "edge", "zone": "z1"},
+    {"id": "b", "address": "10.0.0.2", "role": "edge", "zone": "z1"},
+]
+
+
+def make_membership(**kwargs):
+    return Membership(NODES[0], nodes=NODES, **kwargs)
+
+
+def update(member_id, state, incarnation, node=None):
+    return {"id": member_id, "state": state, "incarnation": incarnation, "node": node}
+
+
+def state_of(membership, member_id):
+    return membership.get_stats()["members"][member_id]["state"]
+
+
+def test_suspect_overrides_alive_at_same_incarnation():
+    membership = make_membership()
+    assert membership.apply(update("b", SUSPECT, 0))
+    assert state_of(membership, "b") == SUSPECT
+    assert not membership.apply(update("b", ALIVE, 0))
+    assert state_of(membership, "b") == SUSPECT
+
+
+def test_higher_incarnation_alive_clears_suspicion():
+    membership = make_membership()
+    membership.apply(update("b", SUSPECT, 0))
+    assert membership.apply(update("b", ALIVE, 1))
+    assert state_of(membership, "b") == ALIVE
+
+
+def test_stale_updates_are_ignored():
+    membership = make_membership()
+    membership.apply(update("b", ALIVE, 3))
+    assert not membership.apply(update("b", SUSPECT, 2))
+    assert not membership.apply(update("b", DEAD, 2))
+    assert state_of(membership, "b") == ALIVE
+
+
+def test_dead_member_leaves_topology_until_it_rejoins():
+    membership = make_membership()
+    assert membership.apply(update("b", DEAD, 0))
+    assert not membership.apply(update("b", SUSPECT, 5))
+    assert "b" not in membership.topology()
+
+    assert membership.apply(update("b", ALIVE, 1))
+    assert "b" in membership.topology()
+    assert membership.get_stats()["joined"] == 1
+
+
+def test_suspicion_of_self_is_refuted_with_new_incarnation():
+    membership = make_membership()
+    assert not membership.apply(update("a", SUSPECT, 0))
+    assert membership.incarnation == 1
+    assert membership.self_update()["incarnation"] == 1
+    assert membership.get_stats()["refuted"] == 1
+
+
+def test_unknown_member_needs_node_to_be_added():
+    membership = make_membership()
+    assert not membership.apply(update("c", ALIVE, 0))
+    node = {"id": "c", "address": "10.0.0.3", "role": "edge", "zone": "z2"}
+    membership.apply_all([update("c", ALIVE, 0, node)])
+    assert membership.topology()["c"] == node
+
+
+def test_outgoing_retires_updates_after_retransmit_limit():
+    membership = make_membership(retransmit_mult=1)
+    membership.apply(update("b", SUSPECT, 0))
+    # Two members: each update is sent ceil(log2(3)) = 2 times
+    assert [u["id"] for u in membership.outgoing()] == ["b"]
+    assert [u["id"] for u in membership.outgoing()] == ["b"]
+    assert membership.outgoing() == []
+
+
+def write_config(tmp_path, seeds):
+    config = {"architecture": "decentralized", "node": {"id": "a"}, "topology": NODES,
+              "membership": {"enabled": True, "seeds": seeds}}
+    path = tmp_path / "architecture.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+
+def test_seeds_resolve_to_topology_nodes(tmp_path):
+    extra = {"id": "c", "address": "10.0.0.3"}
+    config_manager = ConfigManager(write_config(tmp_path, ["b", extra]))
+    assert config_manager.membership_seeds == [NODES[1], extra]
+
+
+def test_unknown_seed_is_a_configuration_error(tmp_path):
+    with pytest.raises(RuntimeError, match="Membership seed 'x' not found"):
+        ConfigManager(write_config(tmp_path, ["x"]))
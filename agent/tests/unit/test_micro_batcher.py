@@ -0,0 +1,59 @@
+"""Unit tests for forward micro-batching (sending is mostly stubbed out)."""
+import threading
+import time
+
+import pytest
+import requests
+
+from core.micro_batcher import MicroBatcher
+
+
+def echo_batches(batcher, sent):
+    """Replace the HTTP call with one that answers every request of a batch."""
+    def send(key, batch):
+        sent.append(len(batch))
+        for data, future in batch:
+            future.set_result((200, data))
+    batcher._send = send
+
+
+def test_requests_within_window_share_a_batch():
+    batcher = MicroBatcher(window=0.05, max_batch=32)
+    sent = []
+    echo_batches(batcher, sent)
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(
+            batcher.submit("http://edge1:31113", "/entry", {"i": i})))
+        for i in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sent == [3]
+    assert sorted(body["i"] for _, body in results) == [0, 1, 2]
+
+
+def test_full_batch_is_sent_before_the_window_expires():
+    batcher = MicroBatcher(window=60, max_batch=1)
+    sent = []
+    echo_batches(batcher, sent)
+    assert batcher.submit("http://edge1:31113", "/entry", {"i": 0}) == (200, {"i": 0})
+    assert sent == [1]
+
+
+def test_missing_result_raises_requests_timeout():
+    batcher = MicroBatcher(window=0.01, timeout=0.05)
+    batcher._send = lambda key, batch: None
+    with pytest.raises(requests.Timeout):
+        batcher.submit("http://edge1:31113", "/entry", {})
+
+
+def test_unserializable_request_fails_fast():
+    batcher = MicroBatcher(window=0.01, timeout=30)
+    start = time.monotonic()
+    with pytest.raises(requests.RequestException):
+        batcher.submit("http://127.0.0.1:9", "/entry", {"payload": b"\x00\x01"})
+    assert time.monotonic() - start < 5
@@ -0,0 +1,57 @@
+"""Unit tests for the node-local object cache (origin fetches are stubbed out)."""
+import types
+
+import pytest
+import requests
+
+from core import object_cache
+from core.object_cache import ObjectCache
+
+
+def make_cache(tmp_path, **config):
+    return ObjectCache("http://edge1:31113", directory=str(tmp_path / "cache"), **config)
+
+
+def test_only_allowed_origins_are_cacheable(tmp_path):
+    cache = make_cache(tmp_path, allowed_hosts=["minio:9000"])
+    assert cache.cacheable("http://minio:9000/images/a.jpg")
+    assert not cache.cacheable("http://169.254.169.254/latest/meta-data")
+    assert not cache.cacheable("file:///etc/passwd")
+
+
+def test_no_allow_list_caches_nothing(tmp_path):
+    cache = make_cache(tmp_path)
+    assert not cache.cacheable("http://minio:9000/images/a.jpg")
+    with pytest.raises(ValueError):
+        cache.get("http://minio:9000/images/a.jpg")
+
+
+def fake_origin(monkeypatch, status_code=200, content=b"object"):
+    """Answer origin fetches locally, recording the fetched URLs."""
+    fetched = []
+
+    def get(url, **kwargs):
+        fetched.append(url)
+        response = types.SimpleNamespace(content=content, status_code=status_code,
+                                         is_redirect=300 <= status_code < 400)
+        response.raise_for_status = lambda: None
+        return response
+
+    monkeypatch.setattr(object_cache.requests, "get", get)
+    return fetched
+
+
+def test_read_through_then_hit(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, allowed_hosts=["minio:9000"])
+    fetched = fake_origin(monkeypatch)
+
+    assert cache.get("http://minio:9000/a") == (b"object", False)
+    assert cache.get("http://minio:9000/a") == (b"object", True)
+    assert fetched == ["http://minio:9000/a"]
+
+
+def test_origin_redirects_are_not_followed(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, allowed_hosts=["minio:9000"])
+    fake_origin(monkeypatch, status_code=302)
+    with pytest.raises(requests.HTTPError):
+        cache.get("http://minio:9000/a")
@@ -0,0 +1,31 @@
+"""Unit tests for pass-by-reference payload storage (local backend)."""
+from core.payload_store import PayloadStore
+
+
+def make_store(tmp_path, **config):
+    return PayloadStore("http://edge1:31113", enabled=True, directory=str(tmp_path), **config)
+
+
+def test_threshold_counts_encoded_bytes(tmp_path):
+    store = make_store(tmp_path, threshold_bytes=10)
+    assert not store.should_store("a" * 10)
+    assert store.should_store("é" * 6)  # 6 characters, 12 bytes
+    assert store.should_store(b"\x00" * 11)
+    assert not store.should_store({"large": "x" * 100})
+
+
+def test_disabled_store_never_stores(tmp_path):
+    store = make_store(tmp_path, threshold_bytes=0)
+    store.enabled = False
+    assert not store.should_store("anything")
+
+
+def test_put_and_fetch_round_trip(tmp_path):
+    store = make_store(tmp_path)
+    ref = store.put("héllo")
+    assert ref["size"] == len("héllo".encode("utf-8"))
+    assert ref["url"] == f"http://edge1:31113/payload/{ref['key']}"
+    assert store.fetch(ref) == "héllo"
+
+    raw = store.put(b"\x00\x01")
+    assert store.fetch(raw) == b"\x00\x01"
@@ -0,0 +1,125 @@
+"""Routed tests: real agents served on localhost in front of a stub gateway."""
+import socket
+import threading
+
+import pytest
+import requests
+import yaml
+from flask import Flask, request
+from werkzeug.serving import make_server
+
+from api.routes import register_routes
+from core.config_manager import ConfigManager
+
+PAYLOAD = b"\x00\xffraw input\x80"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def serve():
+    """Serve WSGI apps on free localhost ports, shutting them down afterwards."""
+    servers = []
+
+    def start(app, port):
+        server = make_server("127.0.0.1", port, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture
+def gateway(serve):
+    """Stub FaaS gateway echoing the payload and recording what it received."""
+    app = Flask("gateway")
+    received = []
+
+    @app.route("/function/<fn_name>", methods=["POST"])
+    def invoke(fn_name):
+        received.append(request.get_data())
+        if fn_name == "broken":
+            return "function crashed", 500
+        return request.get_data()
+
+    port = free_port()
+    serve(app, port)
+    return port, received
+
+
+def start_agents(serve, tmp_path, gateway_port, extra=None):
+    """Start an edge agent and its cloud controller in centralized mode; return the edge URL."""
+    ports = {"edge": free_port(), "cloud": free_port()}
+    topology = [
+        {"id": "edge", "address": "127.0.0.1", "port": ports["edge"], "gateway_port": gateway_port,
+         "role": "edge", "zone": "z1"},
+        {"id": "cloud", "address": "127.0.0.1", "port": ports["cloud"], "gateway_port": gateway_port,
+         "role": "cloud-controller", "zone": "z0"},
+    ]
+    urls = {}
+    for node_id in ("cloud", "edge"):
+        config = {
+            "architecture": "centralized", "node": {"id": node_id}, "topology": topology,
+            "gateway": {"url": f"http://127.0.0.1:{gateway_port}"}, **(extra or {})
+        }
+        path = tmp_path / f"{node_id}.yaml"
+        path.write_text(yaml.safe_dump(config))
+        app = Flask(node_id)
+        register_routes(app, ConfigManager(str(path)))
+        urls[node_id] = serve(app, ports[node_id])
+    return urls["edge"]
+
+
+@pytest.mark.parametrize("extra", [None, {"batching": {"enabled": True}}], ids=["direct", "batched"])
+def test_raw_payload_is_forwarded_over_json_wire(serve, gateway, tmp_path, extra):
+    gateway_port, received = gateway
+    edge_url = start_agents(serve, tmp_path, gateway_port, extra)
+
+    response = requests.post(
+        f"{edge_url}/entry?fn_name=echo", data=PAYLOAD,
+        headers={"Content-Type": "application/octet-stream"}, timeout=30
+    )
+    body = response.json()
+    assert response.status_code == 200, body
+    assert received == [PAYLOAD]
+    assert body["attempt"] == 1
+    assert body["resp_encoding"] == "base64"
+
+
+def run_async(edge_url, fn_name):
+    """Submit an asynchronous request to the edge agent and long-poll its result."""
+    response = requests.post(f"{edge_url}/entry?async=1", json={"fn_name": fn_name, "payload": "in"},
+                             timeout=30)
+    assert response.status_code == 202
+    result = requests.get(f"{edge_url}{response.json()['result_url']}?wait=20", timeout=30)
+    assert result.status_code != 202, "job did not finish"
+    return result.json()
+
+
+def test_async_result_carries_every_hop(serve, gateway, tmp_path):
+    edge_url = start_agents(serve, tmp_path, gateway[0])
+    body = run_async(edge_url, "echo")
+
+    assert body["resp"] == "in"
+    assert [hop["node"] for hop in body["hops"]] == ["edge", "cloud"]
+    assert body["architecture"] == "centralized"
+    assert body["attempt"] == 1
+
+
+def test_async_failure_reaches_breaker_and_is_retried(serve, gateway, tmp_path):
+    edge_url = start_agents(serve, tmp_path, gateway[0])
+    body = run_async(edge_url, "broken")
+
+    assert "error" in body
+    assert body["attempt"] == 2
+    assert body["architecture"] == "decentralized"
+    stats = requests.get(f"{edge_url}/routing_stats", timeout=10).json()
+    assert stats["breakers"]["cloud"]["health"] < 1.0
+    assert stats["jobs"]["handoffs_pending"] == 0
@@ -0,0 +1,35 @@
+"""Unit tests for QPS sampling in the tail-ratio scheduler and the QPS forecaster."""
+from core.qps_forecaster import QPSForecaster
+from core.tail_scheduler import TailRatioScheduler
+
+
+class RecordingForecaster(QPSForecaster):
+    """Forecaster that remembers every observed sample."""
+
+    def __init__(self, **config):
+        super().__init__(**config)
+        self.observed = []
+
+    def observe(self, fn_name, qps):
+        self.observed.append(qps)
+        super().observe(fn_name, qps)
+
+
+def test_qps_is_sampled_once_per_round():
+    forecaster = RecordingForecaster()
+    scheduler = TailRatioScheduler(min_samples=2, sample_interval=2, forecaster=forecaster)
+    durations = {arch: [0.1, 0.2, 0.3] for arch in ("centralized", "federated", "decentralized")}
+    for _ in range(4):
+        scheduler.update_ratios("resize", durations)
+
+    # All three architectures were sampled in the first round: one sample, not three
+    assert list(scheduler.update_qps_log["resize"]) == [0.5]
+    assert forecaster.observed == [0.5]
+
+
+def test_forecaster_follows_a_linear_ramp():
+    forecaster = QPSForecaster(alpha=0.8, beta=0.8, horizon=2)
+    for qps in range(1, 21):
+        forecaster.observe("resize", float(qps))
+    assert abs(forecaster.forecast("resize") - 22.0) < 0.5
+    assert forecaster.forecast("unknown") is None
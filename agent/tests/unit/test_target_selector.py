@@ -0,0 +1,37 @@
+"""Unit tests for workload-class aware (profiled) target selection."""
+from core.function_profiler import FunctionProfiler
+from core.latency_predictor import LatencyPredictor
+from core.target_selector import TargetSelector
+
+NODES = [{"id": "edge1", "zone": "a"}, {"id": "edge2", "zone": "a"}, {"id": "edge3", "zone": "b"}]
+
+
+def make_selector(workload_class):
+    predictor = LatencyPredictor()
+    profiler = FunctionProfiler(hints=lambda fn_name: workload_class, enabled=False)
+    return TargetSelector(predictor=predictor, profiler=profiler, load_slack=0.1), predictor
+
+
+def pick_many(selector, rounds=30):
+    return {selector.select_target(NODES, "fn", {}, policy="profiled")["id"] for _ in range(rounds)}
+
+
+def test_cpu_bound_goes_to_the_least_busy_cpu():
+    selector, predictor = make_selector("cpu")
+    for node_id, cpu in (("edge1", 0.9), ("edge2", 0.2), ("edge3", 0.25)):
+        predictor.update_node_cpu(node_id, cpu)
+        predictor.update_node_load(node_id, 0.0)  # Pressure does not decide the CPU ranking
+    assert pick_many(selector) <= {"edge2", "edge3"}
+
+
+def test_cpu_bound_without_peer_readings_uses_the_default_policy():
+    selector, predictor = make_selector("cpu")
+    predictor.update_node_cpu("edge1", 0.9)
+    assert "edge1" in pick_many(selector, rounds=200)
+
+
+def test_memory_heavy_avoids_targets_under_memory_pressure():
+    selector, predictor = make_selector("memory")
+    for node_id, used in (("edge1", 0.95), ("edge2", 0.5), ("edge3", 0.9)):
+        predictor.update_node_memory(node_id, used)
+    assert pick_many(selector) == {"edge2"}
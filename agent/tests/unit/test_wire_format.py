@@ -0,0 +1,67 @@
+"""Unit tests for the agent-to-agent wire formats (binary frames and JSON requests)."""
+import json
+
+import pytest
+
+from core import envelope, wire_format
+
+
+def test_pack_unpack_round_trip():
+    frame = wire_format.pack({"fn_name": "resize", "hop": 2}, b"\x00\xffraw")
+    meta, body, end = wire_format.unpack(frame)
+    assert meta == {"fn_name": "resize", "hop": 2}
+    assert body == b"\x00\xffraw"
+    assert end == len(frame)
+
+
+@pytest.mark.parametrize("payload", ["héllo", b"\x89PNG\x00", {"width": 64}, ""])
+def test_request_round_trip_keeps_payload_type(payload):
+    params = {"fn_name": "resize", "payload": payload, "tag": "tenant-a"}
+    meta, body, _ = wire_format.unpack(wire_format.pack_request(params))
+    assert wire_format.unpack_request(meta, body) == params
+
+
+def test_envelope_round_trip():
+    result = {"resp": b"\x00result", "status": "success", "hops": [{"node": "edge1"}]}
+    meta, body, _ = wire_format.unpack(wire_format.pack_envelope(result, http_status=200))
+    assert meta.pop("http_status") == 200
+    assert envelope.join(meta, body) == result
+
+
+def test_iter_frames_decodes_across_chunk_boundaries():
+    frames = [({"index": i}, bytes([i]) * i) for i in range(4)]
+    data = b"".join(wire_format.pack(meta, body) for meta, body in frames)
+    chunks = [data[i:i + 3] for i in range(0, len(data), 3)]
+    assert list(wire_format.iter_frames(chunks)) == frames
+    assert wire_format.unpack_all(data) == frames
+
+
+def test_streamed_envelope_decodes_chunk_by_chunk():
+    result = {"resp": envelope.StreamBody(iter([b"ab", b"cd"])), "status": "success"}
+    chunks = list(wire_format.stream_envelope(result))
+    decoded = wire_format.decode_stream(wire_format.CONTENT_TYPE, iter(chunks))
+    assert decoded["status"] == "success"
+    assert decoded["resp"].read() == b"abcd"
+
+
+def test_decode_response_accepts_json_from_older_agents():
+    decoded = wire_format.decode_response("application/json", b'{"resp": "ok", "status": "success"}')
+    assert decoded == {"resp": b"ok", "status": "success"}
+
+
+def test_truncated_and_unknown_frames_are_rejected():
+    frame = wire_format.pack({"a": 1}, b"body")
+    with pytest.raises(ValueError):
+        wire_format.unpack(frame[:-1])
+    with pytest.raises(ValueError):
+        wire_format.unpack(b"\x09" + frame[1:])
+    with pytest.raises(ValueError):
+        list(wire_format.iter_frames([frame[:-1]]))
+
+
+def test_json_request_round_trips_bytes_payload():
+    params = {"fn_name": "resize", "payload": b"\x00\xff", "hop": 1}
+    encoded = wire_format.request_to_json(params)
+    assert json.loads(json.dumps(encoded))["payload_encoding"] == "base64"
+    assert wire_format.request_from_json(encoded) == params
+    assert wire_format.request_from_json({"payload": "text"}) == {"payload": "text"}
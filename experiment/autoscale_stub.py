@@ -0,0 +1,176 @@
+"""
+Replica scaling against a stub OpenFaaS gateway.
+
+Starts a stub gateway on localhost that serves /function/<fn> with a fixed
+service time and a concurrency limit of replicas x per-replica concurrency,
+and implements /system/function/<fn> and /system/scale-function/<fn> with a
+replica start-up delay, plus the invocation counters of /metrics. Open-loop load is sent in phases through the agent's
+ExecutionEngine and ScalingController; replicas and latency are printed per
+scaling round.
+
+Usage:
+    python autoscale_stub.py --phases 5:20,40:30,5:40 --service-ms 200
+    python autoscale_stub.py --source agent
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agent"))
+from core.autoscaler import ScalingController  # noqa: E402
+from core.execution_engine import ExecutionEngine  # noqa: E402
+
+
+class StubGateway:
+    """Replica state of the emulated gateway."""
+
+    def __init__(self, service_time, per_replica, startup_delay):
+        self.service_time = service_time
+        self.per_replica = per_replica
+        self.startup_delay = startup_delay
+        self.replicas = 1
+        self.running = 0
+        self.started = 0
+        self.completed = 0
+        self.seconds = 0.0
+        self.cond = threading.Condition()
+
+    def invoke(self):
+        start = time.time()
+        with self.cond:
+            self.started += 1
+            while self.running >= self.replicas * self.per_replica:
+                self.cond.wait()
+            self.running += 1
+        time.sleep(self.service_time)
+        with self.cond:
+            self.running -= 1
+            self.completed += 1
+            self.seconds += time.time() - start
+            self.cond.notify()
+
+    def metrics(self, fn_name):
+        """Invocation counters in the gateway's Prometheus format."""
+        labels = f'function_name="{fn_name}.openfaas-fn"'
+        with self.cond:
+            return (
+                f'gateway_function_invocation_started{{{labels}}} {self.started}\n'
+                f'gateway_function_invocation_total{{code="200",{labels}}} {self.completed}\n'
+                f'gateway_functions_seconds_sum{{code="200",{labels}}} {self.seconds}\n'
+                f'gateway_functions_seconds_count{{code="200",{labels}}} {self.completed}\n'
+            )
+
+    def scale(self, replicas):
+        def apply():
+            if replicas > self.replicas:
+                time.sleep(self.startup_delay)  # New replicas take a while to become ready
+            with self.cond:
+                self.replicas = replicas
+                self.cond.notify_all()
+        threading.Thread(target=apply, daemon=True).start()
+
+
+def make_handler(gateway):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status, body=b""):
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.startswith("/system/function/"):
+                fn_name = self.path.rsplit("/", 1)[1]
+                self.reply(200, json.dumps({
+                    "name": fn_name, "replicas": gateway.replicas,
+                    "availableReplicas": gateway.replicas
+                }).encode())
+            elif self.path == "/metrics":
+                self.reply(200, gateway.metrics("floating-point").encode())
+            else:
+                self.reply(404)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.startswith("/system/scale-function/"):
+                gateway.scale(json.loads(body)["replicas"])
+                self.reply(202)
+            elif self.path.startswith("/function/"):
+                gateway.invoke()
+                self.reply(200, b"ok")
+            else:
+                self.reply(404)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling controller against a stub gateway")
+    parser.add_argument("--phases", default="5:20,40:30,5:40", help="rps:seconds,...")
+    parser.add_argument("--service-ms", type=float, default=200.0)
+    parser.add_argument("--per-replica", type=int, default=2)
+    parser.add_argument("--startup-ms", type=float, default=1000.0)
+    parser.add_argument("--target-concurrency", type=float, default=2.0)
+    parser.add_argument("--interval", type=float, default=2.0)
+    parser.add_argument("--source", choices=["gateway", "agent"], default="gateway",
+                        help="Demand from the gateway's counters or from tracked calls")
+    parser.add_argument("--port", type=int, default=31198)
+    args = parser.parse_args()
+
+    gateway = StubGateway(args.service_ms / 1000, args.per_replica, args.startup_ms / 1000)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(gateway))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    engine = ExecutionEngine(local_gateway_url=f"http://127.0.0.1:{args.port}/function")
+    controller = ScalingController(
+        engine, enabled=True, source=args.source, interval=args.interval, window=10.0,
+        target_concurrency=args.target_concurrency, max_replicas=20,
+        up_cooldown=args.interval, down_cooldown=4 * args.interval
+    )
+
+    latencies = []
+    lock = threading.Lock()
+
+    def one():
+        start = time.time()
+        with controller.track("floating-point"):
+            engine.invoke_local_faas("floating-point", "1")
+        with lock:
+            latencies.append(time.time() - start)
+
+    print(f"{'t':>6}{'rps':>6}{'replicas':>10}{'desired':>9}{'conc':>7}{'p95 ms':>9}")
+    pool = ThreadPoolExecutor(max_workers=512)
+    start = time.time()
+    next_round = start + args.interval
+    for phase in args.phases.split(","):
+        rps, seconds = (float(x) for x in phase.split(":"))
+        phase_end = time.time() + seconds
+        while time.time() < phase_end:
+            pool.submit(one)
+            time.sleep(1 / rps)
+            if time.time() >= next_round:
+                controller.run_once()
+                decision = controller.get_stats()["functions"].get("floating-point", {})
+                with lock:
+                    recent = sorted(latencies)
+                    latencies.clear()
+                p95 = recent[int(len(recent) * 0.95)] * 1000 if recent else 0.0
+                print(f"{time.time() - start:>6.0f}{rps:>6.0f}{gateway.replicas:>10}"
+                      f"{decision.get('desired', 0):>9}{decision.get('concurrency', 0):>7.1f}{p95:>9.0f}")
+                next_round += args.interval
+
+    pool.shutdown(wait=True)
+    print(f"scaling: { {k: v for k, v in controller.get_stats().items() if k != 'functions'} }")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
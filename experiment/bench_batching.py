@@ -0,0 +1,109 @@
+"""
+Throughput comparison of per-request forwards vs. micro-batched forwards.
+
+Starts a stub agent on localhost that emulates the cross-zone netem delay once
+per HTTP request, then pushes the same load through plain requests.post calls
+and through the agent's MicroBatcher (/entry_batch).
+
+Usage:
+    python bench_batching.py --requests 2000 --concurrency 64 --delay-ms 20
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agent"))
+from core.micro_batcher import MicroBatcher  # noqa: E402
+
+
+def make_handler(delay):
+    class StubAgent(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(delay)  # One emulated round trip per HTTP request
+
+            if self.path == "/entry_batch":
+                lines = [
+                    json.dumps({"index": i, "status": 200, "response": {"resp": item["payload"]}})
+                    for i, item in enumerate(body["requests"])
+                ]
+                payload = ("\n".join(lines) + "\n").encode()
+                content_type = "application/x-ndjson"
+            else:
+                payload = json.dumps({"resp": body["payload"]}).encode()
+                content_type = "application/json"
+
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return StubAgent
+
+
+def run_load(send, total, concurrency):
+    """Send `total` requests from `concurrency` threads; return (seconds, latencies)."""
+    latencies = []
+    lock = threading.Lock()
+
+    def one(i):
+        start = time.time()
+        send({"fn_name": "floating-point", "payload": str(i)})
+        with lock:
+            latencies.append(time.time() - start)
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return time.time() - start, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching throughput benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--delay-ms", type=float, default=20.0)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--port", type=int, default=31199)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.delay_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency))
+    batcher = MicroBatcher(window=args.window_ms / 1000, max_batch=args.max_batch)
+
+    modes = {
+        "per-request": lambda data: session.post(f"{base_url}/entry", json=data, timeout=60).json(),
+        "micro-batched": lambda data: batcher.submit(base_url, "/entry", data),
+    }
+
+    print(f"{'mode':<15}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, send in modes.items():
+        elapsed, latencies = run_load(send, args.requests, args.concurrency)
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000
+        print(f"{name:<15}{args.requests / elapsed:>10.1f}{p50:>10.1f}{p95:>10.1f}")
+
+    print(f"batches sent: {batcher.get_stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Serialization cost of the JSON and binary frame agent-to-agent wire formats.
+
+Encodes and decodes one forwarded request and its result envelope per round,
+for a small text payload and a large binary payload (base64 in JSON, since
+JSON cannot carry raw bytes), and reports CPU time and bytes on the wire.
+
+Usage:
+    python bench_wire_format.py --rounds 200 --large-mb 5
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agent"))
+from core import envelope, wire_format  # noqa: E402
+
+
+def make_request(payload):
+    return {
+        "tag": "default", "fn_name": "image-resize", "payload": payload, "deadline": "",
+        "hop": 1, "path": ["edge1"], "attempt": 1, "arch": "decentralized"
+    }
+
+
+def make_result(resp):
+    return {
+        "resp": resp, "status": "success", "total_time": 0.41, "hop": 1,
+        "architecture": "decentralized", "attempt": 1,
+        "hops": [{"node": "edge2", "architecture": "decentralized", "elapsed": 0.35}]
+    }
+
+
+def json_round(payload, result):
+    """One forward in JSON: binary data is base64-encoded as a string."""
+    binary = isinstance(payload, bytes)
+    if binary:
+        payload = base64.b64encode(payload).decode("ascii")
+    request_bytes = json.dumps(make_request(payload)).encode("utf-8")
+    data = json.loads(request_bytes)
+    if binary:
+        data["payload"] = base64.b64decode(data["payload"])
+
+    response_bytes = json.dumps(envelope.to_json(result)).encode("utf-8")
+    envelope.from_json(json.loads(response_bytes))
+    return len(request_bytes) + len(response_bytes)
+
+
+def frame_round(payload, result):
+    """One forward in binary frames: data travels as raw frame bodies."""
+    request_bytes = wire_format.pack_request(make_request(payload))
+    meta, body, _ = wire_format.unpack(request_bytes)
+    wire_format.unpack_request(meta, body)
+
+    response_bytes = wire_format.pack_envelope(result)
+    wire_format.decode_response(wire_format.CONTENT_TYPE, response_bytes)
+    return len(request_bytes) + len(response_bytes)
+
+
+def measure(fn, payload, result, rounds):
+    """Return (CPU microseconds per round, bytes on the wire per round)."""
+    wire_bytes = fn(payload, result)
+    start = time.process_time()
+    for _ in range(rounds):
+        fn(payload, result)
+    return (time.process_time() - start) / rounds * 1e6, wire_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wire format serialization benchmark")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--large-mb", type=float, default=5.0)
+    args = parser.parse_args()
+
+    large = os.urandom(int(args.large_mb * 1024 * 1024))
+    cases = {
+        "small text": ("resize to 128x128", "ok"),
+        f"{args.large_mb:g} MB binary": (large, large),
+    }
+
+    print(f"{'payload':<16}{'format':<8}{'cpu us':>12}{'wire bytes':>14}")
+    for name, (payload, resp) in cases.items():
+        rounds = args.rounds if isinstance(payload, str) else max(1, args.rounds // 20)
+        result = make_result(resp if isinstance(resp, bytes) else resp.encode("utf-8"))
+        for fmt, fn in (("json", json_round), ("frame", frame_round)):
+            cpu, wire_bytes = measure(fn, payload, result, rounds)
+            print(f"{name:<16}{fmt:<8}{cpu:>12.1f}{wire_bytes:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Offline comparison of the dynamic architecture policies (tail_ratio vs. slo).
+
+Replays a QPS profile against a simple queueing model of the three
+architectures: each has a fixed network overhead and a capacity, and a
+request's total time is the overhead plus an M/M/1 sojourn time at the load
+the policy sends there. Every request consults the policy exactly as the
+agent does (update_ratios, then select_arch) on a simulated clock, and the
+last 60 s of total times per architecture are fed back. Reports P50/P95, the
+share of 10 s windows whose P95 violates the SLO, and the architecture mix.
+
+Usage:
+    python compare_arch_policies.py --profile 2:60,2-40:120,40:60,40-2:60 --slo 0.5
+"""
+import argparse
+import os
+import random
+import sys
+from collections import Counter, deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agent"))
+from core import slo_controller, tail_scheduler  # noqa: E402
+from core.slo_controller import SLOController  # noqa: E402
+from core.tail_scheduler import TailRatioScheduler  # noqa: E402
+
+# Architecture -> (overhead seconds, capacity req/s); rough shape of the testbed
+MODEL = {
+    "decentralized": (0.02, 10.0),
+    "federated": (0.08, 25.0),
+    "centralized": (0.15, 80.0),
+}
+SERVICE_TIME = 0.05
+WINDOW = 60.0
+
+
+class SimClock:
+    """Stands in for the time module of the policies."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+
+def parse_profile(spec):
+    """Expand "qps:seconds" or "from-to:seconds" segments into per-second QPS."""
+    rates = []
+    for segment in spec.split(","):
+        levels, seconds = segment.split(":")
+        start, _, end = levels.partition("-")
+        start, end, seconds = float(start), float(end or start), int(seconds)
+        rates += list(np.linspace(start, end, seconds))
+    return rates
+
+
+def total_time(arch, arch_qps):
+    overhead, capacity = MODEL[arch]
+    rho = min(arch_qps / capacity, 0.98)
+    return overhead + random.expovariate((1 - rho) / SERVICE_TIME)
+
+
+def run(policy, rates, clock, slo, seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    logs = {arch: deque() for arch in MODEL}
+    recent_arch = deque()  # (timestamp, arch) to estimate per-architecture load
+    results, windows, mix = [], [], Counter()
+
+    for second, qps in enumerate(rates):
+        window_times = []
+        count = np.random.poisson(qps)
+        for i in range(count):
+            clock.now = second + i / max(count, 1)
+            durations = {arch: [d for _, d in log] for arch, log in logs.items()}
+            arch = policy.select_arch(policy.update_ratios("fn", durations))
+
+            while recent_arch and clock.now - recent_arch[0][0] > 1.0:
+                recent_arch.popleft()
+            recent_arch.append((clock.now, arch))
+            arch_qps = sum(1 for _, a in recent_arch if a == arch)
+
+            duration = total_time(arch, arch_qps)
+            logs[arch].append((clock.now, duration))
+            while logs[arch] and clock.now - logs[arch][0][0] > WINDOW:
+                logs[arch].popleft()
+            results.append(duration)
+            window_times.append(duration)
+            mix[arch] += 1
+
+        windows.append(window_times)
+
+    p95_windows = [
+        np.percentile(sum(windows[i:i + 10], []), 95)
+        for i in range(0, len(windows), 10) if sum(windows[i:i + 10], [])
+    ]
+    total = sum(mix.values())
+    return {
+        "p50": np.percentile(results, 50),
+        "p95": np.percentile(results, 95),
+        "violations": sum(p > slo for p in p95_windows) / len(p95_windows),
+        "mix": {arch: mix[arch] / total for arch in MODEL},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dynamic architecture policies")
+    parser.add_argument("--profile", default="2:60,2-40:120,40:60,40-2:60")
+    parser.add_argument("--slo", type=float, default=0.5, help="P95 SLO in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    clock = SimClock()
+    tail_scheduler.time = clock
+    slo_controller.time = clock
+    rates = parse_profile(args.profile)
+
+    policies = {
+        "tail_ratio": TailRatioScheduler(),
+        "slo": SLOController(default_slo=args.slo),
+    }
+    print(f"{'policy':<12}{'p50 ms':>9}{'p95 ms':>9}{'SLO viol.':>11}   dec/fed/cen")
+    for name, policy in policies.items():
+        stats = run(policy, rates, clock, args.slo, args.seed)
+        mix = "/".join(f"{stats['mix'][arch]:.2f}" for arch in ("decentralized", "federated", "centralized"))
+        print(f"{name:<12}{stats['p50'] * 1000:>9.0f}{stats['p95'] * 1000:>9.0f}"
+              f"{stats['violations']:>10.0%}   {mix}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Gossip membership on many agents on localhost.
+
+Starts N agents in this process, each on its own port with a configuration
+that only lists the seed agents, and measures:
+  - convergence: time until every agent sees all N members
+  - failure detection: time until every surviving agent has declared the
+    stopped agents dead and dropped them from its topology
+  - join: time until every agent sees a newly started agent
+
+Usage:
+    python gossip_localhost.py --agents 20 --seeds 3 --kill 2 --period 0.5
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import yaml
+from flask import Flask
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agent"))
+from api.routes import register_routes  # noqa: E402
+from core.config_manager import ConfigManager  # noqa: E402
+
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+
+def node(index, base_port):
+    return {"id": f"agent{index}", "role": "worker", "zone": f"zone-{index % 3}",
+            "address": "127.0.0.1", "port": base_port + index}
+
+
+def start_agent(index, seeds, args, workdir):
+    """Start one agent; returns (config manager, server)."""
+    config = {
+        "architecture": "decentralized",
+        "node": node(index, args.base_port),
+        "topology": seeds,
+        "membership": {
+            "enabled": True,
+            "protocol_period": args.period,
+            "ping_timeout": args.period / 3,
+            "suspicion_timeout": args.suspicion,
+            "seeds": [seed["id"] for seed in seeds]
+        },
+        "cluster_view": {"poll_interval": 0},
+        "metrics": {"interval": 0}
+    }
+    path = os.path.join(workdir, f"agent{index}.yaml")
+    with open(path, "w") as f:
+        yaml.safe_dump(config, f)
+
+    config_manager = ConfigManager(path=path)
+    app = Flask(f"agent{index}")
+    register_routes(app, config_manager)
+    server = make_server("127.0.0.1", args.base_port + index, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return config_manager, server
+
+
+def wait_until(condition, timeout):
+    """Seconds until condition() holds, or None on timeout."""
+    start = time.time()
+    while time.time() - start < timeout:
+        if condition():
+            return time.time() - start
+        time.sleep(0.05)
+    return None
+
+
+def report(label, seconds):
+    print(f"{label:<28}{'timeout' if seconds is None else f'{seconds:.2f} s'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gossip membership on localhost agents")
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--kill", type=int, default=2)
+    parser.add_argument("--period", type=float, default=0.5, help="Protocol period in seconds")
+    parser.add_argument("--suspicion", type=float, default=2.0, help="Suspicion timeout in seconds")
+    parser.add_argument("--base-port", type=int, default=32000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="gossip-")
+    seeds = [node(i, args.base_port) for i in range(args.seeds)]
+    agents = {}
+    for index in range(args.agents):
+        agents[index] = start_agent(index, seeds, args, workdir)
+
+    def views(indices):
+        return [set(agents[i][0].topo_map) for i in indices]
+
+    everyone = {f"agent{i}" for i in range(args.agents)}
+    report("convergence", wait_until(lambda: all(v == everyone for v in views(agents)), args.timeout))
+
+    killed = list(range(args.agents - args.kill, args.agents))
+    for index in killed:
+        config_manager, server = agents.pop(index)
+        config_manager.membership.stop()
+        server.shutdown()
+        server.server_close()
+    survivors = everyone - {f"agent{i}" for i in killed}
+    report(f"failure detection ({args.kill})",
+           wait_until(lambda: all(v == survivors for v in views(agents)), args.timeout))
+
+    index = args.agents
+    agents[index] = start_agent(index, seeds, args, workdir)
+    survivors.add(f"agent{index}")
+    report("join", wait_until(lambda: all(v == survivors for v in views(agents)), args.timeout))
+
+    stats = [config_manager.membership.get_stats() for config_manager, _ in agents.values()]
+    print(f"{'probes per agent':<28}{sum(s['probes'] for s in stats) / len(stats):.1f}")
+    print(f"{'false suspicions refuted':<28}{sum(s['refuted'] for s in stats)}")
+
+
+if __name__ == "__main__":
+    main()